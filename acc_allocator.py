@@ -0,0 +1,162 @@
+"""
+Account Number Allocator file.
+Hands out unique 9 digit Account Numbers to every session process:
+
+-Keeps every Account Number ever handed out in a shared SQLite file.
+-Seeds that file once from the existing Account Numbers.
+-Reserves a random free number with one atomic insert.
+-Reserves blocks of numbers at once for bulk account creation.
+-Reserves numbers of Accounts restored from a snapshot.
+
+The reservation file is set with 'ETERNITY_ALLOCATOR_PATH'. Because the
+Account Number is the table's primary key, two processes can never be
+given the same number, and creating an account no longer downloads
+the Account Number column.
+"""
+
+import os
+import random
+import sqlite3
+from storage import get_sheet_columns
+
+DEFAULT_ALLOCATOR_PATH = "account_numbers.db"
+
+# Range of valid 9 digit Account Numbers.
+ACC_NUM_MIN = 100000000
+ACC_NUM_MAX = 999999999
+
+# Holds the allocator once it has been created by 'get_allocator'.
+_ALLOCATOR = None
+
+
+class AccountNumberAllocator:
+    """
+    Allocates Account Numbers from a shared reservation table.
+    Membership checks use the table's primary key index, so each
+    allocation costs a single indexed insert whatever the table size.
+    """
+
+    def __init__(self, path=DEFAULT_ALLOCATOR_PATH):
+        self.path = path
+        # Autocommit mode, transactions are opened explicitly below.
+        self._conn = sqlite3.connect(path, timeout=30,
+                                     isolation_level=None)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS reserved ("
+                           " acc_num INTEGER PRIMARY KEY)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS allocator_meta ("
+                           " key TEXT PRIMARY KEY, value TEXT)")
+        self._seeded = False
+
+    def _ensure_seeded(self):
+        """
+        Copies the existing Account Numbers into the reservation table
+        the first time any process uses it. The write lock is held while
+        seeding so other processes wait rather than seed twice.
+        """
+        if self._seeded:
+            return
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            seeded = self._conn.execute(
+                "SELECT value FROM allocator_meta WHERE key = 'seeded'"
+                ).fetchone()
+            if seeded is None:
+                existing = get_sheet_columns(["acc_num"])[0]
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO reserved (acc_num) VALUES (?)",
+                    ((int(value),) for value in existing
+                     if value.strip().isdigit()))
+                self._conn.execute(
+                    "INSERT INTO allocator_meta (key, value)"
+                    " VALUES ('seeded', '1')")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._seeded = True
+
+    def _try_reserve(self, candidate):
+        """
+        Reserves one number. Returns True if it was free.
+        """
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO reserved (acc_num) VALUES (?)",
+            (candidate,))
+        return cursor.rowcount == 1
+
+    def allocate(self):
+        """
+        Returns a new unique 9 digit Account Number.
+        """
+        self._ensure_seeded()
+        while True:
+            candidate = random.randint(ACC_NUM_MIN, ACC_NUM_MAX)
+            if self._try_reserve(candidate):
+                return candidate
+
+    def allocate_block(self, count):
+        """
+        Returns 'count' new unique Account Numbers reserved together
+        in one transaction.
+        """
+        self._ensure_seeded()
+        numbers = []
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            while len(numbers) < count:
+                candidate = random.randint(ACC_NUM_MIN, ACC_NUM_MAX)
+                if self._try_reserve(candidate):
+                    numbers.append(candidate)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return numbers
+
+    def reserve_many(self, acc_nums):
+        """
+        Reserves Account Numbers that are already in use, such as those
+        of restored Accounts, in one transaction so they are never
+        handed out. Numbers reserved before are left as they are.
+        """
+        self._ensure_seeded()
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO reserved (acc_num) VALUES (?)",
+                ((int(acc_num),) for acc_num in acc_nums))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def is_reserved(self, acc_num):
+        """
+        Returns True if the Account Number has been handed out.
+        """
+        self._ensure_seeded()
+        return self._conn.execute(
+            "SELECT 1 FROM reserved WHERE acc_num = ?",
+            (int(acc_num),)).fetchone() is not None
+
+
+def get_allocator():
+    """
+    Returns the shared Account Number allocator.
+    """
+    global _ALLOCATOR
+
+    if _ALLOCATOR is None:
+        _ALLOCATOR = AccountNumberAllocator(
+            os.environ.get("ETERNITY_ALLOCATOR_PATH", DEFAULT_ALLOCATOR_PATH))
+    return _ALLOCATOR
+
+
+def allocate_account_number():
+    """
+    Returns a new unique 9 digit Account Number.
+    """
+    return get_allocator().allocate()
@@ -0,0 +1,288 @@
+"""
+Batch Transactions file.
+Applies many deposits, withdrawals & currency conversions at once
+without the interactive Deposit, Withdraw & Conversion menus:
+
+-Function that validates a transaction line.
+-Function that applies one Account's transactions to its balance.
+-Function that applies a chunk of lines grouped by Account, with one
+ read, one write & one ledger transaction for the whole chunk.
+-Command line entry point reporting transactions per second.
+
+Each line needs 'acc_num' & 'type', one of DEPOSIT, WITHDRAW or
+CONVERT. DEPOSIT & WITHDRAW need an 'amount' and may give the
+'currency' it is in, CONVERT needs the 'currency' to convert to.
+An Account's lines are applied in file order with the menus' rules:
+deposits are capped at the balance limit, withdrawals stop at zero and
+amounts must be in the currency the Account holds at that point.
+Run from the project folder with:
+
+    python acc_batch.py payroll.csv [--chunk-size 500]
+
+The outcome of every line is written to '<file>.results.csv'.
+"""
+
+import os
+import csv
+import sys
+import time
+import argparse
+from collections import namedtuple
+from colorama import Fore, Style
+from balance import CURRENCY_EXPONENTS
+from banking import (apply_amount, stored_balance, record_changes,
+                     InvalidAmount, CorruptBalance, LedgerUnavailable)
+from currency import get_rate_table, convert_balance
+from acc_import import read_records
+from account_update import update_accounts, UpdateConflict
+from ledger import deposit_entries, withdrawal_entries
+from sheets_scheduler import BACKGROUND, set_default_priority
+
+DEFAULT_CHUNK_SIZE = 500
+
+TRANSACTION_TYPES = ["DEPOSIT", "WITHDRAW", "CONVERT"]
+
+RESULT_HEADERS = ["line", "acc_num", "type", "status", "balance",
+                  "adjustment", "reason"]
+
+Transaction = namedtuple("Transaction", ["line_num", "acc_num", "kind",
+                                         "amount", "currency"])
+
+# 'status' is APPLIED, REJECTED for lines that break a rule, or FAILED
+# for lines that could not be stored.
+LineResult = namedtuple("LineResult", ["line_num", "acc_num", "kind",
+                                       "status", "balance", "adjustment",
+                                       "reason"])
+
+# Result of one Account's transactions, with the ledger entries of the
+# applied ones.
+AccountResult = namedtuple("AccountResult", ["previous", "lines",
+                                             "entries"])
+
+
+def validate_transaction(line_num, record, table):
+    """
+    Checks that a transaction line names an Account, a known type & the
+    amount or currency that type needs. Amounts are checked against the
+    Account's currency once its balance is read.
+
+    - If valid, returns (Transaction, None).
+    - If not, returns (None, reason).
+    """
+    if isinstance(record, str):
+        return None, record
+
+    def field(name):
+        value = record.get(name)
+        return "" if value is None else str(value).strip()
+
+    acc_num = field("acc_num")
+    if not acc_num.isdigit():
+        return None, f"acc_num: '{acc_num}' is not an Account Number."
+    kind = field("type").upper()
+    if kind not in TRANSACTION_TYPES:
+        return None, (f"type: '{kind}' must be one of"
+                      f" {', '.join(TRANSACTION_TYPES)}.")
+
+    currency = field("currency").upper()
+    amount = field("amount")
+    if kind == "CONVERT":
+        if currency not in table.index:
+            return None, f"currency: '{currency}' is not supported."
+    else:
+        if not amount:
+            return None, f"amount: {kind} needs an amount."
+        if currency and currency not in CURRENCY_EXPONENTS:
+            return None, f"currency: '{currency}' is not supported."
+
+    return Transaction(line_num, acc_num, kind, amount, currency), None
+
+
+def apply_transactions(transactions, table):
+    """
+    Returns a 'compute' function for 'update_accounts' that applies one
+    Account's transactions in order to the balance in its row.
+    A line breaking a rule is rejected & the later lines still apply.
+    """
+    def compute(row):
+        try:
+            previous = current_bal = stored_balance(row)
+        except CorruptBalance as error:
+            # Nothing is written, every line of the Account is rejected.
+            return {}, AccountResult(None, [
+                LineResult(txn.line_num, txn.acc_num, txn.kind, "REJECTED",
+                           "", "", str(error)) for txn in transactions], [])
+        lines = []
+        entries = []
+
+        for txn in transactions:
+            adjustment = ""
+            try:
+                if txn.kind == "CONVERT":
+                    new_bal, _ = convert_balance(current_bal, txn.currency,
+                                                 table)
+                    if new_bal != current_bal:
+                        entries.append(("CONVERSION", new_bal))
+                else:
+                    if txn.currency and txn.currency != current_bal.currency:
+                        raise InvalidAmount(f"The Account is held in"
+                                            f" {current_bal.currency}.")
+                    change = apply_amount(current_bal, txn.amount,
+                                          add=txn.kind == "DEPOSIT")
+                    new_bal = change.balance
+                    if change.adjustment.minor > 0:
+                        adjustment = str(change.adjustment)
+                    if txn.kind == "DEPOSIT":
+                        entries.extend(deposit_entries(change.amount,
+                                                       change.adjustment))
+                    else:
+                        entries.extend(withdrawal_entries(change.amount,
+                                                          change.adjustment))
+            except InvalidAmount as error:
+                lines.append(LineResult(txn.line_num, txn.acc_num, txn.kind,
+                                        "REJECTED", str(current_bal), "",
+                                        str(error)))
+                continue
+
+            current_bal = new_bal
+            lines.append(LineResult(txn.line_num, txn.acc_num, txn.kind,
+                                    "APPLIED", str(current_bal), adjustment,
+                                    ""))
+
+        updates = {6: str(current_bal)} if current_bal != previous else {}
+        return updates, AccountResult(previous, lines, entries)
+
+    return compute
+
+
+def apply_chunk(transactions):
+    """
+    Applies a chunk of transactions grouped by Account. Every balance is
+    read in one request & written in one request, and the ledger entries
+    of the whole chunk are recorded in one transaction.
+    Returns a LineResult for each transaction.
+    """
+    # The same rates are used for every conversion in the chunk.
+    table = get_rate_table()
+
+    by_account = {}
+    for txn in transactions:
+        by_account.setdefault(txn.acc_num, []).append(txn)
+
+    def record(written):
+        # Recorded once the sheet holds the new balances, each entry
+        # with the Version its change wrote.
+        records = [(acc_num, outcome.previous, outcome.entries,
+                    table.version, version)
+                   for acc_num, outcome, version in written
+                   if outcome.entries]
+        if not records:
+            return
+        try:
+            record_changes(records)
+        except LedgerUnavailable as error:
+            # The balances are written, the ledger catches up with a
+            # SYNC on each Account's next change.
+            print(Fore.RED + f"{error}" + Style.RESET_ALL)
+
+    outcomes = update_accounts({
+        acc_num: apply_transactions(account_txns, table)
+        for acc_num, account_txns in by_account.items()}, record)
+
+    results = []
+    for acc_num, outcome in outcomes.items():
+        if isinstance(outcome, AccountResult):
+            results.extend(outcome.lines)
+            continue
+
+        if isinstance(outcome, UpdateConflict):
+            status, reason = "FAILED", "Account is busy with another session."
+        else:
+            status, reason = "REJECTED", "Account not found."
+        results.extend(LineResult(txn.line_num, acc_num, txn.kind, status,
+                                  "", "", reason)
+                       for txn in by_account[acc_num])
+    return results
+
+
+def process_transactions(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams the transaction file, validates each line & applies the
+    valid ones 'chunk_size' lines at a time. Returns a summary of the
+    run. Results are written as each chunk finishes, so if the storage
+    fails part way, the results file lists every line already applied.
+    """
+    results_path = f"{path}.results.csv"
+    counts = {"APPLIED": 0, "REJECTED": 0, "FAILED": 0}
+    table = get_rate_table()
+    start = time.perf_counter()
+
+    with open(results_path, "w", newline="") as results_file:
+        results_writer = csv.writer(results_file)
+        results_writer.writerow(RESULT_HEADERS)
+
+        def finish_chunk(chunk, rejected):
+            results = apply_chunk(chunk) + rejected
+            results.sort(key=lambda result: result.line_num)
+            for result in results:
+                counts[result.status] += 1
+                results_writer.writerow(result)
+
+        chunk = []
+        rejected = []
+        for line_num, record in read_records(path):
+            txn, reason = validate_transaction(line_num, record, table)
+            if reason:
+                rejected.append(LineResult(line_num, "", "", "REJECTED", "",
+                                           "", reason))
+            else:
+                chunk.append(txn)
+
+            if len(chunk) + len(rejected) >= chunk_size:
+                finish_chunk(chunk, rejected)
+                chunk = []
+                rejected = []
+
+        if chunk or rejected:
+            finish_chunk(chunk, rejected)
+
+    elapsed = time.perf_counter() - start
+    return dict(counts, seconds=elapsed, results_path=results_path)
+
+
+def main(argv=None):
+    """
+    Command line entry point for batch transactions.
+    """
+    parser = argparse.ArgumentParser(
+        description="Apply Eternity Holdings deposits, withdrawals &"
+                    " conversions from a CSV or JSONL file.")
+    parser.add_argument("path", help="transaction file (.csv or .jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="lines applied per read & write")
+    args = parser.parse_args(argv)
+    # Terminal sessions are served before this job.
+    set_default_priority(BACKGROUND)
+
+    if not os.path.exists(args.path):
+        print(Fore.RED + f"The file {args.path} does not exist."
+              + Style.RESET_ALL)
+        return 1
+
+    summary = process_transactions(args.path, max(1, args.chunk_size))
+    seconds = summary["seconds"]
+    total = summary["APPLIED"] + summary["REJECTED"] + summary["FAILED"]
+    rate = total / seconds if seconds else 0.0
+
+    print(Fore.GREEN + f"Processed {total} transactions in {seconds:.2f}s"
+          f" ({rate:.0f} transactions/s), {summary['APPLIED']} applied.")
+    print(Style.RESET_ALL + "Results of every line written to"
+          f" {summary['results_path']}.")
+    if summary["REJECTED"] or summary["FAILED"]:
+        print(Fore.RED + f"Rejected {summary['REJECTED']} & failed"
+              f" {summary['FAILED']} lines." + Style.RESET_ALL)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
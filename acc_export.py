@@ -0,0 +1,213 @@
+"""
+Account Export file.
+Takes snapshots of the 'accountlist' table & loads them back:
+
+-Function that pages through the worksheet in fixed-size row ranges.
+-Function that streams every Account to a CSV or JSONL snapshot.
+-Function that reads a snapshot back one Account at a time.
+-Function that restores a snapshot into the configured storage,
+ skipping Accounts whose Account Number is already stored.
+
+Only one page of rows is held in memory at a time, so snapshots of large
+tables neither need the whole table in RAM nor one huge sheet read.
+Run from the project folder with:
+
+    python acc_export.py export accounts.csv [--page-size 1000]
+    python acc_export.py restore accounts.csv [--chunk-size 500]
+
+Snapshots ending in '.jsonl' are written as JSON lines, others as CSV.
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+from colorama import Fore, Style
+from storage import (ACCOUNT_HEADERS, ACCOUNT_COLUMNS, get_accountlist,
+                     current_row_count, column_letter)
+from account_index import append_account_rows, get_account_index
+from acc_allocator import get_allocator
+from sheets_scheduler import BACKGROUND, set_default_priority
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 500
+
+# Snapshot field names, in sheet column order.
+FIELD_NAMES = sorted(ACCOUNT_COLUMNS, key=ACCOUNT_COLUMNS.get)
+
+
+def is_jsonl(path):
+    """
+    Returns True if the snapshot path is a JSON lines file.
+    """
+    return path.lower().endswith((".jsonl", ".ndjson"))
+
+
+def iter_account_pages(page_size=DEFAULT_PAGE_SIZE):
+    """
+    Yields the Account rows of the worksheet 'page_size' rows at a time,
+    skipping the title row & blank rows. Each page is read with its own
+    range request that bypasses the read cache.
+    """
+    worksheet = get_accountlist(cached=False)
+    last_row = current_row_count(worksheet)
+    last_col = column_letter(len(ACCOUNT_HEADERS))
+
+    for start in range(2, last_row + 1, page_size):
+        end = min(start + page_size - 1, last_row)
+        page = worksheet.batch_get([f"A{start}:{last_col}{end}"])[0]
+        rows = [list(row) + [""] * (len(ACCOUNT_HEADERS) - len(row))
+                for row in page if any(cell.strip() for cell in row)]
+        if rows:
+            yield rows
+
+
+def export_accounts(path, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Streams every Account to a snapshot file. The snapshot is written to
+    a temporary file first & moved into place once complete, so a
+    failed export never leaves a partial snapshot behind.
+    Returns the number of Accounts written.
+    """
+    temp_path = f"{path}.partial"
+    exported = 0
+
+    try:
+        with open(temp_path, "w", newline="", encoding="utf-8") as file:
+            writer = None if is_jsonl(path) else csv.writer(file)
+            if writer:
+                writer.writerow(FIELD_NAMES)
+
+            for page in iter_account_pages(page_size):
+                for row in page:
+                    if writer:
+                        writer.writerow(row)
+                    else:
+                        file.write(json.dumps(dict(zip(FIELD_NAMES, row)))
+                                   + "\n")
+                exported += len(page)
+
+        os.replace(temp_path, path)
+    finally:
+        # Only left behind if the export failed before the move.
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return exported
+
+
+def load_snapshot(path):
+    """
+    Reads a snapshot written by 'export_accounts' one Account at a time,
+    yielding each as a dictionary keyed by the 'ACCOUNT_COLUMNS' names.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if is_jsonl(path):
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield {name: str(record.get(name, ""))
+                           for name in FIELD_NAMES}
+        else:
+            for record in csv.DictReader(file):
+                yield {name: record.get(name) or "" for name in FIELD_NAMES}
+
+
+def restore_chunk(rows):
+    """
+    Reserves the Account Numbers of restored rows with the allocator,
+    so they are never handed out to a new Account, then appends the
+    rows in one request.
+    """
+    acc_col = ACCOUNT_COLUMNS["acc_num"] - 1
+    get_allocator().reserve_many(row[acc_col] for row in rows
+                                 if row[acc_col].strip().isdigit())
+    append_account_rows(rows)
+
+
+def restore_snapshot(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Appends every Account of a snapshot to the configured storage,
+    'chunk_size' rows per request. Meant for filling an empty store,
+    such as a local SQLite copy of the live sheet.
+
+    - If an Account Number is already stored, or appears earlier in the
+      snapshot, the Account is skipped, as two rows with one number
+      would break the Account index.
+
+    Returns (number of Accounts restored, skipped Account Numbers).
+    """
+    account_index = get_account_index()
+    restored = 0
+    skipped = []
+    seen = set()
+    chunk = []
+
+    for record in load_snapshot(path):
+        acc_num = record["acc_num"].strip()
+        if acc_num and (acc_num in seen or acc_num in account_index):
+            skipped.append(acc_num)
+            continue
+        seen.add(acc_num)
+        chunk.append([record[name] for name in FIELD_NAMES])
+        if len(chunk) >= chunk_size:
+            restore_chunk(chunk)
+            restored += len(chunk)
+            chunk = []
+
+    if chunk:
+        restore_chunk(chunk)
+        restored += len(chunk)
+    return restored, skipped
+
+
+def main(argv=None):
+    """
+    Command line entry point for exporting & restoring snapshots.
+    """
+    parser = argparse.ArgumentParser(
+        description="Export or restore Eternity Holdings Account"
+                    " snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="write a snapshot")
+    export_parser.add_argument("path", help="snapshot file (.csv or .jsonl)")
+    export_parser.add_argument("--page-size", type=int,
+                               default=DEFAULT_PAGE_SIZE,
+                               help="rows read per request")
+
+    restore_parser = commands.add_parser("restore", help="load a snapshot")
+    restore_parser.add_argument("path", help="snapshot file (.csv or .jsonl)")
+    restore_parser.add_argument("--chunk-size", type=int,
+                                default=DEFAULT_CHUNK_SIZE,
+                                help="rows written per request")
+    args = parser.parse_args(argv)
+    # Terminal sessions are served before this job.
+    set_default_priority(BACKGROUND)
+
+    start = time.perf_counter()
+    skipped = []
+    if args.command == "export":
+        count = export_accounts(args.path, max(1, args.page_size))
+        action = "Exported"
+    else:
+        if not os.path.exists(args.path):
+            print(Fore.RED + f"The file {args.path} does not exist."
+                  + Style.RESET_ALL)
+            return 1
+        count, skipped = restore_snapshot(args.path,
+                                          max(1, args.chunk_size))
+        action = "Restored"
+
+    print(Fore.GREEN + f"{action} {count} Accounts in"
+          f" {time.perf_counter() - start:.2f}s." + Style.RESET_ALL)
+    if skipped:
+        print(Fore.RED + f"Skipped {len(skipped)} Accounts whose Account"
+              f" Number is already stored: {', '.join(skipped)}."
+              + Style.RESET_ALL)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Bulk Account Import file.
+Creates many Accounts at once without the interactive Account Creator:
+
+-Function that streams customer records from a CSV or JSONL file.
+-Function that validates a record with the Account Creator's rules.
+-Function that creates Accounts in large chunks with 'append_rows'.
+-Command line entry point reporting throughput & rejected lines.
+
+Each record needs 'first_name', 'last_name' & 'date_of_birth' and may
+include a Recovery Backup as 'location', 'email' & 'recovery_pass'.
+Run from the project folder with:
+
+    python acc_import.py customers.csv [--chunk-size 500]
+
+The new Account Numbers & PINs are written to '<file>.issued.csv' and
+rejected lines with their reason to '<file>.rejected.csv', along with
+the lines of any chunk that could not be stored, which are not created.
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+from colorama import Fore, Style
+from balance import Balance
+from utils import check_input, validate_email, acc_pin_generator
+from banking import get_age, MINIMUM_AGE
+from acc_allocator import get_allocator
+from account_index import append_account_rows, get_recovery_index
+from sheets_scheduler import BACKGROUND, set_default_priority
+
+DEFAULT_CHUNK_SIZE = 500
+
+BACKUP_FIELDS = ["location", "email", "recovery_pass"]
+
+
+def read_records(path):
+    """
+    Streams (line number, record) pairs from a CSV file with a header
+    row or from a JSONL file, one record at a time. A JSONL line that is
+    not a JSON object is passed on as its error message.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line_num, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    record = f"Invalid JSON: {error}"
+                if not isinstance(record, (dict, str)):
+                    record = "Invalid JSON: expected an object."
+                yield line_num, record
+        else:
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+
+
+def validate_record(record):
+    """
+    Validates a customer record with the same rules as the Account
+    Creator: names pass 'check_input', the Date of Birth is formatted
+    (YYYY-MM-DD) & at least 'MINIMUM_AGE', and a Recovery Backup, if
+    given, is complete with a valid email.
+
+    - If valid, returns (cleaned record, None).
+    - If not, returns (None, reason).
+    """
+    if isinstance(record, str):
+        return None, record
+
+    def field(name):
+        value = record.get(name)
+        return "" if value is None else str(value).strip()
+
+    cleaned = {}
+    for name in ["first_name", "last_name"]:
+        value = field(name).upper()
+        problem = check_input(value)
+        if problem:
+            return None, f"{name}: {problem}"
+        cleaned[name] = value
+
+    date_of_birth = field("date_of_birth")
+    try:
+        if get_age(date_of_birth) < MINIMUM_AGE:
+            return None, (f"date_of_birth: must be {MINIMUM_AGE} or"
+                          " older.")
+    except ValueError:
+        return None, (f"date_of_birth: '{date_of_birth}' is incorrectly"
+                      " formatted.")
+    cleaned["date_of_birth"] = date_of_birth
+
+    backup = {name: field(name) for name in BACKUP_FIELDS}
+    if any(backup.values()):
+        if not all(backup.values()):
+            return None, ("Recovery Backup needs location, email &"
+                          " recovery_pass.")
+        problem = check_input(backup["location"].upper())
+        if problem:
+            return None, f"location: {problem}"
+        if not validate_email(backup["email"]):
+            return None, (f"email: '{backup['email']}' is not the correct"
+                          " format.")
+        backup["location"] = backup["location"].upper()
+    cleaned.update(backup)
+
+    return cleaned, None
+
+
+def create_chunk(chunk, issued_writer, rejected_writer):
+    """
+    Creates the Accounts of one chunk of validated records. Reserves
+    their Account Numbers together, appends all rows in one request and
+    writes the issued numbers & PINs once the rows are stored.
+
+    - If the append fails, every line of the chunk is written to the
+      rejected file as not created & 0 is returned.
+
+    Returns the number of Accounts created.
+    """
+    acc_nums = get_allocator().allocate_block(len(chunk))
+    opening_bal = str(Balance(0, 'EUR'))
+
+    rows = []
+    for (line_num, record), acc_num in zip(chunk, acc_nums):
+        pin_num = acc_pin_generator()
+        rows.append([record["first_name"], record["last_name"], acc_num,
+                     pin_num, record["date_of_birth"], opening_bal,
+                     record["location"], record["email"],
+                     record["recovery_pass"]])
+
+    try:
+        first_row = append_account_rows(rows)
+    except Exception as error:
+        # Any storage backend's error, the next chunk is still tried.
+        for line_num, _ in chunk:
+            rejected_writer.writerow([line_num, "Account not created, the"
+                                      f" chunk could not be stored: {error}"])
+        return 0
+
+    for (line_num, _), row in zip(chunk, rows):
+        issued_writer.writerow([line_num, row[0], row[1], row[2], row[3]])
+
+    recovery_index = get_recovery_index()
+    for row_num, row in enumerate(rows, start=first_row):
+        if row[6]:
+            recovery_index.record_backup(row_num, row[6], row[7])
+    return len(rows)
+
+
+def import_accounts(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams the customer file, validates each record & creates the valid
+    ones 'chunk_size' at a time. Returns a summary of the import.
+    """
+    issued_path = f"{path}.issued.csv"
+    rejected_path = f"{path}.rejected.csv"
+    created = 0
+    rejected = 0
+    failed = 0
+    start = time.perf_counter()
+
+    with open(issued_path, "w", newline="") as issued_file, \
+            open(rejected_path, "w", newline="") as rejected_file:
+        issued_writer = csv.writer(issued_file)
+        rejected_writer = csv.writer(rejected_file)
+        issued_writer.writerow(["line", "first_name", "last_name",
+                                "acc_num", "pin_num"])
+        rejected_writer.writerow(["line", "reason"])
+
+        chunk = []
+        for line_num, record in read_records(path):
+            cleaned, reason = validate_record(record)
+            if reason:
+                rejected += 1
+                rejected_writer.writerow([line_num, reason])
+                continue
+
+            chunk.append((line_num, cleaned))
+            if len(chunk) >= chunk_size:
+                done = create_chunk(chunk, issued_writer, rejected_writer)
+                created += done
+                failed += len(chunk) - done
+                chunk = []
+
+        if chunk:
+            done = create_chunk(chunk, issued_writer, rejected_writer)
+            created += done
+            failed += len(chunk) - done
+
+    elapsed = time.perf_counter() - start
+    return {"created": created, "rejected": rejected, "failed": failed,
+            "seconds": elapsed, "issued_path": issued_path,
+            "rejected_path": rejected_path}
+
+
+def main(argv=None):
+    """
+    Command line entry point for the bulk Account import.
+    """
+    parser = argparse.ArgumentParser(
+        description="Create Eternity Holdings Accounts from a CSV or"
+                    " JSONL file.")
+    parser.add_argument("path", help="customer file (.csv or .jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Accounts written per request")
+    args = parser.parse_args(argv)
+    # Terminal sessions are served before this job.
+    set_default_priority(BACKGROUND)
+
+    if not os.path.exists(args.path):
+        print(Fore.RED + f"The file {args.path} does not exist."
+              + Style.RESET_ALL)
+        return 1
+
+    summary = import_accounts(args.path, max(1, args.chunk_size))
+    seconds = summary["seconds"]
+    rate = summary["created"] / seconds if seconds else 0.0
+
+    print(Fore.GREEN + f"Created {summary['created']} Accounts in"
+          f" {seconds:.2f}s ({rate:.0f} Accounts/s).")
+    print(Style.RESET_ALL + "Account Numbers & PINs written to"
+          f" {summary['issued_path']}.")
+    if summary["rejected"] or summary["failed"]:
+        print(Fore.RED + f"Rejected {summary['rejected']} lines & could not"
+              f" store {summary['failed']}, see {summary['rejected_path']}."
+              + Style.RESET_ALL)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,44 +3,27 @@ Account Login Functions file.
 Contains functions relating to user login.
 
 -Function that prompts the user to enter their details.
--Function that checks those details with the database
+-Function that checks those details with 'banking.authenticate'
  returning a result.
 """
 
 from utils import clear, validate_mode, validate_input
 from colorama import Fore, Style
+from banking import authenticate, LoginFailed, CorruptBalance
+from sheets_scheduler import SheetsUnavailable
+from navigation import START_MENU, BANK_HUB, Transition
 
-import gspread
-from google.oauth2.service_account import Credentials
 
-SCOPE = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive.file",
-    "https://www.googleapis.com/auth/drive"
-    ]
-
-CREDS = Credentials.from_service_account_file('creds.json')
-SCOPED_CREDS = CREDS.with_scopes(SCOPE)
-GSPREAD_CLIENT = gspread.authorize(SCOPED_CREDS)
-SHEET = GSPREAD_CLIENT.open('Eternity Holdings')
-
-ACCOUNTLIST = SHEET.worksheet('accountlist')
-
-
-def login_account(start_menu_func,
-                  create_acc_func,
-                  login_acc_func,
-                  bank_hub_func,
-                  acc_recovery_func,
-                  acc_detail_func):
+def login_account():
     """
     Login Account Terminal. Prompts users with an option to return
     to the Main menu. Collects User input for their Account.
-    In the if statement it calls the locate_acc function,
+    In the if statement it calls the login_acc_checker function,
     to compare user input with stored data.
 
-    - If True the loop breaks and calls logged_in_menu.
+    - If True, logs the Account in & returns the HUB screen.
     - If False it returns user to the start.
+    - If None, the service was busy & the user is returned to the start.
     """
     print(Fore.YELLOW + "Welcome to Account Login.\n")
     print(Style.RESET_ALL + "If you wish to continue with Account Login"
@@ -57,74 +40,68 @@ def login_account(start_menu_func,
             if mode_str == "EXIT":
                 clear()
                 print(Fore.RED + "Returning to Main Menu...\n")
-                start_menu_func(create_acc_func, login_account, bank_hub_func,
-                                acc_recovery_func, acc_detail_func)
-                return
+                return START_MENU
 
             elif mode_str == "PROCEED":
                 clear()
                 print(Fore.GREEN + "Proceeding to Account Login...\n")
                 break
 
-    while True:
-        print(Fore.YELLOW + "Welcome to Account Login.\n")
-        print(Fore.CYAN + "You're now at the Account Login Terminal.")
-        print(Fore.RED + "Note: Names are not case sensitive.\n")
-        # Assigns a variable to each user input
-        print(Style.RESET_ALL + "What is your First Name?")
-        fname = validate_input(Fore.GREEN + "Enter here:\n").upper()
-
-        print(Style.RESET_ALL + "\nWhat is your Last Name?")
-        lname = validate_input(Fore.GREEN + "Enter here:\n").upper()
-
-        print(Style.RESET_ALL + "\nWhat is your Account Number?")
-        acc_num = validate_input(Fore.GREEN + "Enter here:\n").upper()
-
-        print(Style.RESET_ALL + "\nWhat is your Account Pin Number?")
-        pin_num = validate_input(Fore.GREEN + "Enter here:\n").upper()
-
-        # Calls function and gives it the input values
-        if login_acc_checker(fname, lname, acc_num, pin_num):
-            clear()
-            print(Fore.GREEN + "You have Successfully logged in.\n")
-            bank_hub_func(fname, acc_num, create_acc_func, login_acc_func,
-                          bank_hub_func, acc_recovery_func, acc_detail_func)
-            break
-        else:
-            clear()
-            print(Fore.RED + "Sorry your search does not match"
-                  " any Account in our database.")
-            print("Returning to Main Menu...\n")
-            start_menu_func(create_acc_func, login_account, bank_hub_func,
-                            acc_recovery_func, acc_detail_func)
-            return
+    print(Fore.YELLOW + "Welcome to Account Login.\n")
+    print(Fore.CYAN + "You're now at the Account Login Terminal.")
+    print(Fore.RED + "Note: Names are not case sensitive.\n")
+    # Assigns a variable to each user input
+    print(Style.RESET_ALL + "What is your First Name?")
+    fname = validate_input(Fore.GREEN + "Enter here:\n").upper()
+
+    print(Style.RESET_ALL + "\nWhat is your Last Name?")
+    lname = validate_input(Fore.GREEN + "Enter here:\n").upper()
+
+    print(Style.RESET_ALL + "\nWhat is your Account Number?")
+    acc_num = validate_input(Fore.GREEN + "Enter here:\n").upper()
+
+    print(Style.RESET_ALL + "\nWhat is your Account Pin Number?")
+    pin_num = validate_input(Fore.GREEN + "Enter here:\n").upper()
+
+    # Calls function and gives it the input values
+    logged_in = login_acc_checker(fname, lname, acc_num, pin_num)
+    if logged_in:
+        clear()
+        print(Fore.GREEN + "You have Successfully logged in.\n")
+        return Transition(BANK_HUB, {"fname": fname, "acc_num": acc_num})
+    if logged_in is None:
+        return START_MENU
+
+    clear()
+    print(Fore.RED + "Sorry your search does not match"
+          " any Account in our database.")
+    print("Returning to Main Menu...\n")
+    return START_MENU
 
 
 def login_acc_checker(fname, lname, acc_num, pin_num):
     """
     Login Account Checker for the 'login_account' function.
-    Extracts corresponding data from worksheet.
-    Creates a list of the data. Compares the data with user input.
+    Checks the user input with 'banking.authenticate'.
 
     - If the values match, returns True.
-    - If not they do not, returns False.
+    - If not they do not, or the Account does not exist, returns False.
+    - If the values match but the balance cannot be read, returns True,
+      as the balance screens report it.
+    - If Google Sheets stays rate limited, asks the user to try again
+      shortly & returns None.
     """
-    account_list_sheet = SHEET.worksheet('accountlist')
-    # Collects all row data
-    all_rows = account_list_sheet.get_all_values()
-    # Iterate over each row in the sheet excluding the title row
-    for row in all_rows[1:]:
-        # Extract each data from the row in order
-        sheet_fname, sheet_lname, sheet_acc_num, sheet_pin_num = row[:4]
-
-        # Check if all the user input matches the data in the sheet
-        if (
-            fname == sheet_fname and
-            lname == sheet_lname and
-            acc_num == sheet_acc_num and
-            pin_num == sheet_pin_num
-        ):
-
-            return True
-
-    return False
+    try:
+        authenticate(fname, lname, acc_num, pin_num)
+    except LoginFailed:
+        return False
+    except SheetsUnavailable:
+        clear()
+        print(Fore.RED + "Eternity Holdings is busy right now, please try"
+                         " logging in again shortly.")
+        print("Returning to Main Menu...\n")
+        return None
+    except CorruptBalance:
+        # The details matched, the balance screens report the balance.
+        pass
+    return True
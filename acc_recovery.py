@@ -6,28 +6,27 @@ locate lost details.
 -Funtion that prompts users with backup questions.
 -Function that provides users with advice if backup data
  is lost.
+-Function that prints all details of an Account.
 """
-from utils import (clear, validate_mode, validate_email, get_backup_data,
-                   validate_input)
+from utils import clear, validate_mode, validate_email, validate_input
 from colorama import Fore, Style
+from banking import (get_account, find_recovery_backup, AccountNotFound,
+                     CorruptBalance)
+from sheets_scheduler import SheetsUnavailable
+from navigation import START_MENU, FORGOT_RECOVERY
 
 
-def acc_recovery(start_menu,
-                 create_acc_func,
-                 login_acc_func,
-                 bank_hub_func,
-                 acc_recovery_func,
-                 acc_detail_func):
+def acc_recovery():
     """
     Account Recovery Terminal. Prompts users with an option to return
     to the Main menu. Then prompts users with a question.
 
     - If 'YES' while loop breaks. Function code proceeds.
-    - If 'NO' the 'forgot_acc_recovery' function is called.
+    - If 'NO' the 'forgot_acc_recovery' screen is returned.
 
     Calls the 'acc_recovery_questions' function. Prints statements to
-    terminal and prompts users to enter 'PROCEED' using 'validate_mode'
-    function call. Once True, calls the 'start_menu' function.
+    terminal and prompts users to enter 'RETURN' using 'validate_mode'
+    function call. Once True, returns the Main Menu screen.
     """
     print(Fore.YELLOW + "Welcome to Account Recovery.\n")
     print(Style.RESET_ALL + "If you have lost your Account Number or Pin Code"
@@ -45,8 +44,7 @@ def acc_recovery(start_menu,
                 clear()
                 print(Fore.GREEN + f"You chose to {mode_str} to Main Menu!")
                 print("Sending to Main Menu...\n")
-                start_menu(create_acc_func, login_acc_func, bank_hub_func,
-                           acc_recovery_func, acc_detail_func)
+                return START_MENU
 
             elif mode_str == "PROCEED":
                 clear()
@@ -79,12 +77,10 @@ def acc_recovery(start_menu,
 
             elif mode_str == "NO":
                 clear()
-                forgot_acc_recovery(start_menu, create_acc_func,
-                                    login_acc_func, bank_hub_func,
-                                    acc_recovery_func, acc_detail_func)
+                return FORGOT_RECOVERY
 
-    acc_recovery_questions(start_menu, create_acc_func, login_acc_func,
-                           bank_hub_func, acc_recovery_func, acc_detail_func)
+    if not acc_recovery_questions():
+        return FORGOT_RECOVERY
 
     print(Fore.YELLOW + "\nWe recommend changing your Custom Password reguarly"
                         " for an extra layer of protection.")
@@ -104,28 +100,26 @@ def acc_recovery(start_menu,
             if mode_str == "RETURN":
                 clear()
                 print(Fore.GREEN + "Returning to Main Menu...\n")
-                start_menu(create_acc_func, login_acc_func, bank_hub_func,
-                           acc_recovery_func, acc_detail_func)
+                return START_MENU
 
 
-def acc_recovery_questions(start_menu,
-                           create_acc_func,
-                           login_acc_func,
-                           bank_hub_func,
-                           acc_recovery_func,
-                           acc_detail_func):
+def acc_recovery_questions():
     """
     Account Recovery Backup Questions. When called the user is prompt with
     questions. Uses 'validate_email' to obtain a correct email format.
-    Calls 'get_backup_data' function passing it user values.
+    Calls 'banking.find_recovery_backup' function passing it user values.
 
-    - If that function returns True, this returns to the function call.
+    - If an Account is found, prints its details & returns True.
+    - If it is found but cannot be read, says so & returns True.
+    - If Google Sheets stays rate limited, asks the user to try again
+      shortly & returns True.
     - If False, function code continues:
 
     Prompts user with a question.
 
     - If user input is 'RETRY' code wraps back to start of questions.
-    - If 'FORGOT' the 'forgot_acc_recovery' function is called.
+    - If 'FORGOT' returns False, so the caller shows the
+      'forgot_acc_recovery' screen.
     """
     while True:
         print(Style.RESET_ALL + "What is your Country of Residence?\n")
@@ -150,45 +144,53 @@ def acc_recovery_questions(start_menu,
 
         clear()
 
-        if get_backup_data(user_location, user_email, user_recovery_pass,
-                           acc_detail_func):
-            return
+        print(Fore.GREEN + "Obtaining Account Backup data...")
+        try:
+            account = find_recovery_backup(user_location, user_email,
+                                           user_recovery_pass)
+        except AccountNotFound:
+            print(Fore.RED + "Data does not match any Account found.")
+        except CorruptBalance:
+            print(Fore.RED + "Your Account was found but cannot be read."
+                             " Please contact us at marcusf.dev@gmail.com.\n")
+            return True
+        except SheetsUnavailable:
+            print(Fore.RED + "Eternity Holdings is busy right now, please try"
+                             " recovering your Account again shortly.\n")
+            return True
         else:
-            print(Fore.RED + "The details you have entered do not match"
-                             " the details recorded in our database.\n")
-            print(Fore.CYAN + "Are you sure you entered them correctly?\n")
-            print(Style.RESET_ALL + "Please Enter 'RETRY' to try again.")
-            print("Or Enter 'FORGOT' if you do not know these Recovery"
-                  " details.")
-
-            valid_mode_input = ["RETRY", "FORGOT"]
-            mode_str = input(Fore.GREEN + "Enter here:\n").upper()
-
-            if validate_mode(mode_str, valid_mode_input):
-                if mode_str == "RETRY":
-                    clear()
-                    print(Fore.GREEN + "No problem. Loading Questions...\n")
-                    continue
-                elif mode_str == "FORGOT":
-                    clear()
-                    forgot_acc_recovery(start_menu, create_acc_func,
-                                        login_acc_func, bank_hub_func,
-                                        acc_recovery_func, acc_detail_func)
-
-
-def forgot_acc_recovery(start_menu,
-                        create_acc_func,
-                        login_acc_func,
-                        bank_hub_func,
-                        acc_recovery_func,
-                        acc_detail_func):
+            print(Fore.GREEN + "Account Found.")
+            print_acc_detail(account)
+            return True
+
+        print(Fore.RED + "The details you have entered do not match"
+                         " the details recorded in our database.\n")
+        print(Fore.CYAN + "Are you sure you entered them correctly?\n")
+        print(Style.RESET_ALL + "Please Enter 'RETRY' to try again.")
+        print("Or Enter 'FORGOT' if you do not know these Recovery"
+              " details.")
+
+        valid_mode_input = ["RETRY", "FORGOT"]
+        mode_str = input(Fore.GREEN + "Enter here:\n").upper()
+
+        if validate_mode(mode_str, valid_mode_input):
+            if mode_str == "RETRY":
+                clear()
+                print(Fore.GREEN + "No problem. Loading Questions...\n")
+                continue
+            elif mode_str == "FORGOT":
+                clear()
+                return False
+
+
+def forgot_acc_recovery():
     """
-    This function is called by 'acc_recovery_questions' and
-    'acc_recovery'. Prints statements to terminal.
+    This screen is shown by 'acc_recovery' when the user has no backup
+    details or forgot them. Prints statements to terminal.
     Prompts the user to Enter 'RETURN' utilizing the 'validate_mode'
     function.
 
-    - If user input is True, 'start_menu' function is called.
+    - If user input is True, the Main Menu screen is returned.
     """
     print(Fore.RED + "We're Sorry but without your backup information we"
                      " cannot help you in the Account Recovery Terminal.\n")
@@ -207,5 +209,46 @@ def forgot_acc_recovery(start_menu,
             if mode_str == "RETURN":
                 clear()
                 print(Fore.GREEN + "Returning to the Main menu...\n")
-                start_menu(create_acc_func, login_acc_func, bank_hub_func,
-                           acc_recovery_func, acc_detail_func)
+                return START_MENU
+
+
+def print_acc_detail(account):
+    """
+    Prints an Account's details & Recovery Backup details, given as the
+    AccountDetails returned by 'banking'.
+    """
+    print(Fore.CYAN + "Here are your Account details:\n")
+    print(Style.RESET_ALL + "First Name:", account.first_name)
+    print("Last Name:", account.last_name)
+    print("Account Number:", account.acc_num)
+    print("Pin Number:", account.pin_num)
+    print("Date of Birth:", account.date_of_birth)
+    print(Fore.CYAN + "\nYour Account recovery Backup details:\n")
+    print(Style.RESET_ALL + "Location:", account.location)
+    print("Email Address:", account.email)
+    print("Recovery Password:", account.recovery_pass)
+
+
+def all_acc_detail(backup_acc_num):
+    """
+    When 'all_acc_detail' is called, it reads the Account of the passed
+    value of 'backup_acc_num' with 'banking.get_account'.
+
+    Once Account is found, prints its details to the terminal and returns
+    to the function call. If Google Sheets stays rate limited, asks the
+    user to try again shortly instead.
+    """
+    try:
+        account = get_account(backup_acc_num)
+    except AccountNotFound:
+        return
+    except CorruptBalance:
+        print(Fore.RED + "Your Account cannot be read. Please contact us"
+                         " at marcusf.dev@gmail.com.\n")
+        return
+    except SheetsUnavailable:
+        print(Fore.RED + "Eternity Holdings is busy right now, your Account"
+                         " details cannot be shown. Please try again"
+                         " shortly.\n")
+        return
+    print_acc_detail(account)
@@ -0,0 +1,300 @@
+"""
+Account Index file.
+Contains the in-process index of the 'accountlist' table:
+
+-Maps each Account Number to its sheet row number.
+-Keeps the contents of rows that have already been read.
+-Is kept up to date when rows are appended or cells are updated.
+-Maps Recovery Backup details to the rows that hold them.
+
+The index is built from the Account Number column the first time an
+account is looked up. After that, finding an account's row is a
+dictionary lookup instead of downloading & scanning the whole sheet.
+"""
+
+import re
+import time
+import threading
+from storage import ACCOUNT_HEADERS, get_accountlist, get_sheet_columns
+
+# Column holding the Account Number, 1-based like the sheet.
+ACC_NUM_COL = 3
+
+# Least seconds between rebuilds caused by unknown Account Numbers or
+# Recovery Backups, so repeated failed logins or recoveries cannot force
+# a column download every time.
+REBUILD_INTERVAL = 1.0
+
+# Holds the indexes once they have been created.
+_ACCOUNT_INDEX = None
+_RECOVERY_INDEX = None
+
+
+class AccountIndex:
+    """
+    Account Number to row number index over a worksheet.
+    Unknown Account Numbers trigger one rebuild, at most once every
+    'REBUILD_INTERVAL' seconds, as another session may have created the
+    account since the index was built. If the account is still not found
+    a ValueError is raised, matching 'list.index'.
+
+    If the worksheet can look rows up itself, as the account service
+    does, rows are asked for one at a time instead of reading the whole
+    Account Number column.
+    """
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self._rows = {}
+        self._contents = {}
+        self._built = False
+        self._built_at = 0.0
+        self._lock = threading.RLock()
+
+    def build(self):
+        """
+        Reads the Account Number column & maps every number to its row.
+        Cached row contents are dropped as they may be out of date.
+        """
+        column = self.worksheet.col_values(ACC_NUM_COL)
+        with self._lock:
+            self._rows = {}
+            self._contents = {}
+            # Skips the title row, sheet rows start at 1.
+            for row_num, acc_num in enumerate(column[1:], start=2):
+                if acc_num.strip():
+                    self._rows[acc_num.strip()] = row_num
+            self._built = True
+            self._built_at = time.monotonic()
+
+    def __contains__(self, acc_num):
+        if not self._built:
+            self.build()
+        return str(acc_num).strip() in self._rows
+
+    def __len__(self):
+        if not self._built:
+            self.build()
+        return len(self._rows)
+
+    def row_of(self, acc_num):
+        """
+        Returns the sheet row number of the Account Number.
+        """
+        acc_num = str(acc_num).strip()
+        remote_row_of = getattr(self.worksheet, "row_of", None)
+        if remote_row_of and not self._built:
+            with self._lock:
+                row_num = self._rows.get(acc_num)
+            if row_num is None:
+                # Rows never move, so a found row can be kept.
+                row_num = remote_row_of(acc_num)
+                with self._lock:
+                    self._rows[acc_num] = row_num
+            return row_num
+
+        if not self._built:
+            self.build()
+
+        row_num = self._rows.get(acc_num)
+        if (row_num is None and
+                time.monotonic() - self._built_at >= REBUILD_INTERVAL):
+            self.build()
+            row_num = self._rows.get(acc_num)
+        if row_num is None:
+            raise ValueError(f"Account number {acc_num} not found.")
+        return row_num
+
+    def get_row(self, acc_num, fresh=False):
+        """
+        Returns the row contents of the Account Number, padded to the
+        full width of the sheet.
+
+        - If the row was read before, the stored copy is returned.
+        - If 'fresh' is True, the row is always read from the sheet.
+        """
+        row_num = self.row_of(acc_num)
+        with self._lock:
+            row = self._contents.get(row_num)
+        if row is None or fresh:
+            row = self.worksheet.row_values(row_num)
+            row += [""] * (len(ACCOUNT_HEADERS) - len(row))
+            with self._lock:
+                self._contents[row_num] = row
+        return list(row)
+
+    def record_append(self, row_num, values):
+        """
+        Adds a newly appended row to the index.
+        """
+        cells = ["" if value is None else str(value) for value in values]
+        cells += [""] * (len(ACCOUNT_HEADERS) - len(cells))
+        with self._lock:
+            if self._built:
+                self._rows[cells[ACC_NUM_COL - 1].strip()] = row_num
+            self._contents[row_num] = cells
+
+    def record_update(self, row_num, col, value):
+        """
+        Applies a cell update to the stored copy of the row.
+        """
+        with self._lock:
+            row = self._contents.get(row_num)
+            if row is None:
+                return
+            row += [""] * (col - len(row))
+            row[col - 1] = "" if value is None else str(value)
+
+
+class RecoveryIndex:
+    """
+    Recovery Backup index keyed on (Country of Residence, Email).
+    Country is compared upper-cased & Email lower-cased, both stripped,
+    the same way the recovery questions compare them. Each key points to
+    the rows holding those details, which are then checked against the
+    Recovery Password. Like 'AccountIndex', a key with no rows triggers
+    a rebuild at most once every 'REBUILD_INTERVAL' seconds.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._keys = {}
+        self._built = False
+        self._built_at = 0.0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(user_location, user_email):
+        """
+        Returns the normalized index key for a location & email.
+        """
+        return (str(user_location).strip().upper(),
+                str(user_email).strip().lower())
+
+    def build(self):
+        """
+        Reads the Account Number & Recovery Backup columns in one batch
+        request & indexes every Account that has a complete backup.
+        """
+        columns = get_sheet_columns(["acc_num", "location", "email",
+                                     "recovery_pass"])
+        with self._lock:
+            self._rows = {}
+            self._keys = {}
+            for row_num, cells in enumerate(zip(*columns), start=2):
+                if all(cell.strip() for cell in cells):
+                    self._add(row_num, self.make_key(cells[1], cells[2]))
+            self._built = True
+            self._built_at = time.monotonic()
+
+    def _add(self, row_num, key):
+        """
+        Points 'key' at the row, removing the row's previous key.
+        """
+        old_key = self._keys.get(row_num)
+        if old_key is not None:
+            self._rows[old_key].discard(row_num)
+            if not self._rows[old_key]:
+                del self._rows[old_key]
+        self._rows.setdefault(key, set()).add(row_num)
+        self._keys[row_num] = key
+
+    def candidates(self, user_location, user_email):
+        """
+        Returns the row numbers holding the location & email.
+        """
+        if not self._built:
+            self.build()
+        with self._lock:
+            return sorted(self._rows.get(
+                self.make_key(user_location, user_email), ()))
+
+    def record_backup(self, row_num, user_location, user_email):
+        """
+        Indexes new Recovery Backup details written to a row.
+        """
+        if not self._built:
+            return
+        with self._lock:
+            self._add(row_num, self.make_key(user_location, user_email))
+
+    def find(self, user_location, user_email, user_recovery_pass):
+        """
+        Returns the Account Number whose Recovery Backup matches, or None.
+        If no row holds the location & email, the index is rebuilt once in
+        case another session has written the backup since it was built.
+        A wrong Recovery Password does not rebuild it.
+        """
+        # Loaded on first use so the Start Menu does not import asyncio.
+        from async_storage import fetch_rows
+
+        row_nums = self.candidates(user_location, user_email)
+        if (not row_nums and
+                time.monotonic() - self._built_at >= REBUILD_INTERVAL):
+            self.build()
+            row_nums = self.candidates(user_location, user_email)
+
+        # Every candidate row is read at once.
+        for row in fetch_rows(row_nums):
+            if (
+                self.make_key(row[6], row[7]) ==
+                self.make_key(user_location, user_email) and
+                str(user_recovery_pass).strip() == row[8].strip()
+            ):
+                return row[ACC_NUM_COL - 1]
+        return None
+
+
+def appended_row_number(response):
+    """
+    Returns the first row number an 'append_row' or 'append_rows' call
+    wrote to, taken from the updated range reported back by the worksheet.
+    """
+    updated_range = response["updates"]["updatedRange"].split("!")[-1]
+    return int(re.match(r"[A-Z]+(\d+)", updated_range).group(1))
+
+
+def get_account_index():
+    """
+    Returns the shared index over the 'accountlist' worksheet.
+    """
+    global _ACCOUNT_INDEX
+
+    if _ACCOUNT_INDEX is None:
+        _ACCOUNT_INDEX = AccountIndex(get_accountlist())
+    return _ACCOUNT_INDEX
+
+
+def get_recovery_index():
+    """
+    Returns the shared Recovery Backup index.
+    """
+    global _RECOVERY_INDEX
+
+    if _RECOVERY_INDEX is None:
+        _RECOVERY_INDEX = RecoveryIndex()
+    return _RECOVERY_INDEX
+
+
+def append_account_row(values):
+    """
+    Appends a row to the 'accountlist' worksheet & records it in the
+    index. Returns the row number written to.
+    """
+    response = get_accountlist().append_row(values)
+    row_num = appended_row_number(response)
+    get_account_index().record_append(row_num, values)
+    return row_num
+
+
+def append_account_rows(rows):
+    """
+    Appends several rows to the 'accountlist' worksheet in one request &
+    records them in the index. Returns the first row number written to.
+    """
+    response = get_accountlist().append_rows(rows)
+    first_row = appended_row_number(response)
+    account_index = get_account_index()
+    for row_num, values in enumerate(rows, start=first_row):
+        account_index.record_append(row_num, values)
+    return first_row
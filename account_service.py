@@ -0,0 +1,277 @@
+"""
+Account Service file.
+Runs the long-lived local service that every terminal session shares:
+
+-Owns the 'accountlist' worksheet, its read cache, the Account index
+ & the Sheets login.
+-Answers worksheet calls from session processes over a Unix socket.
+-Runs writes one at a time on a single worker thread, so writes from
+ every session are serialized in one place.
+-Runs reads on a pool of reader threads, served from the shared cache
+ & index, so they never wait behind a slow write.
+-Serves waiting writes from terminal sessions before those of bulk jobs.
+-Reports request & cache counters.
+
+Run from the project folder with:
+
+    python account_service.py [--socket eternity_service.sock] [--readers 8]
+
+and start sessions with 'ETERNITY_STORAGE=service'. The service's own
+backend is set with 'ETERNITY_SERVICE_STORAGE', either 'sheets'
+(default) or 'sqlite', and the reader threads with
+'ETERNITY_SERVICE_READERS'. Sessions then share one warm cache and one
+Sheets connection instead of each authorizing & reading on its own.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import asyncio
+import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, Style
+from service_client import READ_METHODS, service_socket_path
+from sheets_scheduler import INTERACTIVE, request_priority, scheduler_stats
+from storage import (VERSION_COL, get_accountlist, current_row_count,
+                     compare_and_set_row, compare_and_set_rows)
+from account_index import get_account_index, appended_row_number
+
+# Longest request line accepted, large enough for bulk 'append_rows'.
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+# Reader threads serving read calls at once.
+DEFAULT_READERS = 8
+
+# Worksheet calls passed straight on to the cached worksheet.
+WORKSHEET_CALLS = {"get_all_values", "row_values", "col_values",
+                   "batch_get", "append_row", "append_rows", "update_cell",
+                   "batch_update"}
+
+
+class AccountService:
+    """
+    Serves worksheet calls for every session on the machine.
+    Writes run on one worker thread, in priority order, so no two writes
+    ever run at the same time. Reads ('READ_METHODS') run on a pool of
+    reader threads next to them, so the event loop keeps accepting
+    requests & reads keep being answered while a slow write is in
+    progress.
+    """
+
+    def __init__(self, readers=DEFAULT_READERS):
+        self.counters = {"connections": 0, "requests": 0, "errors": 0}
+        self.started = time.time()
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix="storage")
+        self._readers = ThreadPoolExecutor(max_workers=max(1, readers),
+                                           thread_name_prefix="reader")
+        self._errors_lock = threading.Lock()
+        # Writes waiting for the worker, by priority then arrival.
+        self._queue = None
+        self._order = itertools.count()
+
+    def call(self, method, args):
+        """
+        Runs one call against the service's worksheet & returns its
+        result. Runs on the worker thread, or a reader thread for reads.
+        """
+        if method in WORKSHEET_CALLS:
+            result = getattr(get_accountlist(), method)(*args)
+            if method in ("append_row", "append_rows"):
+                # New Accounts are findable by 'row_of' straight away.
+                rows = args[0] if method == "append_rows" else [args[0]]
+                account_index = get_account_index()
+                for row_num, values in enumerate(
+                        rows, start=appended_row_number(result)):
+                    account_index.record_append(row_num, values)
+            return result
+        if method == "row_of":
+            return get_account_index().row_of(args[0])
+        if method == "compare_and_set":
+            row, updates, version_col, expected_version = args
+            if version_col != VERSION_COL:
+                raise ValueError(f"Version column must be {VERSION_COL}.")
+            return compare_and_set_row(
+                row, {int(col): value for col, value in updates.items()},
+                expected_version)
+        if method == "compare_and_set_rows":
+            changes, version_col = args
+            if version_col != VERSION_COL:
+                raise ValueError(f"Version column must be {VERSION_COL}.")
+            return compare_and_set_rows(
+                [(row, {int(col): value for col, value in updates.items()},
+                  expected_version)
+                 for row, updates, expected_version in changes])
+        if method == "row_count":
+            return current_row_count(get_accountlist(cached=False))
+        if method == "stats":
+            worksheet_stats = getattr(get_accountlist(), "stats", None)
+            return dict(self.counters,
+                        uptime=time.time() - self.started,
+                        cache=worksheet_stats() if worksheet_stats else None,
+                        scheduler=scheduler_stats())
+        raise ValueError(f"Unknown service method '{method}'.")
+
+    def _respond(self, request, priority):
+        """
+        Runs a decoded request & returns the response line. A request
+        line that could not be decoded is passed as it is, so the error
+        is sent back. Runs on the worker or a reader thread.
+        """
+        request_id = None
+        try:
+            if not isinstance(request, dict):
+                request = json.loads(request)
+            request_id = request.get("id")
+            with request_priority(priority):
+                result = self.call(request["method"],
+                                   request.get("args", []))
+            response = {"id": request_id, "result": result}
+        except Exception as error:
+            with self._errors_lock:
+                self.counters["errors"] += 1
+            message = (error.args[0] if isinstance(error, KeyError) and
+                       error.args else str(error))
+            response = {"id": request_id,
+                        "error": {"type": type(error).__name__,
+                                  "message": message}}
+        return (json.dumps(response) + "\n").encode("utf-8")
+
+    async def _run_calls(self):
+        """
+        Hands the waiting writes to the worker thread one at a time, the
+        highest priority first.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            priority, _, request, answer = await self._queue.get()
+            try:
+                answer.set_result(await loop.run_in_executor(
+                    self._executor, self._respond, request, priority))
+            except Exception as error:
+                answer.set_exception(error)
+
+    async def submit(self, line):
+        """
+        Runs one request line & returns its response line. Reads go
+        straight to a reader thread, the Sheets scheduler still serving
+        them by priority, while writes are queued for the worker.
+        """
+        try:
+            request = json.loads(line)
+            priority = int(request.get("priority", INTERACTIVE))
+            method = request.get("method")
+        except (ValueError, TypeError, AttributeError):
+            request, priority, method = line, INTERACTIVE, None
+        loop = asyncio.get_running_loop()
+        if method in READ_METHODS:
+            return await loop.run_in_executor(self._readers, self._respond,
+                                              request, priority)
+        answer = loop.create_future()
+        self._queue.put_nowait((priority, next(self._order), request,
+                                answer))
+        return await answer
+
+    async def handle_session(self, reader, writer):
+        """
+        Answers the requests of one session until it disconnects.
+        """
+        self.counters["connections"] += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.counters["requests"] += 1
+                response = await self.submit(line)
+                writer.write(response)
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path):
+        """
+        Listens on the Unix socket until SIGINT or SIGTERM.
+        """
+        remove_stale_socket(path)
+        # Opened on the worker before any reader can race to open it.
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, get_account_index)
+        self._queue = asyncio.PriorityQueue()
+        worker = asyncio.create_task(self._run_calls())
+        server = await asyncio.start_unix_server(self.handle_session, path,
+                                                 limit=MAX_REQUEST_BYTES)
+        # Only this user's sessions may connect.
+        os.chmod(path, 0o600)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+
+        print(Fore.GREEN + f"Account service listening on {path}."
+              + Style.RESET_ALL)
+        async with server:
+            await stop.wait()
+        worker.cancel()
+        os.unlink(path)
+        self._readers.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+
+
+def remove_stale_socket(path):
+    """
+    Removes a socket file left behind by a service that is no longer
+    running. Raises RuntimeError if a service is still listening on it.
+    """
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"A server is already listening on {path}.")
+
+
+def main(argv=None):
+    """
+    Command line entry point for the account service.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run the Eternity Holdings account service.")
+    parser.add_argument("--socket", default=service_socket_path(),
+                        help="Unix socket path to listen on")
+    parser.add_argument("--readers", type=int,
+                        default=int(os.environ.get("ETERNITY_SERVICE_READERS",
+                                                   DEFAULT_READERS)),
+                        help="read calls served at once")
+    args = parser.parse_args(argv)
+
+    backend = os.environ.get("ETERNITY_SERVICE_STORAGE", "sheets").lower()
+    if backend == "service":
+        print(Fore.RED + "The account service cannot use itself as its"
+              " storage." + Style.RESET_ALL)
+        return 1
+    os.environ["ETERNITY_STORAGE"] = backend
+
+    try:
+        asyncio.run(AccountService(args.readers).serve(args.socket))
+    except RuntimeError as error:
+        print(Fore.RED + str(error) + Style.RESET_ALL)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
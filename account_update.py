@@ -0,0 +1,194 @@
+"""
+Optimistic Account Update file.
+Lets many sessions change the same Account without losing updates:
+
+-Function that reads an Account row, computes the change & writes it
+ back only if no other session changed the row in between.
+-Retries a conflicting change with bounded, jittered backoff.
+-Function that changes many Accounts with one read & one write,
+ falling back to the single Account update for rows that conflicted.
+-Hands each written change with the row's new version to a ledger
+ callback, so entries are ordered by version & no lock is held across
+ the write.
+-Counts updates & conflicts so contention can be measured.
+
+Every browser connection runs its own 'run.py' process, so two sessions
+can read the same balance at once. Each row carries a version in the
+'Version' column and a write only succeeds if that version is unchanged,
+otherwise the row is read again & the change recomputed.
+Set 'ETERNITY_CONTENTION_REPORT=1' to print the counters on exit.
+"""
+
+import os
+import sys
+import time
+import atexit
+import random
+from storage import (ACCOUNT_HEADERS, VERSION_COL, column_letter,
+                     get_accountlist, row_version, compare_and_set_row,
+                     compare_and_set_rows)
+from account_index import get_account_index
+
+# Attempts made before a change is given up as conflicting.
+MAX_ATTEMPTS = 6
+
+# Backoff between attempts doubles from the base up to the cap, seconds.
+BACKOFF_BASE = 0.02
+BACKOFF_MAX = 0.5
+
+# Counters of this process's compare-and-set updates.
+CONTENTION = {"updates": 0, "conflicts": 0, "failures": 0}
+
+
+class UpdateConflict(Exception):
+    """
+    Raised when an Account row kept changing under every attempt.
+    """
+
+
+def update_account(acc_num, compute, record=None):
+    """
+    Applies a change to an Account row with compare-and-set.
+    'compute' is called with the current row contents and returns
+    ({column: new value}, result).
+
+    - If the row changed since it was read, the change is recomputed
+      from the new contents after a short backoff.
+    - If no updates are returned, nothing is written.
+    - If every attempt conflicts, UpdateConflict is raised.
+    - If 'record' is given, it is called with the result of the write &
+      the Version written to the row, once the row is written.
+
+    Returns the result of the 'compute' call that was written.
+    Raises ValueError if the Account Number is not found.
+    """
+    account_index = get_account_index()
+    row_num = account_index.row_of(acc_num)
+
+    for attempt in range(MAX_ATTEMPTS):
+        row = account_index.get_row(acc_num, fresh=True)
+        updates, result = compute(row)
+        if not updates:
+            return result
+
+        expected_version = row_version(row)
+        if compare_and_set_row(row_num, updates, expected_version):
+            CONTENTION["updates"] += 1
+            for col, value in updates.items():
+                account_index.record_update(row_num, col, value)
+            account_index.record_update(row_num, VERSION_COL,
+                                        expected_version + 1)
+            if record:
+                record(result, expected_version + 1)
+            return result
+
+        CONTENTION["conflicts"] += 1
+        # Full jitter keeps competing sessions from retrying in step.
+        time.sleep(random.uniform(0, min(BACKOFF_MAX,
+                                         BACKOFF_BASE * 2 ** attempt)))
+
+    CONTENTION["failures"] += 1
+    raise UpdateConflict(f"Account {acc_num} is being changed by another"
+                         " session.")
+
+
+def update_accounts(computes, record=None):
+    """
+    Applies changes to many Account rows with compare-and-set.
+    'computes' maps each Account Number to a function like the one
+    'update_account' takes. All rows are read in one request & every
+    change is written in one request.
+
+    - If 'record' is given, it is called with a list of (Account Number,
+      result, Version written) of the rows written, once they are.
+    - If a row changed since it was read, that Account alone is retried
+      with 'update_account'.
+    - If an Account Number is not found, its result is the ValueError.
+    - If an Account kept conflicting, its result is the UpdateConflict.
+
+    Returns {Account Number: result of its 'compute' call or error}.
+    """
+    account_index = get_account_index()
+    results = {}
+    row_nums = {}
+    for acc_num in computes:
+        try:
+            row_nums[acc_num] = account_index.row_of(acc_num)
+        except ValueError as error:
+            results[acc_num] = error
+
+    # One range per row, read past the cache so versions are current.
+    last_col = column_letter(len(ACCOUNT_HEADERS))
+    ranges = [f"A{row_num}:{last_col}{row_num}"
+              for row_num in row_nums.values()]
+    found = get_accountlist(cached=False).batch_get(ranges) if ranges else []
+
+    changes = []
+    pending = {}
+    for (acc_num, row_num), cells in zip(row_nums.items(), found):
+        row = list(cells[0]) if cells else []
+        row += [""] * (len(ACCOUNT_HEADERS) - len(row))
+        updates, result = computes[acc_num](row)
+        if not updates:
+            results[acc_num] = result
+            continue
+        changes.append((row_num, updates, row_version(row)))
+        pending[acc_num] = result
+
+    swapped = compare_and_set_rows(changes)
+    retry = []
+    written = []
+    for (acc_num, result), (row_num, updates, expected_version), swap in \
+            zip(pending.items(), changes, swapped):
+        if not swap:
+            CONTENTION["conflicts"] += 1
+            retry.append(acc_num)
+            continue
+        CONTENTION["updates"] += 1
+        for col, value in updates.items():
+            account_index.record_update(row_num, col, value)
+        account_index.record_update(row_num, VERSION_COL,
+                                    expected_version + 1)
+        results[acc_num] = result
+        written.append((acc_num, result, expected_version + 1))
+    if record and written:
+        record(written)
+
+    for acc_num in retry:
+        # The retried Account's entries are recorded on their own.
+        record_one = ((lambda result, version, acc_num=acc_num:
+                       record([(acc_num, result, version)]))
+                      if record else None)
+        try:
+            results[acc_num] = update_account(acc_num, computes[acc_num],
+                                              record_one)
+        except (ValueError, UpdateConflict) as error:
+            results[acc_num] = error
+    return results
+
+
+def contention_stats():
+    """
+    Returns the update & conflict counters with the share of attempts
+    that conflicted.
+    """
+    attempts = CONTENTION["updates"] + CONTENTION["conflicts"]
+    stats = dict(CONTENTION)
+    stats["conflict_rate"] = (CONTENTION["conflicts"] / attempts
+                              if attempts else 0.0)
+    return stats
+
+
+def _report_contention():
+    """
+    Prints the contention counters if any update was attempted.
+    """
+    stats = contention_stats()
+    if stats["updates"] or stats["conflicts"]:
+        print(f"Account updates: {stats['updates']}, conflicts:"
+              f" {stats['conflicts']} ({stats['conflict_rate']:.1%}),"
+              f" given up: {stats['failures']}.", file=sys.stderr)
+
+
+if os.environ.get("ETERNITY_CONTENTION_REPORT") == "1":
+    atexit.register(_report_contention)
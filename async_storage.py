@@ -0,0 +1,182 @@
+"""
+Async Account Storage file.
+Lets independent storage reads wait on the network at the same time:
+
+-Async versions of the 'accountlist' worksheet reads.
+-Coroutines that read many rows or Accounts with 'asyncio.gather'.
+-Sync facade running independent calls together for the terminal
+ menus & other code that is not async.
+
+gspread only has blocking calls, so on the Google Sheets backend each
+read runs on a worker thread of a shared pool and the coroutines wait
+for them together. An action then takes as long as its slowest read
+instead of the sum of all of them. The SQLite & account service
+backends answer in microseconds over a connection that belongs to one
+thread, so their reads run in place one after another.
+"""
+
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from storage import (ACCOUNT_HEADERS, SqliteWorksheet, ServiceWorksheet,
+                     get_accountlist)
+
+# Most Sheets requests in flight at once, below the HTTP connection
+# pool size of 10 so no request waits for a connection.
+FANOUT_WORKERS = 8
+
+# Holds the worker pool once it has been created by 'get_executor'.
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the shared pool that runs blocking Sheets calls.
+    """
+    global _EXECUTOR
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=FANOUT_WORKERS,
+                                           thread_name_prefix="fanout")
+    return _EXECUTOR
+
+
+def _reset_after_fork():
+    """
+    Forgets the worker pool in a forked child, as its threads do not
+    survive the fork. The child starts its own pool on first use.
+    """
+    global _EXECUTOR, _EXECUTOR_LOCK
+
+    _EXECUTOR = None
+    _EXECUTOR_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def runs_concurrently():
+    """
+    Returns True if storage calls wait on the network & are worth
+    running together, which is only the case for Google Sheets.
+    """
+    return not isinstance(get_accountlist(cached=False),
+                          (SqliteWorksheet, ServiceWorksheet))
+
+
+async def run_blocking(func, *args):
+    """
+    Runs a blocking storage call & returns its result. The call is made
+    on the worker pool if 'runs_concurrently', otherwise in place.
+    """
+    if not runs_concurrently():
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(),
+                                      functools.partial(func, *args))
+
+
+class AsyncAccountList:
+    """
+    Async reads of the 'accountlist' worksheet, through the same read
+    cache as the blocking reads.
+    """
+
+    def __init__(self, worksheet=None):
+        self.worksheet = worksheet or get_accountlist()
+
+    async def row_values(self, row):
+        """
+        Reads one row.
+        """
+        return await run_blocking(self.worksheet.row_values, row)
+
+    async def col_values(self, col):
+        """
+        Reads one column.
+        """
+        return await run_blocking(self.worksheet.col_values, col)
+
+    async def batch_get(self, ranges, major_dimension="ROWS"):
+        """
+        Reads several A1 ranges in one request.
+        """
+        return await run_blocking(self.worksheet.batch_get, ranges,
+                                  major_dimension)
+
+    async def get_all_values(self):
+        """
+        Reads the whole worksheet.
+        """
+        return await run_blocking(self.worksheet.get_all_values)
+
+
+def _padded(row):
+    """
+    Returns a row padded to the full width of the sheet.
+    """
+    return list(row) + [""] * (len(ACCOUNT_HEADERS) - len(row))
+
+
+async def read_rows(row_nums):
+    """
+    Reads several rows at once. Returns their contents in the order
+    given, padded to the full width of the sheet.
+    """
+    accountlist = AsyncAccountList()
+    rows = await asyncio.gather(*(accountlist.row_values(row_num)
+                                  for row_num in row_nums))
+    return [_padded(row) for row in rows]
+
+
+async def read_accounts(acc_nums):
+    """
+    Reads the rows of several Account Numbers at once, fresh from the
+    sheet. Returns their contents in the order given.
+    Raises ValueError if an Account Number is not found.
+    """
+    # Imported here as 'account_index' reads rows through this module.
+    from account_index import get_account_index
+
+    account_index = get_account_index()
+    return await asyncio.gather(*(
+        run_blocking(account_index.get_row, acc_num, True)
+        for acc_num in acc_nums))
+
+
+async def gather_calls(*calls):
+    """
+    Runs independent blocking calls, given as functions taking no
+    arguments, together & returns their results in order.
+    """
+    return list(await asyncio.gather(*(run_blocking(call)
+                                       for call in calls)))
+
+
+def fetch_all(*calls):
+    """
+    Sync facade of 'gather_calls' for code that is not async.
+    Calls run one after another when there is nothing to gain, as
+    starting an event loop costs more than a local read.
+    Raises RuntimeError if called from a running event loop, which
+    should await 'gather_calls' instead.
+    """
+    if len(calls) < 2 or not runs_concurrently():
+        return [call() for call in calls]
+    return asyncio.run(gather_calls(*calls))
+
+
+def fetch_rows(row_nums):
+    """
+    Sync facade of 'read_rows'.
+    """
+    row_nums = list(row_nums)
+    if len(row_nums) < 2 or not runs_concurrently():
+        worksheet = get_accountlist()
+        return [_padded(worksheet.row_values(row_num))
+                for row_num in row_nums]
+    return asyncio.run(read_rows(row_nums))
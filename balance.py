@@ -0,0 +1,179 @@
+"""
+Account Balance file.
+Contains the balance type used for every deposit, withdrawal
+and currency conversion:
+
+-Balance class holding an amount as whole minor units (e.g. cents).
+-Table of minor unit exponents for every supported currency.
+-Functions applying the deposit limit & withdrawal floor.
+
+Amounts are stored as integers so adding & subtracting never loses
+precision, and currencies without minor units (JPY) are formatted
+without decimals. Balances are kept in the sheet as text such as
+'EUR 123.45', which 'Balance.parse' reads and 'str()' writes.
+"""
+
+# Number of decimal places each currency's minor unit uses.
+CURRENCY_EXPONENTS = {
+    "EUR": 2,
+    "USD": 2,
+    "JPY": 0,
+    "GBP": 2,
+    "AUD": 2,
+    "CAD": 2,
+    "CHF": 2,
+    "CNY": 2,
+    "INR": 2,
+    "RUB": 2,
+    "BRL": 2,
+    "NOK": 2
+}
+
+# Largest balance an Account may hold, in major units of its currency.
+MAX_ACC_BAL = 100000
+
+
+def currency_exponent(currency):
+    """
+    Returns the minor unit exponent of a currency.
+    Raises ValueError for unsupported currencies.
+    """
+    try:
+        return CURRENCY_EXPONENTS[currency]
+    except KeyError:
+        raise ValueError(f"Unsupported currency '{currency}'.") from None
+
+
+def parse_minor(amount_str, exponent):
+    """
+    Converts a decimal amount string such as '13.15' to whole minor units.
+    Raises ValueError if the string is not a plain decimal number or has
+    more decimal places than the currency, other than trailing zeros.
+    """
+    amount_str = amount_str.strip()
+    sign = 1
+    if amount_str[:1] in ("-", "+"):
+        sign = -1 if amount_str[0] == "-" else 1
+        amount_str = amount_str[1:]
+
+    whole, _, fraction = amount_str.partition(".")
+    if (not (whole or fraction) or
+            not (whole.isascii() and fraction.isascii()) or
+            (whole and not whole.isdigit()) or
+            (fraction and not fraction.isdigit()) or
+            fraction[exponent:].strip("0")):
+        raise ValueError(f"Invalid amount '{amount_str}'.")
+
+    kept = fraction[:exponent].ljust(exponent, "0")
+    minor = int(whole or "0") * 10 ** exponent + int(kept or "0")
+    return sign * minor
+
+
+class Balance:
+    """
+    An amount of one currency held as whole minor units.
+    Balances of the same currency can be added, subtracted & compared.
+    """
+
+    __slots__ = ("minor", "currency")
+
+    def __init__(self, minor, currency):
+        currency_exponent(currency)
+        self.minor = int(minor)
+        self.currency = currency
+
+    @classmethod
+    def parse(cls, balance_str):
+        """
+        Reads a stored balance such as 'EUR 123.45'.
+        """
+        currency, amount_str = balance_str.split()
+        return cls(parse_minor(amount_str, currency_exponent(currency)),
+                   currency)
+
+    @classmethod
+    def from_amount(cls, amount_str, currency):
+        """
+        Reads a user entered amount such as '2' or '13.15' in
+        the given currency.
+        """
+        return cls(parse_minor(str(amount_str), currency_exponent(currency)),
+                   currency)
+
+    @property
+    def exponent(self):
+        """
+        Minor unit exponent of the balance currency.
+        """
+        return CURRENCY_EXPONENTS[self.currency]
+
+    def amount_str(self):
+        """
+        Returns the amount without currency, e.g. '123.45'.
+        """
+        exponent = self.exponent
+        sign = "-" if self.minor < 0 else ""
+        whole, fraction = divmod(abs(self.minor), 10 ** exponent)
+        if exponent == 0:
+            return f"{sign}{whole}"
+        return f"{sign}{whole}.{fraction:0{exponent}d}"
+
+    def __str__(self):
+        return f"{self.currency} {self.amount_str()}"
+
+    def __repr__(self):
+        return f"Balance({self.minor}, '{self.currency}')"
+
+    def _check_currency(self, other):
+        if self.currency != other.currency:
+            raise ValueError(f"Cannot combine {self.currency} with"
+                             f" {other.currency}.")
+
+    def __add__(self, other):
+        self._check_currency(other)
+        return Balance(self.minor + other.minor, self.currency)
+
+    def __sub__(self, other):
+        self._check_currency(other)
+        return Balance(self.minor - other.minor, self.currency)
+
+    def __eq__(self, other):
+        return (isinstance(other, Balance) and
+                (self.minor, self.currency) == (other.minor, other.currency))
+
+    def __lt__(self, other):
+        self._check_currency(other)
+        return self.minor < other.minor
+
+    def __hash__(self):
+        return hash((self.minor, self.currency))
+
+
+def max_balance(currency):
+    """
+    Returns the largest balance an Account may hold in a currency.
+    """
+    return Balance(MAX_ACC_BAL * 10 ** currency_exponent(currency), currency)
+
+
+def apply_deposit(current_bal, user_amount):
+    """
+    Adds a deposit to a balance, capped at 'MAX_ACC_BAL'.
+    Returns (new balance, excess that could not be deposited).
+    """
+    limit = max_balance(current_bal.currency)
+    new_bal = current_bal + user_amount
+    if limit < new_bal:
+        return limit, new_bal - limit
+    return new_bal, Balance(0, current_bal.currency)
+
+
+def apply_withdrawal(current_bal, user_amount):
+    """
+    Takes a withdrawal from a balance, stopping at zero.
+    Returns (new balance, sum that could not be withdrawn).
+    """
+    new_bal = current_bal - user_amount
+    if new_bal.minor < 0:
+        return Balance(0, current_bal.currency), user_amount - current_bal
+    return new_bal, Balance(0, current_bal.currency)
@@ -0,0 +1,423 @@
+"""
+Banking Service file.
+Holds every Account operation with no terminal input or output, so the
+terminal menus and any other front-end share the same rules:
+
+-Typed results returned by each operation.
+-Typed errors raised when an operation cannot be made.
+-Functions that open, authenticate & look up Accounts.
+-Functions that deposit, withdraw & convert balances.
+-Function applying the deposit & withdrawal rules to a balance alone,
+ for callers that store many changes together.
+-Functions that change the PIN & set or find the Recovery Backup.
+
+Nothing here calls 'input', 'print' or 'clear'. The menus in 'run.py',
+'acc_login.py', 'acc_creation.py' & 'acc_recovery.py' read the user's
+choices, call these functions and print what they return.
+"""
+
+import hmac
+import sqlite3
+import datetime
+from contextlib import contextmanager
+from collections import namedtuple
+from balance import Balance, apply_deposit, apply_withdrawal
+from storage import ACCOUNT_HEADERS
+from utils import check_input, validate_email, acc_pin_generator
+from acc_allocator import allocate_account_number
+from account_index import (get_account_index, get_recovery_index,
+                           append_account_row)
+from account_update import update_account, UpdateConflict
+from ledger import (get_ledger, record_deposit, record_withdrawal,
+                    record_conversion)
+
+# Youngest age an Account can be opened at.
+MINIMUM_AGE = 18
+
+# Currency every new Account starts in.
+OPENING_CURRENCY = "EUR"
+
+AccountDetails = namedtuple("AccountDetails", [
+    "first_name", "last_name", "acc_num", "pin_num", "date_of_birth",
+    "balance", "location", "email", "recovery_pass"])
+
+NewAccount = namedtuple("NewAccount", ["acc_num", "pin_num", "balance"])
+
+# 'adjustment' is the part of 'amount' that could not be applied: the
+# excess over the balance limit of a deposit, or the shortfall of a
+# withdrawal larger than the balance.
+BalanceChange = namedtuple("BalanceChange", ["previous", "balance", "amount",
+                                             "adjustment"])
+
+Conversion = namedtuple("Conversion", ["previous", "balance",
+                                       "rates_version"])
+
+
+class BankError(Exception):
+    """
+    Base of every error raised by the banking service.
+    """
+
+
+class AccountNotFound(BankError):
+    """
+    Raised when no Account matches the given details.
+    """
+
+
+class LoginFailed(BankError):
+    """
+    Raised when login details do not match an Account. Does not say
+    which detail was wrong.
+    """
+
+
+class InvalidDetails(BankError):
+    """
+    Raised for a name, date of birth or email in the wrong format.
+    """
+
+
+class Underage(BankError):
+    """
+    Raised when opening an Account for someone under 'MINIMUM_AGE'.
+    """
+
+
+class InvalidAmount(BankError):
+    """
+    Raised for an amount that is badly formatted, negative or in
+    another currency than the Account.
+    """
+
+
+class UnsupportedCurrency(BankError):
+    """
+    Raised when converting to a currency missing from the rate table.
+    """
+
+
+class CorruptBalance(BankError):
+    """
+    Raised when the balance stored for an Account cannot be read, such
+    as a malformed or legacy balance cell.
+    """
+
+
+class AccountBusy(BankError):
+    """
+    Raised when another session kept changing the Account, so the
+    operation was not made.
+    """
+
+
+class LedgerUnavailable(BankError):
+    """
+    Raised when the ledger stayed locked or could not be written. The
+    change was made to the Account, the ledger records it as a SYNC on
+    the Account's next change.
+    """
+
+
+def get_age(date_of_birth):
+    """
+    Calculates age in years from a date of birth in the format
+    (YYYY-MM-DD). Raises ValueError if the date is incorrectly formatted.
+    """
+    # Formats User Date Input
+    birth_date = datetime.datetime.strptime(date_of_birth, "%Y-%m-%d").date()
+    # Collects Current Date
+    current_date = datetime.date.today()
+    # Calculates Age by subtracting User Input with Current Date
+    return current_date.year - birth_date.year - (
+        (current_date.month, current_date.day) <
+        (birth_date.month, birth_date.day))
+
+
+def stored_balance(row):
+    """
+    Returns the Balance stored in a sheet row.
+    Raises CorruptBalance if the balance cell cannot be read.
+    """
+    cell = row[5] if len(row) > 5 else ""
+    try:
+        return Balance.parse(cell)
+    except ValueError:
+        raise CorruptBalance(f"The balance '{cell}' of Account"
+                             f" {row[2] if len(row) > 2 else ''} cannot"
+                             " be read.") from None
+
+
+def _details(row):
+    """
+    Returns the AccountDetails of a sheet row.
+    Raises CorruptBalance if its balance cannot be read.
+    """
+    row = list(row) + [""] * (len(ACCOUNT_HEADERS) - len(row))
+    return AccountDetails(row[0], row[1], row[2], row[3], row[4],
+                          stored_balance(row), row[6], row[7], row[8])
+
+
+@contextmanager
+def _ledger_write():
+    """
+    Raises LedgerUnavailable for a ledger write that fails in the block.
+    """
+    try:
+        yield
+    except sqlite3.Error as error:
+        raise LedgerUnavailable("The change was made but could not be"
+                                f" recorded in the ledger: {error}") from None
+
+
+def record_changes(records):
+    """
+    Records many balance changes in one ledger transaction, as
+    'Ledger.record_many'. Raises LedgerUnavailable if the ledger cannot
+    be written.
+    """
+    with _ledger_write():
+        return get_ledger().record_many(records)
+
+
+def _update(acc_num, compute, record=None):
+    """
+    Runs 'update_account', raising the service's own errors.
+    """
+    try:
+        get_account_index().row_of(acc_num)
+    except ValueError:
+        raise AccountNotFound(f"Account {acc_num} not found.") from None
+    try:
+        return update_account(acc_num, compute, record)
+    except UpdateConflict as error:
+        raise AccountBusy(str(error)) from None
+
+
+def get_account(acc_num):
+    """
+    Returns the current AccountDetails of an Account.
+    Raises AccountNotFound if there is no such Account, or
+    CorruptBalance if its balance cannot be read.
+    """
+    try:
+        row = get_account_index().get_row(str(acc_num).strip(), fresh=True)
+    except ValueError:
+        raise AccountNotFound(f"Account {acc_num} not found.") from None
+    return _details(row)
+
+
+def get_balance(acc_num):
+    """
+    Returns the current Balance of an Account.
+    Raises AccountNotFound if there is no such Account, or
+    CorruptBalance if its balance cannot be read.
+    """
+    return get_account(acc_num).balance
+
+
+def authenticate(first_name, last_name, acc_num, pin_num):
+    """
+    Checks login details against the Account's row. Names are compared
+    upper-cased, as the terminal stores them.
+    Returns the AccountDetails if every detail matches.
+    Raises LoginFailed otherwise, including for unknown Accounts.
+    Raises CorruptBalance only once the details matched, so it does not
+    reveal which Accounts exist.
+    """
+    try:
+        row = get_account_index().get_row(str(acc_num).strip(), fresh=True)
+    except ValueError:
+        raise LoginFailed("The details do not match any Account.") from None
+    row = list(row) + [""] * (len(ACCOUNT_HEADERS) - len(row))
+
+    # Each value is compared in constant time so the PIN check does not
+    # reveal how many leading digits were correct.
+    matches = [
+        hmac.compare_digest(str(first_name).upper().encode(),
+                            row[0].encode()),
+        hmac.compare_digest(str(last_name).upper().encode(),
+                            row[1].encode()),
+        hmac.compare_digest(str(acc_num).encode(), row[2].encode()),
+        hmac.compare_digest(str(pin_num).encode(), row[3].encode())
+    ]
+    if not all(matches):
+        raise LoginFailed("The details do not match any Account.")
+    return _details(row)
+
+
+def open_account(first_name, last_name, date_of_birth):
+    """
+    Opens a new Account with an empty Euro balance, a unique Account
+    Number & a random PIN. Returns the NewAccount.
+
+    - If a name is empty or holds special characters, or the date is
+      not in the format (YYYY-MM-DD), raises InvalidDetails.
+    - If the holder is under 'MINIMUM_AGE', raises Underage.
+    """
+    for name in (first_name, last_name):
+        problem = check_input(str(name))
+        if problem:
+            raise InvalidDetails(problem)
+    try:
+        age = get_age(date_of_birth)
+    except ValueError:
+        raise InvalidDetails(f"The date '{date_of_birth}' is not in the"
+                             " format YYYY-MM-DD.") from None
+    if age < MINIMUM_AGE:
+        raise Underage(f"Account holders must be {MINIMUM_AGE} or older.")
+
+    # Reserves a random unused 9 digit number.
+    acc_num = allocate_account_number()
+    pin_num = acc_pin_generator()
+    balance = Balance(0, OPENING_CURRENCY)
+    append_account_row([first_name.upper(), last_name.upper(), acc_num,
+                        pin_num, date_of_birth, str(balance)])
+    return NewAccount(acc_num, pin_num, balance)
+
+
+def apply_amount(current_bal, amount, add=True):
+    """
+    Applies a deposit, or a withdrawal if 'add' is False, to a balance
+    without storing it & returns the BalanceChange. The amount is given
+    as a Balance or as a number string in the balance's currency.
+    Raises InvalidAmount.
+    """
+    if isinstance(amount, Balance):
+        user_amount = amount
+    else:
+        try:
+            user_amount = Balance.from_amount(str(amount),
+                                              current_bal.currency)
+        except ValueError as error:
+            raise InvalidAmount(str(error)) from None
+    if user_amount.currency != current_bal.currency:
+        raise InvalidAmount(f"The Account is held in"
+                            f" {current_bal.currency}.")
+    if user_amount.minor < 0:
+        raise InvalidAmount("The amount cannot be negative.")
+
+    if add:
+        new_bal, adjustment = apply_deposit(current_bal, user_amount)
+    else:
+        new_bal, adjustment = apply_withdrawal(current_bal, user_amount)
+    return BalanceChange(current_bal, new_bal, user_amount, adjustment)
+
+
+def _change_balance(acc_num, amount, add):
+    """
+    Deposits or withdraws an amount & records it in the ledger.
+    """
+    def apply_row(row):
+        change = apply_amount(stored_balance(row), amount, add)
+        return {6: str(change.balance)}, change
+
+    def record(change, version):
+        # Recorded once the sheet holds the new balance.
+        with _ledger_write():
+            if add:
+                record_deposit(acc_num, change.previous, change.amount,
+                               change.adjustment, version)
+            else:
+                record_withdrawal(acc_num, change.previous, change.amount,
+                                  change.adjustment, version)
+
+    return _update(acc_num, apply_row, record)
+
+
+def deposit(acc_num, amount):
+    """
+    Deposits an amount into an Account & returns the BalanceChange.
+    A deposit taking the balance over the limit is capped, with the part
+    not deposited returned as the adjustment.
+    Raises InvalidAmount, AccountNotFound, AccountBusy or CorruptBalance,
+    or LedgerUnavailable once the change is made.
+    """
+    return _change_balance(acc_num, amount, add=True)
+
+
+def withdraw(acc_num, amount):
+    """
+    Withdraws an amount from an Account & returns the BalanceChange.
+    A withdrawal larger than the balance empties it, with the part not
+    withdrawn returned as the adjustment.
+    Raises InvalidAmount, AccountNotFound, AccountBusy or CorruptBalance,
+    or LedgerUnavailable once the change is made.
+    """
+    return _change_balance(acc_num, amount, add=False)
+
+
+def convert(acc_num, to_currency):
+    """
+    Converts an Account's balance to another currency & returns the
+    Conversion with the version of the rates used. Converting to the
+    Account's own currency changes nothing.
+    Raises UnsupportedCurrency, AccountNotFound, AccountBusy or
+    CorruptBalance, or LedgerUnavailable once the change is made.
+    """
+    # Rates are only loaded once a conversion is asked for.
+    from currency import get_rate_table, convert_balance
+
+    to_currency = str(to_currency).strip().upper()
+    if to_currency not in get_rate_table().index:
+        raise UnsupportedCurrency(f"The currency '{to_currency}' is not"
+                                  " supported.")
+
+    def convert_row(row):
+        previous = stored_balance(row)
+        new_bal, rates_version = convert_balance(previous, to_currency)
+        updates = {6: str(new_bal)} if new_bal != previous else {}
+        return updates, Conversion(previous, new_bal, rates_version)
+
+    def record(conversion, version):
+        with _ledger_write():
+            record_conversion(acc_num, conversion.previous,
+                              conversion.balance, conversion.rates_version,
+                              version)
+
+    # Only a changed balance is written & recorded.
+    return _update(acc_num, convert_row, record)
+
+
+def change_pin(acc_num):
+    """
+    Gives an Account a new random PIN & returns it.
+    Raises AccountNotFound or AccountBusy.
+    """
+    new_pin_num = acc_pin_generator()
+    _update(acc_num, lambda row: ({4: new_pin_num}, None))
+    return new_pin_num
+
+
+def set_recovery_backup(acc_num, user_location, user_email,
+                        user_recovery_pass):
+    """
+    Stores an Account's Recovery Backup details: Country of Residence,
+    Email & Recovery Password.
+    Raises InvalidDetails for a badly formatted email or empty details,
+    AccountNotFound or AccountBusy.
+    """
+    if not validate_email(user_email):
+        raise InvalidDetails(f"The Email {user_email} is not the correct"
+                             " format.")
+    if not str(user_location).strip() or not user_recovery_pass:
+        raise InvalidDetails("Every Recovery Backup detail is needed.")
+
+    acc_num = str(acc_num).strip()
+    _update(acc_num, lambda row: ({7: user_location, 8: user_email,
+                                   9: user_recovery_pass}, None))
+    get_recovery_index().record_backup(get_account_index().row_of(acc_num),
+                                       user_location, user_email)
+
+
+def find_recovery_backup(user_location, user_email, user_recovery_pass):
+    """
+    Finds the Account whose Recovery Backup matches & returns its
+    AccountDetails. Raises AccountNotFound if none matches, or
+    CorruptBalance if its balance cannot be read.
+    """
+    acc_num = get_recovery_index().find(user_location, user_email,
+                                        user_recovery_pass)
+    if acc_num is None:
+        raise AccountNotFound("No Account matches the Recovery details.")
+    return get_account(acc_num)
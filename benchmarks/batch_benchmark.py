@@ -0,0 +1,143 @@
+"""
+Batch Transactions Benchmark file.
+Applies the same transaction file to two copies of a local SQLite
+account table, once line by line through the 'banking' service as the
+menus do and once with 'acc_batch', and compares their speed & results.
+
+Run from the project folder with:
+
+    python -m benchmarks.batch_benchmark [accounts] [transactions]
+
+Accounts default to 1000 & transactions to 5000. Exits with 1 if the
+two runs end with different balances or the batch run is not faster.
+"""
+
+import os
+import csv
+import sys
+import time
+import random
+import tempfile
+
+os.environ["ETERNITY_STORAGE"] = "sqlite"
+
+import storage  # noqa: E402
+import ledger  # noqa: E402
+import account_index  # noqa: E402
+from banking import deposit, withdraw, convert, BankError  # noqa: E402
+from acc_batch import process_transactions  # noqa: E402
+
+DEFAULT_ACCOUNTS = 1000
+DEFAULT_TRANSACTIONS = 5000
+
+# Share of the transactions that are conversions.
+CONVERT_SHARE = 0.02
+
+
+def write_transactions(path, acc_nums, count):
+    """
+    Writes a random transaction file & returns its lines.
+    """
+    rng = random.Random(22)
+    lines = []
+    for _ in range(count):
+        acc_num = rng.choice(acc_nums)
+        if rng.random() < CONVERT_SHARE:
+            lines.append([acc_num, "CONVERT", "",
+                          rng.choice(["EUR", "USD", "GBP"])])
+        else:
+            lines.append([acc_num, rng.choice(["DEPOSIT", "WITHDRAW"]),
+                          f"{rng.randint(1, 500000) / 100:.2f}", ""])
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["acc_num", "type", "amount", "currency"])
+        writer.writerows(lines)
+    return lines
+
+
+def use_database(folder, name):
+    """
+    Points the storage & ledger at a fresh database pair.
+    """
+    os.environ["ETERNITY_SQLITE_PATH"] = os.path.join(folder, f"{name}.db")
+    os.environ["ETERNITY_LEDGER_PATH"] = os.path.join(folder,
+                                                      f"{name}_ledger.db")
+    storage._ACCOUNTLIST = storage._RAW_ACCOUNTLIST = None
+    account_index._ACCOUNT_INDEX = None
+    ledger._LEDGER = None
+
+
+def create_accounts(acc_nums):
+    """
+    Adds the benchmark Accounts to the current database.
+    """
+    storage.get_accountlist().append_rows(
+        [["BENCH", "USER", acc_num, "1234", "1990-01-01", "EUR 100.00"]
+         for acc_num in acc_nums])
+
+
+def balances():
+    """
+    Returns the balance column of the current database.
+    """
+    return storage.get_sheet_columns(["acc_num", "balance"])
+
+
+def run_line_by_line(lines):
+    """
+    Applies each line with the banking service. Returns seconds taken.
+    """
+    start = time.perf_counter()
+    for acc_num, kind, amount, currency in lines:
+        try:
+            if kind == "CONVERT":
+                convert(acc_num, currency)
+            elif kind == "DEPOSIT":
+                deposit(acc_num, amount)
+            else:
+                withdraw(acc_num, amount)
+        except BankError:
+            pass
+    return time.perf_counter() - start
+
+
+def main(accounts, transactions):
+    """
+    Runs the benchmark, prints the results & returns 1 on a regression.
+    """
+    acc_nums = [str(100000000 + num) for num in range(accounts)]
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "transactions.csv")
+        lines = write_transactions(path, acc_nums, transactions)
+
+        use_database(folder, "single")
+        create_accounts(acc_nums)
+        single_seconds = run_line_by_line(lines)
+        single_balances = balances()
+
+        use_database(folder, "batch")
+        create_accounts(acc_nums)
+        batch_seconds = process_transactions(path)["seconds"]
+        batch_balances = balances()
+
+    print(f"{transactions} transactions over {accounts} Accounts.")
+    print(f"Line by line: {single_seconds:.2f} s"
+          f" ({transactions / single_seconds:.0f} transactions/s).")
+    print(f"Batch:        {batch_seconds:.2f} s"
+          f" ({transactions / batch_seconds:.0f} transactions/s).")
+
+    failed = False
+    if single_balances != batch_balances:
+        print("- The batch run ended with different balances.")
+        failed = True
+    if batch_seconds >= single_seconds:
+        print("- The batch run was not faster.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1
+                  else DEFAULT_ACCOUNTS,
+                  int(sys.argv[2]) if len(sys.argv) > 2
+                  else DEFAULT_TRANSACTIONS))
@@ -0,0 +1,116 @@
+"""
+Fan-out Benchmark file.
+Shows that independent reads through 'async_storage' take as long as
+the slowest read instead of the sum of them all.
+
+No Google Sheets access is needed: an in-memory worksheet that sleeps
+for a fixed latency on every read stands in for the network, & is
+treated as a Sheets worksheet by 'async_storage'. Reads go through the
+same read cache as the app's, which must also send one request for
+reads of the same row made at the same time. Run from the project
+folder with:
+
+    python -m benchmarks.fanout_benchmark [reads] [latency ms]
+
+Reads default to 8 & latency to 50 ms. At most 'FANOUT_WORKERS' reads
+are in flight at once, so more reads run in waves. Exits with 1 if
+reading the rows together takes longer than 'ALLOWED_FACTOR' times one
+read per wave.
+"""
+
+import sys
+import time
+
+import storage
+from sheet_cache import CachedWorksheet
+from async_storage import FANOUT_WORKERS, fetch_all, fetch_rows
+
+DEFAULT_READS = 8
+DEFAULT_LATENCY_MS = 50
+
+# Slowest allowed fan-out, as a multiple of one read per wave.
+ALLOWED_FACTOR = 1.5
+
+
+class SlowWorksheet:
+    """
+    In-memory worksheet answering each read after a fixed delay.
+    """
+
+    def __init__(self, rows, latency):
+        self.rows = rows
+        self.latency = latency
+        self.reads = 0
+
+    def row_values(self, row):
+        self.reads += 1
+        time.sleep(self.latency)
+        return list(self.rows[row - 1])
+
+
+def main(reads, latency_ms):
+    """
+    Runs the benchmark, prints the results & returns 1 on a regression.
+    """
+    latency = latency_ms / 1000
+    rows = [storage.ACCOUNT_HEADERS] + [
+        ["BENCH", "USER", str(100000000 + num), "1234", "1990-01-01",
+         "EUR 10.00"] for num in range(reads)]
+    worksheet = SlowWorksheet(rows, latency)
+    cached = CachedWorksheet(worksheet)
+    storage._RAW_ACCOUNTLIST = worksheet
+    storage._ACCOUNTLIST = cached
+    row_nums = list(range(2, reads + 2))
+
+    start = time.perf_counter()
+    in_turn = [worksheet.row_values(row_num) for row_num in row_nums]
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    together = fetch_rows(row_nums)
+    fanned_out = time.perf_counter() - start
+
+    cached.clear()
+    start = time.perf_counter()
+    called = fetch_all(*(lambda row_num=row_num:
+                         cached.row_values(row_num)
+                         for row_num in row_nums))
+    calls = time.perf_counter() - start
+
+    # The same row read by every call at once.
+    cached.clear()
+    worksheet.reads = 0
+    start = time.perf_counter()
+    same = fetch_all(*(lambda: cached.row_values(2) for _ in row_nums))
+    collapsed = time.perf_counter() - start
+    same_reads = worksheet.reads
+
+    print(f"{reads} reads at {latency_ms} ms each:")
+    print(f"One after another:   {sequential * 1000:.1f} ms.")
+    print(f"fetch_rows together: {fanned_out * 1000:.1f} ms.")
+    print(f"fetch_all together:  {calls * 1000:.1f} ms.")
+    print(f"Same row {reads} times: {collapsed * 1000:.1f} ms,"
+          f" {same_reads} worksheet read(s).")
+
+    waves = -(-reads // FANOUT_WORKERS)
+    allowed = waves * latency * ALLOWED_FACTOR
+    failed = False
+    if [row[:6] for row in together] != in_turn or called != in_turn:
+        print("- The rows read together differ from the rows read in turn.")
+        failed = True
+    if same != [in_turn[0]] * reads or same_reads != 1:
+        print("- Reads of the same row at once were not sent as one.")
+        failed = True
+    for name, elapsed in (("fetch_rows", fanned_out), ("fetch_all", calls),
+                          ("same row", collapsed)):
+        if elapsed > allowed:
+            print(f"- {name} took longer than the allowed"
+                  f" {allowed * 1000:.1f} ms.")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_READS,
+                  int(sys.argv[2]) if len(sys.argv) > 2
+                  else DEFAULT_LATENCY_MS))
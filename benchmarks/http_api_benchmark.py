@@ -0,0 +1,207 @@
+"""
+HTTP API Benchmark file.
+Starts 'http_api.py' against a local SQLite account table and sends
+balance requests from many concurrent keep-alive clients:
+
+-Reports requests per second with median & p99 latency.
+-Fails if any request errors or a client's connection was not kept
+ open between its requests.
+-Has every client deposit to the same Account at once, so the API's
+ workers conflict & back off, then checks no deposit was lost.
+
+Run from the project folder with:
+
+    python -m benchmarks.http_api_benchmark [clients] [requests]
+
+Clients default to 20, each sending 200 requests on one connection
+& 'DEPOSITS' deposits. Exits with 1 on a regression.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+import subprocess
+import http.client
+from statistics import median
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CLIENTS = 20
+DEFAULT_REQUESTS = 200
+
+# Seconds the server may take to start listening.
+START_TIMEOUT = 15
+
+# Deposits of 1.00 sent by each client to the shared Account.
+DEPOSITS = 20
+
+LOGIN = {"first_name": "BENCH", "last_name": "USER", "acc_num": "100000001",
+         "pin_num": "1234"}
+
+# Adds the benchmark Account to the SQLite table before the server starts.
+CREATE_ACCOUNT = """
+import storage
+storage.get_accountlist().append_row(
+    ["BENCH", "USER", "100000001", "1234", "1990-01-01", "EUR 10.00"])
+"""
+
+
+def free_port():
+    """
+    Returns a local port nothing is listening on.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_for_server(port):
+    """
+    Waits until the server accepts connections.
+    """
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), 0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("The HTTP API did not start.")
+
+
+def run_client(port, count, latencies, problems):
+    """
+    Sends 'count' balance requests on one keep-alive connection.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    body = json.dumps(LOGIN)
+    first_sock = None
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            conn.request("POST", "/balance", body,
+                         {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                problems.append(f"Request answered {response.status}.")
+                return
+            first_sock = first_sock or conn.sock
+            if conn.sock is not first_sock:
+                problems.append("A keep-alive connection was closed.")
+                return
+    except (OSError, http.client.HTTPException) as error:
+        problems.append(f"Request failed: {error!r}")
+    finally:
+        conn.close()
+
+
+def run_depositor(port, count, problems):
+    """
+    Deposits 1.00 'count' times, sending a deposit again if the Account
+    was busy with another worker.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    body = json.dumps(dict(LOGIN, amount="1.00"))
+    try:
+        sent = 0
+        while sent < count:
+            conn.request("POST", "/deposit", body,
+                         {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                sent += 1
+            elif response.status != 409:
+                problems.append(f"Deposit answered {response.status}.")
+                return
+    except (OSError, http.client.HTTPException) as error:
+        problems.append(f"Deposit failed: {error!r}")
+    finally:
+        conn.close()
+
+
+def read_balance(port):
+    """
+    Returns the benchmark Account's balance.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("POST", "/balance", json.dumps(LOGIN),
+                     {"Content-Type": "application/json"})
+        return json.loads(conn.getresponse().read())["balance"]
+    finally:
+        conn.close()
+
+
+def run_threads(target, clients, *args):
+    """
+    Runs 'target' on 'clients' threads at once & returns the seconds
+    taken.
+    """
+    threads = [threading.Thread(target=target, args=args)
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main(clients, requests):
+    """
+    Runs the benchmark, prints the results & returns 1 on a regression.
+    """
+    port = free_port()
+    with tempfile.TemporaryDirectory() as folder:
+        env = dict(os.environ, ETERNITY_STORAGE="sqlite",
+                   ETERNITY_SQLITE_PATH=os.path.join(folder, "accounts.db"),
+                   ETERNITY_LEDGER_PATH=os.path.join(folder, "ledger.db"))
+        subprocess.run([sys.executable, "-c", CREATE_ACCOUNT],
+                       cwd=PROJECT_DIR, env=env, check=True)
+        server = subprocess.Popen(
+            [sys.executable, "http_api.py", "--port", str(port)],
+            cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL)
+        try:
+            wait_for_server(port)
+            latencies, problems = [], []
+            elapsed = run_threads(run_client, clients, port, requests,
+                                  latencies, problems)
+            deposit_time = run_threads(run_depositor, clients, port,
+                                       DEPOSITS, problems)
+            final_bal = read_balance(port)
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    print(f"{len(latencies)} requests from {clients} keep-alive clients in"
+          f" {elapsed:.2f} s ({len(latencies) / elapsed:.0f} requests/s).")
+    if latencies:
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"Latency: median {median(latencies) * 1000:.1f} ms,"
+              f" p99 {p99 * 1000:.1f} ms.")
+    print(f"{clients * DEPOSITS} deposits to one Account in"
+          f" {deposit_time:.2f} s, final balance {final_bal}.")
+    expected_bal = f"EUR {10 + clients * DEPOSITS:.2f}"
+    if final_bal != expected_bal:
+        problems.append(f"The final balance should be {expected_bal}.")
+
+    if problems:
+        for problem in sorted(set(problems)):
+            print(f"- {problem}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1
+                  else DEFAULT_CLIENTS,
+                  int(sys.argv[2]) if len(sys.argv) > 2
+                  else DEFAULT_REQUESTS))
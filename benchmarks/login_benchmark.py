@@ -0,0 +1,100 @@
+"""
+Login Benchmark file.
+Measures 'login_acc_checker' against local SQLite account tables of
+growing size to show login latency stays flat as customers are added.
+
+Run from the project folder with:
+
+    python -m benchmarks.login_benchmark [sizes...]
+
+Sizes default to 1000, 10000, 100000 & 1000000 Accounts. Each table is
+created in a temporary folder and removed afterwards.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+os.environ["ETERNITY_STORAGE"] = "sqlite"
+
+import storage  # noqa: E402
+import account_index  # noqa: E402
+from acc_login import login_acc_checker  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+LOGINS_PER_SIZE = 2000
+
+
+def fill_accounts(path, size):
+    """
+    Creates a SQLite account table holding 'size' Accounts and returns
+    their (first name, last name, Account Number, PIN) details.
+    """
+    worksheet = storage.SqliteWorksheet(path)
+    accounts = []
+    rows = []
+    for row_num in range(2, size + 2):
+        details = (f"FIRST{row_num}", f"LAST{row_num}",
+                   str(100000000 + row_num), str(1000 + row_num % 9000))
+        accounts.append(details)
+        rows.append((row_num, json.dumps(list(details) +
+                                         ["1990-01-01", "EUR 0.00"])))
+    with worksheet._conn:
+        worksheet._conn.executemany(
+            "INSERT INTO sheet_rows (row_num, cells) VALUES (?, ?)", rows)
+    return accounts
+
+
+def reset_storage(path):
+    """
+    Points the storage & index modules at a new SQLite file.
+    """
+    os.environ["ETERNITY_SQLITE_PATH"] = path
+    storage._ACCOUNTLIST = None
+    account_index._ACCOUNT_INDEX = None
+
+
+def run_size(size):
+    """
+    Times index warm-up & 'LOGINS_PER_SIZE' logins for one table size.
+    Returns (warm-up seconds, median login seconds, p99 login seconds).
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "accounts.db")
+        accounts = fill_accounts(path, size)
+        reset_storage(path)
+
+        start = time.perf_counter()
+        account_index.get_account_index().build()
+        warm_up = time.perf_counter() - start
+
+        timings = []
+        for details in random.choices(accounts, k=LOGINS_PER_SIZE):
+            start = time.perf_counter()
+            if not login_acc_checker(*details):
+                raise RuntimeError(f"Login failed for {details}.")
+            timings.append(time.perf_counter() - start)
+
+        reset_storage("")
+        timings.sort()
+        return (warm_up, timings[len(timings) // 2],
+                timings[int(len(timings) * 0.99)])
+
+
+def main(sizes):
+    """
+    Runs the benchmark for every size and prints a results table.
+    """
+    print(f"{'Accounts':>10} {'Warm-up ms':>11} {'Median us':>10}"
+          f" {'p99 us':>8}")
+    for size in sizes:
+        warm_up, median, p99 = run_size(size)
+        print(f"{size:>10} {warm_up * 1000:>11.1f} {median * 1e6:>10.1f}"
+              f" {p99 * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,156 @@
+"""
+Navigation Benchmark file.
+Drives the terminal menus through a long scripted session against a
+local SQLite account table to show a session runs in constant stack
+depth & memory however many menus it passes through.
+
+Run from the project folder with:
+
+    python -m benchmarks.navigation_benchmark [transitions]
+
+Transitions default to 100000. The session repeatedly logs in, checks
+the balance, opens the Deposit, Withdraw & More Options menus and logs
+out again. Exits with 1 if the stack grew, memory kept growing or the
+session ended before every transition ran. The project has no test
+suite, so this is the check that the menus run in constant stack depth.
+"""
+
+import os
+import sys
+import time
+import builtins
+import tempfile
+import itertools
+import tracemalloc
+
+os.environ["ETERNITY_STORAGE"] = "sqlite"
+
+import storage  # noqa: E402
+import run  # noqa: E402
+from navigation import run_screens, START_MENU  # noqa: E402
+
+DEFAULT_TRANSITIONS = 100000
+
+# Memory the session may still gain after warming up, in bytes.
+MEMORY_ALLOWANCE = 256 * 1024
+
+# Share of the transitions run before memory is first measured.
+WARM_UP_SHARE = 0.1
+
+
+class SessionFinished(Exception):
+    """
+    Raised to end the scripted session after the last transition.
+    """
+
+
+def session_script(acc_num, pin_num):
+    """
+    Returns the user input of one login to log out round trip.
+    """
+    return ["LOGIN", "PROCEED", "BENCH", "USER", acc_num, pin_num,
+            "BALANCE",
+            "DEPOSIT", "EXIT",
+            "WITHDRAW", "EXIT",
+            "MORE OPTIONS", "RETURN",
+            "LOG OUT", "NO",
+            "LOG OUT", "YES"]
+
+
+def stack_depth():
+    """
+    Returns the number of frames on the current stack.
+    """
+    frame, depth = sys._getframe(1), 0
+    while frame is not None:
+        frame, depth = frame.f_back, depth + 1
+    return depth
+
+
+def run_session(transitions):
+    """
+    Runs the scripted session for 'transitions' screen changes.
+    Returns (seconds, screens shown, stack depths seen, memory after
+    warm up, memory at the end).
+    """
+    depths = set()
+    memory = []
+    shown = [0]
+    count = itertools.count(1)
+    warm_up = int(transitions * WARM_UP_SHARE)
+
+    def counted(screen):
+        def show(**session):
+            done = next(count)
+            if done > transitions:
+                raise SessionFinished
+            shown[0] = done
+            if done == warm_up:
+                memory.append(tracemalloc.get_traced_memory()[0])
+            depths.add(stack_depth())
+            return screen(**session)
+        return show
+
+    screens = {name: counted(screen) for name, screen in run.SCREENS.items()}
+    start = time.perf_counter()
+    try:
+        run_screens(screens, START_MENU)
+    except SessionFinished:
+        pass
+    elapsed = time.perf_counter() - start
+    memory.append(tracemalloc.get_traced_memory()[0])
+    return elapsed, shown[0], depths, memory[0], memory[-1]
+
+
+def main(transitions):
+    """
+    Runs the benchmark, prints the results & returns 1 on a regression.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        os.environ["ETERNITY_SQLITE_PATH"] = os.path.join(folder,
+                                                          "accounts.db")
+        acc_num, pin_num = "100000001", "1234"
+        storage.get_accountlist().append_row(
+            ["BENCH", "USER", acc_num, pin_num, "1990-01-01", "EUR 10.00"])
+
+        script = itertools.cycle(session_script(acc_num, pin_num))
+        real_input, real_system, real_stdout = (builtins.input, os.system,
+                                                sys.stdout)
+        builtins.input = lambda prompt="": next(script)
+        # 'clear' would start a shell for every screen.
+        os.system = lambda command: 0
+        tracemalloc.start()
+        try:
+            with open(os.devnull, "w") as devnull:
+                sys.stdout = devnull
+                (elapsed, shown, depths, warm_memory,
+                 end_memory) = run_session(transitions)
+        finally:
+            tracemalloc.stop()
+            builtins.input, os.system, sys.stdout = (real_input, real_system,
+                                                     real_stdout)
+            storage.get_accountlist(cached=False)._conn.close()
+
+    print(f"{shown} menu transitions in {elapsed:.2f} s"
+          f" ({shown / elapsed:.0f} per second).")
+    print(f"Stack depth: {min(depths)} to {max(depths)} frames.")
+    print(f"Traced memory: {warm_memory / 1024:.1f} KiB after warm up,"
+          f" {end_memory / 1024:.1f} KiB at the end.")
+
+    failed = False
+    if shown < transitions:
+        print(f"- The session ended after {shown} of {transitions}"
+              " transitions.")
+        failed = True
+    if len(depths) > 1:
+        print("- The stack grew during the session.")
+        failed = True
+    if end_memory - warm_memory > MEMORY_ALLOWANCE:
+        print("- Memory kept growing during the session.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1
+                  else DEFAULT_TRANSITIONS))
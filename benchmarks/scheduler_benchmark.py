@@ -0,0 +1,205 @@
+"""
+Scheduler Benchmark file.
+Checks the Sheets request scheduler without Google Sheets access, using
+a fake call that answers like gspread does:
+
+-Requests are sent no faster than the quota once the burst is used.
+-Interactive requests waiting for a token go before background ones.
+-Rate limited (429) requests are retried after a backoff, server
+ errors are not retried for appends, & requests that stay rate limited
+ raise SheetsUnavailable.
+-Token waits are counted for each priority.
+
+Run from the project folder with:
+
+    python -m benchmarks.scheduler_benchmark [quota per minute]
+
+The quota defaults to 6000 requests per minute so the run takes about
+a second. Exits with 1 on a regression.
+"""
+
+import sys
+import time
+import threading
+
+import sheets_scheduler
+from sheets_scheduler import (INTERACTIVE, BACKGROUND, MAX_RETRIES,
+                              RequestScheduler, SheetsUnavailable,
+                              request_priority)
+
+DEFAULT_QUOTA = 6000
+
+# Requests sent in the rate check, after the burst.
+RATE_REQUESTS = 50
+
+# Slowest & fastest allowed rate check, as multiples of the quota time.
+ALLOWED_SLOWER = 1.5
+ALLOWED_FASTER = 0.9
+
+# Requests of each priority in the ordering check.
+WAITING_REQUESTS = 5
+
+
+class FakeResponse:
+    """
+    Stands in for the HTTP response held by a gspread APIError.
+    """
+
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = ({"Retry-After": retry_after}
+                        if retry_after is not None else {})
+
+
+class APIError(Exception):
+    """
+    Stands in for gspread's APIError, found by its name.
+    """
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, retry_after)
+
+
+class FlakyCall:
+    """
+    Fails with the given statuses in turn, then returns "ok".
+    """
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.statuses:
+            status = self.statuses.pop(0)
+            raise APIError(status, "0" if status == 429 else None)
+        return "ok"
+
+
+def check_rate(quota, problems):
+    """
+    Sends requests past the burst & checks they keep to the quota.
+    """
+    scheduler = RequestScheduler(quota)
+    count = scheduler.capacity + RATE_REQUESTS
+    start = time.perf_counter()
+    for _ in range(count):
+        scheduler.call(lambda: None)
+    elapsed = time.perf_counter() - start
+    expected = RATE_REQUESTS / scheduler.rate
+    print(f"{count} requests at {quota:.0f} per minute: {elapsed:.2f} s"
+          f" (quota allows {expected:.2f} s after the burst).")
+    if elapsed < expected * ALLOWED_FASTER:
+        problems.append("Requests were sent faster than the quota.")
+    if elapsed > expected * ALLOWED_SLOWER:
+        problems.append("Requests were sent much slower than the quota.")
+
+
+def check_priority(quota, problems):
+    """
+    Queues background requests, then interactive ones, on an empty
+    bucket & checks every interactive request is sent first.
+    Returns the scheduler for its counters.
+    """
+    scheduler = RequestScheduler(quota, burst=1)
+    scheduler._tokens = 0.0
+    sent = []
+
+    def send(priority):
+        with request_priority(priority):
+            scheduler.call(sent.append, priority)
+
+    threads = [threading.Thread(target=send, args=(BACKGROUND,))
+               for _ in range(WAITING_REQUESTS)]
+    for thread in threads:
+        thread.start()
+    # Lets the background requests join the queue first.
+    time.sleep(0.2 / scheduler.rate)
+    interactive = [threading.Thread(target=send, args=(INTERACTIVE,))
+                   for _ in range(WAITING_REQUESTS)]
+    for thread in interactive:
+        thread.start()
+    for thread in threads + interactive:
+        thread.join()
+
+    order = "".join("I" if priority == INTERACTIVE else "B"
+                    for priority in sent)
+    print(f"Order sent (I interactive, B background): {order}.")
+    if order != "I" * WAITING_REQUESTS + "B" * WAITING_REQUESTS:
+        problems.append("Background requests were sent before waiting"
+                        " interactive ones.")
+    return scheduler
+
+
+def check_retries(problems):
+    """
+    Checks rate limited & failing requests are retried or given up on.
+    """
+    scheduler = RequestScheduler(60000, burst=100)
+
+    flaky = FlakyCall([429, 429, 503])
+    if scheduler.call(flaky) != "ok" or flaky.calls != 4:
+        problems.append("A throttled read was not retried until it"
+                        " worked.")
+
+    append = FlakyCall([503])
+    try:
+        scheduler.call(append, idempotent=False)
+        problems.append("An append was retried after a server error.")
+    except APIError:
+        pass
+
+    throttled = FlakyCall([429] * (MAX_RETRIES + 1))
+    try:
+        scheduler.call(throttled)
+        problems.append("A request rate limited on every try did not raise"
+                        " SheetsUnavailable.")
+    except SheetsUnavailable:
+        if throttled.calls != MAX_RETRIES + 1:
+            problems.append("A rate limited request was not tried"
+                            f" {MAX_RETRIES + 1} times.")
+
+    try:
+        scheduler.call(FlakyCall([404]))
+        problems.append("A 404 was retried or hidden.")
+    except APIError:
+        pass
+
+    counters = scheduler.stats()["interactive"]
+    print(f"Retries: {counters['retries']} ({counters['throttled']} rate"
+          f" limited, {counters['server_errors']} server errors), given up:"
+          f" {counters['failures']}.")
+    if counters["retries"] != 3 + MAX_RETRIES:
+        problems.append("The retries were not counted.")
+
+
+def main(quota):
+    """
+    Runs the benchmark, prints the results & returns 1 on a regression.
+    """
+    problems = []
+    # Keeps the backoff short so the retries run quickly.
+    sheets_scheduler.BACKOFF_BASE = 0.001
+
+    check_rate(quota, problems)
+    scheduler = check_priority(quota, problems)
+    check_retries(problems)
+
+    for name, stats in scheduler.stats().items():
+        print(f"{name.capitalize()} token wait: mean"
+              f" {stats['wait_mean'] * 1000:.1f} ms, p95"
+              f" {stats['wait_p95'] * 1000:.1f} ms, max"
+              f" {stats['wait_max'] * 1000:.1f} ms.")
+        if stats["requests"] != WAITING_REQUESTS or not stats["wait_max"]:
+            problems.append(f"The {name} token waits were not counted.")
+
+    for problem in problems:
+        print(f"- {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1
+                  else DEFAULT_QUOTA))
@@ -0,0 +1,177 @@
+"""
+Startup Benchmark file.
+Measures how long 'run.py' takes to show the Start Menu, against a local
+SQLite account table so no Google Sheets access is needed:
+
+-Times each start from launching the interpreter to the first prompt.
+-Breaks the import time down by module with '-X importtime'.
+-Fails if start up touches the network or loads a module that is only
+ meant to be loaded once a menu needs it.
+-Fails if the median start is slower than a saved baseline allows.
+
+Run from the project folder with:
+
+    python -m benchmarks.startup_benchmark [--runs 10] [--top 15]
+        [--baseline startup_baseline.json [--save]]
+
+'--save' writes the measured times to the baseline file, later runs
+given the same file report a regression when the median time to the
+Start Menu grows by more than '--tolerance'. Exits with 1 on any
+regression.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Text of the first prompt of the Start Menu.
+MENU_PROMPT = b"Enter here:"
+
+# Seconds a single start may take before the run is abandoned.
+START_TIMEOUT = 30
+
+# Modules the Start Menu must not need, each loaded only by the menu
+# or job that uses it.
+LAZY_MODULES = ("gspread", "google.auth", "google.oauth2", "requests",
+                "numpy", "pprint", "currency", "argparse", "asyncio")
+
+# Started with '-c', records network use through an audit hook and then
+# starts the program as 'python run.py' would.
+STARTER = """
+import sys
+
+def report_network(event, args):
+    if event in ("socket.connect", "socket.getaddrinfo"):
+        sys.stderr.write(f"network: {event} {args[1:]!r}\\n")
+
+sys.addaudithook(report_network)
+import run
+run.main()
+"""
+
+
+def start_once(env):
+    """
+    Starts the program once & stops it at the first prompt.
+    Returns (seconds to the prompt, stderr output).
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", STARTER],
+        cwd=PROJECT_DIR, env=env, stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output = b""
+    try:
+        while MENU_PROMPT not in output:
+            chunk = process.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError("The program exited before the Start"
+                                   " Menu was shown.")
+            output += chunk
+            if time.perf_counter() - start > START_TIMEOUT:
+                raise RuntimeError("The Start Menu took too long to show.")
+        elapsed = time.perf_counter() - start
+    finally:
+        process.kill()
+        _, errors = process.communicate()
+    return elapsed, errors.decode("utf-8", "replace")
+
+
+def parse_import_times(errors):
+    """
+    Reads '-X importtime' output into {module: (self us, cumulative us)}.
+    """
+    timings = {}
+    for line in errors.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def find_regressions(errors, timings):
+    """
+    Returns a message for each module loaded too early & each attempt
+    to use the network during start up.
+    """
+    problems = [line for line in errors.splitlines()
+                if line.startswith("network:")]
+    for name in LAZY_MODULES:
+        if name in timings:
+            problems.append(f"'{name}' is imported before the Start Menu.")
+    return problems
+
+
+def main(argv=None):
+    """
+    Runs the benchmark & prints the results. Returns 1 on a regression.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the time 'run.py' takes to show the Start Menu.")
+    parser.add_argument("--runs", type=int, default=10,
+                        help="number of starts to time")
+    parser.add_argument("--top", type=int, default=15,
+                        help="slowest imports to list")
+    parser.add_argument("--baseline", help="baseline results file")
+    parser.add_argument("--save", action="store_true",
+                        help="write this run's results to the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slow down over the baseline, 0.25"
+                        " is 25%%")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        env = dict(os.environ, ETERNITY_STORAGE="sqlite",
+                   ETERNITY_SQLITE_PATH=os.path.join(folder, "accounts.db"),
+                   ETERNITY_LEDGER_PATH=os.path.join(folder, "ledger.db"),
+                   TERM=os.environ.get("TERM", "dumb"))
+        # The first start creates the database & fills bytecode caches.
+        start_once(env)
+        results = [start_once(env) for _ in range(args.runs)]
+
+    menu_times = sorted(elapsed for elapsed, _ in results)
+    menu_median = median(menu_times)
+    errors = results[-1][1]
+    timings = parse_import_times(errors)
+
+    print(f"Time to Start Menu over {args.runs} runs: median"
+          f" {menu_median * 1000:.1f} ms, best {menu_times[0] * 1000:.1f} ms,"
+          f" worst {menu_times[-1] * 1000:.1f} ms.")
+    print(f"\n{'Module':<40} {'Self ms':>8} {'Total ms':>9}")
+    slowest = sorted(timings.items(), key=lambda item: item[1][1],
+                     reverse=True)
+    for name, (self_us, cumulative_us) in slowest[:args.top]:
+        print(f"{name:<40} {self_us / 1000:>8.1f}"
+              f" {cumulative_us / 1000:>9.1f}")
+
+    problems = find_regressions(errors, timings)
+    if args.baseline and args.save:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({"menu_median": menu_median}, file, indent=2)
+        print(f"\nBaseline saved to {args.baseline}.")
+    elif args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            allowed = json.load(file)["menu_median"] * (1 + args.tolerance)
+        if menu_median > allowed:
+            problems.append(f"Median time to Start Menu"
+                            f" {menu_median * 1000:.1f} ms is over the"
+                            f" allowed {allowed * 1000:.1f} ms.")
+
+    if problems:
+        print("\nRegressions:")
+        for problem in problems:
+            print(f"- {problem}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
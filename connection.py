@@ -0,0 +1,134 @@
+"""
+Google Sheets Connection file.
+Holds the one shared connection to the 'Eternity Holdings' spreadsheet:
+
+-Function that authorizes the gspread client on first use.
+-Function that opens the spreadsheet on first use.
+-Function that opens & remembers worksheets by title, with every
+ request sent through the 'sheets_scheduler'.
+-Function that reports how long connection setup took.
+-Gives forked session processes their own HTTP connections.
+
+Nothing here touches the network at import time. Every handle is created
+the first time it is asked for and reused by every module afterwards.
+Set 'ETERNITY_CONNECTION_REPORT=1' to print the setup timings as each
+handle is created.
+"""
+
+import os
+import time
+import threading
+from sheets_scheduler import ScheduledWorksheet, schedule
+
+SCOPE = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.file",
+    "https://www.googleapis.com/auth/drive"
+    ]
+
+CREDS_FILE = 'creds.json'
+SPREADSHEET_NAME = 'Eternity Holdings'
+
+# Seconds spent creating each connection handle, keyed by step name.
+CONNECTION_TIMINGS = {}
+
+_LOCK = threading.RLock()
+_CLIENT = None
+_SPREADSHEET = None
+_WORKSHEETS = {}
+
+
+def _timed(step, func, *args):
+    """
+    Calls 'func', records how long it took under 'step' and
+    returns its result.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    CONNECTION_TIMINGS[step] = time.perf_counter() - start
+
+    if os.environ.get("ETERNITY_CONNECTION_REPORT") == "1":
+        print(f"Connection setup '{step}' took"
+              f" {CONNECTION_TIMINGS[step] * 1000:.1f} ms.")
+    return result
+
+
+def _authorize():
+    """
+    Reads the service account credentials & authorizes gspread.
+    """
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_file(CREDS_FILE)
+    scoped_creds = creds.with_scopes(SCOPE)
+    return gspread.authorize(scoped_creds)
+
+
+def _reset_after_fork():
+    """
+    Swaps the HTTP connection pools of a forked child for new ones.
+    The authorized client & opened handles are kept, but the parent's
+    open sockets must not be shared, or two processes would read each
+    other's responses.
+    """
+    global _LOCK
+
+    _LOCK = threading.RLock()
+    if _CLIENT is not None:
+        from requests.adapters import HTTPAdapter
+
+        session = _CLIENT.http_client.session
+        for prefix in list(session.adapters):
+            session.mount(prefix, HTTPAdapter())
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client():
+    """
+    Returns the shared gspread client, authorizing it on the first call.
+    """
+    global _CLIENT
+
+    with _LOCK:
+        if _CLIENT is None:
+            _CLIENT = _timed("authorize", _authorize)
+        return _CLIENT
+
+
+def get_spreadsheet():
+    """
+    Returns the shared 'Eternity Holdings' spreadsheet handle,
+    opening it on the first call.
+    """
+    global _SPREADSHEET
+
+    with _LOCK:
+        if _SPREADSHEET is None:
+            client = get_client()
+            _SPREADSHEET = _timed("open_spreadsheet", schedule,
+                                  client.open, SPREADSHEET_NAME)
+        return _SPREADSHEET
+
+
+def get_worksheet(title):
+    """
+    Returns the worksheet with the given title. The worksheet metadata
+    is only fetched the first time each title is asked for.
+    """
+    with _LOCK:
+        if title not in _WORKSHEETS:
+            spreadsheet = get_spreadsheet()
+            _WORKSHEETS[title] = ScheduledWorksheet(_timed(
+                f"worksheet:{title}", schedule, spreadsheet.worksheet,
+                title))
+        return _WORKSHEETS[title]
+
+
+def connection_setup_time():
+    """
+    Returns the total seconds spent setting up the connection so far.
+    """
+    return sum(CONNECTION_TIMINGS.values())
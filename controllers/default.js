@@ -15,8 +15,11 @@ function socket() {
 
     this.on('open', function (client) {
 
-        // Spawn terminal
-        client.tty = Pty.spawn('python3', ['run.py'], {
+        // Spawn terminal, attached to a warm pooled session when the
+        // session server (session_server.py) is in use.
+        var script = process.env.ETERNITY_SESSION_POOL === '1' ?
+            'session_attach.py' : 'run.py';
+        client.tty = Pty.spawn('python3', [script], {
             name: 'xterm-color',
             cols: 80,
             rows: 24,
@@ -0,0 +1,351 @@
+"""
+Currency file.
+Holds the supported currencies & converts balances between them:
+
+-Establishes the built-in dictionary of currency names & rates.
+-Read-only, versioned rate tables loaded from a rates file.
+-Watcher thread that picks up rates file changes without a restart.
+-Function converting one balance between currencies.
+-Function converting whole arrays of balances in one NumPy pass.
+
+Rates are given per Euro and read from 'rates.json', or the file set
+with 'ETERNITY_RATES_PATH'. Every cross rate is kept as an exact
+fraction, so a conversion is a single table lookup & rounds half up to
+the new currency's minor unit exactly, whether one balance or a whole
+portfolio is converted. Each conversion returns the version of the
+rate table it used.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from types import MappingProxyType
+from fractions import Fraction
+from balance import Balance, CURRENCY_EXPONENTS
+
+DEFAULT_RATES_PATH = "rates.json"
+
+# Seconds between checks of the rates file for changes.
+RATES_CHECK_INTERVAL = 1.0
+
+# Version of the built-in rates, used when no rates file exists.
+BUILTIN_RATES_VERSION = "builtin"
+
+# Manual Money Conversion Rates.
+CONVERSION_RATES = {
+    "EUR": 1.0,  # Euro
+    "USD": 1.19,  # United States Dollar
+    "JPY": 130.76,  # Japanese Yen
+    "GBP": 0.87,  # British Pound Sterling
+    "AUD": 1.55,  # Austrailian Dollar
+    "CAD": 1.48,  # Canadian Dollar
+    "CHF": 1.10,  # Swiss Franc
+    "CNY": 7.75,  # Chinese Yuan
+    "INR": 89.09,  # Indian Rupee
+    "RUB": 92.86,  # Russian Ruple
+    "BRL": 6.64,  # Brazilian Real
+    "NOK": 10.45  # Norwegian Krone
+}
+
+CURRENCY_NAMES = {
+    "EUR": "European Euro",
+    "USD": "United States Dollar",
+    "JPY": "Japanese Yen",
+    "GBP": "British Pound Sterling",
+    "AUD": "Australian Dollar",
+    "CAD": "Canadian Dollar",
+    "CHF": "Swiss Franc",
+    "CNY": "Chinese Yuan",
+    "INR": "Indian Rupee",
+    "RUB": "Russian Ruble",
+    "BRL": "Brazilian Real",
+    "NOK": "Norwegian Krone"
+}
+
+# Holds the rate table in use & the rates file state it was read from.
+_RATE_TABLE = None
+_RATES_STAMP = None
+_RATES_WATCHER = None
+_RELOAD_LOCK = threading.Lock()
+
+# Holds the NumPy copy of a table's cross rates once 'convert_bulk'
+# has built it, as (rate table, arrays).
+_CROSS_RATE_ARRAYS = (None, None)
+
+
+class RateTable:
+    """
+    A read-only set of exchange rates with its version.
+    Entry [from][to] of the cross-rate table is the exact number of
+    minor units of 'to' given for one minor unit of 'from', so a
+    conversion needs no trip through Euro and no scaling between
+    currencies with different minor units.
+
+    Tables are never changed once built. A new rates file produces a
+    new table, so a conversion always sees one consistent set of rates.
+    """
+
+    __slots__ = ("version", "rates", "names", "codes", "index",
+                 "cross_rates", "pairs")
+
+    def __init__(self, rates, names, version):
+        exact = {}
+        for code, rate in rates.items():
+            if code not in CURRENCY_EXPONENTS:
+                raise ValueError(f"Unsupported currency '{code}'.")
+            exact[code] = Fraction(str(rate))
+            if exact[code] <= 0:
+                raise ValueError(f"Rate for {code} must be above zero.")
+
+        codes = tuple(exact)
+        cross_rates = tuple(
+            tuple(exact[to_code] / exact[from_code] *
+                  Fraction(10) ** (CURRENCY_EXPONENTS[to_code] -
+                                   CURRENCY_EXPONENTS[from_code])
+                  for to_code in codes)
+            for from_code in codes)
+        values = {
+            "version": str(version),
+            "rates": MappingProxyType(dict(rates)),
+            "names": MappingProxyType({code: names.get(code, code)
+                                       for code in codes}),
+            "codes": codes,
+            "index": MappingProxyType({code: i
+                                       for i, code in enumerate(codes)}),
+            "cross_rates": cross_rates,
+            # Same rates keyed by currency code, pairs[from][to], so a
+            # lookup costs two dict gets like the old per-Euro rates.
+            "pairs": MappingProxyType({
+                from_code: MappingProxyType(dict(zip(codes, row)))
+                for from_code, row in zip(codes, cross_rates)})
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Rate tables are read-only.")
+
+    def __repr__(self):
+        return f"RateTable(version='{self.version}')"
+
+    def cross_rate(self, from_currency, to_currency):
+        """
+        Returns the minor unit cross rate between two currencies.
+        Raises KeyError for currencies missing from the table.
+        """
+        return self.pairs[from_currency][to_currency]
+
+
+def load_rate_table(path):
+    """
+    Reads a rates file into a RateTable. The file is a JSON object:
+
+        {"version": "2024-06-01",
+         "rates": {"EUR": 1.0, "USD": 1.19, ...},
+         "names": {"EUR": "European Euro", ...}}
+
+    'names' is optional. Without a 'version' the table is versioned by
+    a hash of the file contents. Raises ValueError for a malformed file.
+    """
+    with open(path, "rb") as file:
+        content = file.read()
+
+    data = json.loads(content)
+    if not isinstance(data, dict) or not isinstance(data.get("rates"), dict):
+        raise ValueError("The rates file needs a 'rates' object.")
+
+    version = data.get("version")
+    if version is None:
+        version = hashlib.sha256(content).hexdigest()[:12]
+    names = dict(CURRENCY_NAMES)
+    names.update(data.get("names") or {})
+    return RateTable(data["rates"], names, version)
+
+
+def rates_path():
+    """
+    Returns the path of the rates file.
+    """
+    return os.environ.get("ETERNITY_RATES_PATH", DEFAULT_RATES_PATH)
+
+
+def reload_rate_table():
+    """
+    Loads the rates file if it changed since it was last read & makes
+    the new table the one in use. Returns the table in use.
+
+    - If the file is missing, the built-in rates are used.
+    - If the file cannot be read, the table in use is kept.
+    - If the watcher thread is not running yet, it is started.
+    """
+    global _RATE_TABLE, _RATES_STAMP, _RATES_WATCHER
+
+    with _RELOAD_LOCK:
+        path = rates_path()
+        try:
+            status = os.stat(path)
+            stamp = (status.st_mtime_ns, status.st_size)
+        except FileNotFoundError:
+            stamp = None
+
+        if _RATES_WATCHER is None:
+            _RATES_WATCHER = threading.Thread(target=_watch_rates_file,
+                                              name="rates-watcher",
+                                              daemon=True)
+            _RATES_WATCHER.start()
+
+        if _RATE_TABLE is not None and stamp == _RATES_STAMP:
+            return _RATE_TABLE
+
+        if stamp is None:
+            table = RateTable(CONVERSION_RATES, CURRENCY_NAMES,
+                              BUILTIN_RATES_VERSION)
+        else:
+            try:
+                table = load_rate_table(path)
+            except (OSError, ValueError) as error:
+                print(f"Could not load rates from {path}: {error}",
+                      file=sys.stderr)
+                table = _RATE_TABLE or RateTable(
+                    CONVERSION_RATES, CURRENCY_NAMES, BUILTIN_RATES_VERSION)
+
+        # Readers pick up the new table with their next lookup.
+        _RATE_TABLE = table
+        _RATES_STAMP = stamp
+        return table
+
+
+def _watch_rates_file():
+    """
+    Checks the rates file for changes every 'RATES_CHECK_INTERVAL'
+    seconds for the life of the process.
+    """
+    while True:
+        time.sleep(RATES_CHECK_INTERVAL)
+        reload_rate_table()
+
+
+def _reset_after_fork():
+    """
+    Forgets the rate table in a forked child, as the watcher thread
+    does not survive the fork. The child loads & watches on first use.
+    """
+    global _RATE_TABLE, _RATES_STAMP, _RATES_WATCHER, _RELOAD_LOCK
+
+    _RATE_TABLE = None
+    _RATES_STAMP = None
+    _RATES_WATCHER = None
+    _RELOAD_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_rate_table():
+    """
+    Returns the rate table in use. The first call loads the rates file
+    & starts a watcher thread that swaps in a new table whenever the
+    file changes, so long running sessions pick up new rates without a
+    restart and readers never wait on a reload.
+    """
+    table = _RATE_TABLE
+    if table is None:
+        table = reload_rate_table()
+    return table
+
+
+def round_half_up(numerator, denominator):
+    """
+    Divides two integers, rounding halves away from zero.
+    """
+    whole = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return -whole if numerator < 0 else whole
+
+
+def convert_balance(current_bal, requested_convert, table=None):
+    """
+    Converts a balance to another currency with one cross-rate lookup,
+    rounding half up to the new currency's minor unit.
+    Returns (new balance, version of the rates used).
+    Raises KeyError for unsupported currencies.
+    """
+    table = table or get_rate_table()
+    if current_bal.currency == requested_convert:
+        return current_bal, table.version
+
+    rate = table.pairs[current_bal.currency][requested_convert]
+    return Balance(round_half_up(current_bal.minor * rate.numerator,
+                                 rate.denominator),
+                   requested_convert), table.version
+
+
+def _cross_rate_arrays(np, table):
+    """
+    Returns a table's cross rates as NumPy numerator & denominator
+    arrays, building them the first time the table is used.
+    """
+    global _CROSS_RATE_ARRAYS
+
+    built_for, arrays = _CROSS_RATE_ARRAYS
+    if built_for is not table:
+        arrays = (
+            np.array([[rate.numerator for rate in row]
+                      for row in table.cross_rates], dtype=np.int64),
+            np.array([[rate.denominator for rate in row]
+                      for row in table.cross_rates], dtype=np.int64))
+        _CROSS_RATE_ARRAYS = (table, arrays)
+    return arrays
+
+
+def currency_indices(currencies, table=None):
+    """
+    Returns the cross-rate table positions of a list of currency codes.
+    Raises KeyError for unsupported currencies.
+    """
+    index = (table or get_rate_table()).index
+    return [index[code] for code in currencies]
+
+
+def convert_bulk(minor_amounts, from_currency, to_currency, table=None):
+    """
+    Converts an array of balances, in whole minor units, in one
+    vectorized pass. 'from_currency' & 'to_currency' may each be a
+    single currency code or a sequence of codes, one per balance, so
+    accounts held in mixed currencies can be revalued together.
+
+    Each result is rounded half up exactly as 'convert_balance' rounds.
+    Returns (NumPy int64 array of new amounts, version of the rates used).
+    """
+    # Imported here so the terminal app never loads NumPy.
+    import numpy as np
+
+    table = table or get_rate_table()
+    amounts = np.asarray(minor_amounts, dtype=np.int64)
+    from_index = np.asarray(
+        table.index[from_currency] if isinstance(from_currency, str)
+        else currency_indices(from_currency, table), dtype=np.intp)
+    to_index = np.asarray(
+        table.index[to_currency] if isinstance(to_currency, str)
+        else currency_indices(to_currency, table), dtype=np.intp)
+
+    numerators, denominators = _cross_rate_arrays(np, table)
+    numerator = amounts * numerators[from_index, to_index]
+    denominator = denominators[from_index, to_index]
+
+    whole = (2 * np.abs(numerator) + denominator) // (2 * denominator)
+    return np.where(numerator < 0, -whole, whole), table.version
+
+
+def revalue_balances(balance_strs, to_currency, table=None):
+    """
+    Reads stored balances such as 'EUR 123.45' & converts all of them to
+    one currency with 'convert_bulk'.
+    Returns (new minor unit amounts, version of the rates used).
+    """
+    balances = [Balance.parse(balance_str) for balance_str in balance_strs]
+    return convert_bulk([bal.minor for bal in balances],
+                        [bal.currency for bal in balances], to_currency,
+                        table)
@@ -0,0 +1,391 @@
+"""
+HTTP API file.
+Serves the banking operations as JSON over HTTP, next to the terminal:
+
+-Endpoints for login check, balance, deposit, withdraw & conversion,
+ each calling the same 'banking' functions as the terminal menus.
+-HTTP/1.1 keep-alive, so a client can send many requests on one
+ connection, and many connections served at once by one process.
+-Runs the blocking storage calls on a pool of worker threads, so a
+ slow or retried Sheets call only holds up its own request.
+-Limits failed logins per Account, as PINs are only 4 digits.
+
+Run from the project folder with:
+
+    python http_api.py [--host 127.0.0.1] [--port 8001] [--workers 8]
+
+The host, port & worker threads can also be set with
+'ETERNITY_API_HOST', 'ETERNITY_API_PORT' and 'ETERNITY_API_WORKERS'.
+Writes to one Account from different workers are kept apart by the
+row version checks in 'banking'. Every request is a POST with a JSON
+body holding the login details 'first_name', 'last_name', 'acc_num' &
+'pin_num', checked on each request as there are no sessions:
+
+    POST /login                              -> the Account holder
+    POST /balance                            -> the balance
+    POST /deposit   + {"amount": "13.15"}    -> the balance change
+    POST /withdraw  + {"amount": "13.15"}    -> the balance change
+    POST /convert   + {"currency": "USD"}    -> the conversion
+
+The API has no TLS of its own and listens on localhost by default, so
+put it behind a TLS proxy before exposing it.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from colorama import Fore, Style
+from banking import (authenticate, deposit, withdraw, convert, BankError,
+                     LoginFailed, AccountBusy, AccountNotFound,
+                     CorruptBalance, LedgerUnavailable)
+from account_index import get_account_index
+from ledger import get_ledger
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8001
+
+# Requests whose storage calls run at once, below the HTTP connection
+# pool size of 10 so Sheets requests do not wait for a connection.
+DEFAULT_WORKERS = 8
+
+# Largest request head & body accepted.
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+# Seconds an idle keep-alive connection is kept open.
+KEEP_ALIVE_TIMEOUT = 15
+
+# Failed logins allowed per Account within 'LOGIN_WINDOW' seconds.
+MAX_FAILED_LOGINS = 5
+LOGIN_WINDOW = 300
+
+# Accounts with failed logins tracked before expired ones are dropped.
+MAX_TRACKED_ACCOUNTS = 10000
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 401: "Unauthorized",
+               404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 411: "Length Required",
+               413: "Payload Too Large", 429: "Too Many Requests",
+               431: "Request Header Fields Too Large",
+               500: "Internal Server Error", 501: "Not Implemented",
+               503: "Service Unavailable"}
+
+# HTTP status of each banking error, the rest are 400.
+ERROR_STATUS = {LoginFailed: 401, AccountNotFound: 401, AccountBusy: 409,
+                CorruptBalance: 500, LedgerUnavailable: 500}
+
+LOGIN_FIELDS = ["first_name", "last_name", "acc_num", "pin_num"]
+
+
+class HttpError(Exception):
+    """
+    Raised to answer a request with an error status & message.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def api_address():
+    """
+    Returns the (host, port) to listen on.
+    """
+    return (os.environ.get("ETERNITY_API_HOST", DEFAULT_HOST),
+            int(os.environ.get("ETERNITY_API_PORT", DEFAULT_PORT)))
+
+
+def change_json(change):
+    """
+    Returns a BalanceChange as JSON values.
+    """
+    return {"previous": str(change.previous), "balance": str(change.balance),
+            "amount": str(change.amount),
+            "adjustment": str(change.adjustment)}
+
+
+class HttpApi:
+    """
+    Answers API requests. Each request's storage calls run on one of
+    'workers' threads, each with its own SQLite storage & ledger
+    connections, so one request backing off from a busy Account or a
+    rate limited Sheets call does not hold up the others.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.counters = {"connections": 0, "requests": 0, "errors": 0}
+        self._failed_logins = {}
+        self._login_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers),
+                                            thread_name_prefix="storage")
+        self.routes = {"/login": self.login, "/balance": self.balance,
+                       "/deposit": self.deposit, "/withdraw": self.withdraw,
+                       "/convert": self.convert}
+
+    def _check_login(self, body):
+        """
+        Authenticates the login details in a request body & returns the
+        AccountDetails. Runs on the worker thread.
+
+        - If the Account had too many failed logins recently, raises
+          HttpError 429 without checking the details.
+        """
+        details = [str(body.get(name, "")).strip() for name in LOGIN_FIELDS]
+        acc_num = details[2]
+        now = time.monotonic()
+        with self._login_lock:
+            failures = [failed for failed
+                        in self._failed_logins.get(acc_num, [])
+                        if now - failed < LOGIN_WINDOW]
+        if len(failures) >= MAX_FAILED_LOGINS:
+            raise HttpError(429, "Too many failed logins, try again later.")
+        try:
+            account = authenticate(*details)
+        except LoginFailed:
+            with self._login_lock:
+                if len(self._failed_logins) >= MAX_TRACKED_ACCOUNTS:
+                    # Forgets Accounts whose failures have all expired.
+                    self._failed_logins = {
+                        tracked: times for tracked, times in
+                        self._failed_logins.items()
+                        if now - times[-1] < LOGIN_WINDOW}
+                self._failed_logins[acc_num] = [
+                    failed for failed in self._failed_logins.get(acc_num, [])
+                    if now - failed < LOGIN_WINDOW] + [now]
+            raise
+        with self._login_lock:
+            self._failed_logins.pop(acc_num, None)
+        return account
+
+    def login(self, body):
+        """
+        Checks login details & returns the Account holder.
+        """
+        account = self._check_login(body)
+        return {"acc_num": account.acc_num, "first_name": account.first_name,
+                "last_name": account.last_name}
+
+    def balance(self, body):
+        """
+        Returns the Account balance.
+        """
+        account = self._check_login(body)
+        return {"acc_num": account.acc_num, "balance": str(account.balance)}
+
+    def deposit(self, body):
+        """
+        Deposits 'amount' with 'banking.deposit'.
+        """
+        account = self._check_login(body)
+        return change_json(deposit(account.acc_num, body.get("amount", "")))
+
+    def withdraw(self, body):
+        """
+        Withdraws 'amount' with 'banking.withdraw'.
+        """
+        account = self._check_login(body)
+        return change_json(withdraw(account.acc_num, body.get("amount", "")))
+
+    def convert(self, body):
+        """
+        Converts the balance to 'currency' with 'banking.convert'.
+        """
+        account = self._check_login(body)
+        conversion = convert(account.acc_num, body.get("currency", ""))
+        return {"previous": str(conversion.previous),
+                "balance": str(conversion.balance),
+                "rates_version": conversion.rates_version}
+
+    async def dispatch(self, method, path, body):
+        """
+        Runs the endpoint of a request on a worker thread.
+        Returns (status, JSON response).
+        """
+        endpoint = self.routes.get(path.split("?")[0])
+        if endpoint is None:
+            raise HttpError(404, f"No endpoint {path}.")
+        if method != "POST":
+            raise HttpError(405, "Endpoints only accept POST.")
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "The body is not valid JSON.") from None
+        if not isinstance(request, dict):
+            raise HttpError(400, "The body must be a JSON object.")
+
+        loop = asyncio.get_running_loop()
+        try:
+            return 200, await loop.run_in_executor(self._executor,
+                                                   endpoint, request)
+        except BankError as error:
+            raise HttpError(ERROR_STATUS.get(type(error), 400),
+                            str(error)) from None
+
+    async def read_request(self, reader):
+        """
+        Reads one request. Returns (method, path, headers, body), or
+        None once the client has closed the connection.
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as error:
+            if error.partial.strip():
+                raise HttpError(400, "Incomplete request.") from None
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(431, "The request head is too large.") from None
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, version = request_line.split(" ")
+        except ValueError:
+            raise HttpError(400, "Malformed request line.") from None
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        headers[":version"] = version
+
+        if "transfer-encoding" in headers:
+            raise HttpError(501, "Chunked request bodies are not supported.")
+        length = headers.get("content-length", "0")
+        if not length.isdigit():
+            raise HttpError(411, "A valid Content-Length is needed.")
+        if int(length) > MAX_BODY_BYTES:
+            raise HttpError(413, "The request body is too large.")
+        body = await reader.readexactly(int(length))
+        return method, path, headers, body
+
+    @staticmethod
+    def keep_alive(headers):
+        """
+        Returns True if the connection stays open after the request.
+        """
+        connection = headers.get("connection", "").lower()
+        if headers.get(":version") == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    @staticmethod
+    def response(status, payload, keep_alive):
+        """
+        Returns the bytes of a JSON response.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                "\r\n")
+        return head.encode("latin-1") + body
+
+    async def handle_connection(self, reader, writer):
+        """
+        Answers the requests of one connection until the client closes
+        it, asks to close it or stays idle too long.
+        """
+        self.counters["connections"] += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        self.read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except HttpError as error:
+                    # The rest of a bad request cannot be skipped safely.
+                    self.counters["errors"] += 1
+                    writer.write(self.response(
+                        error.status, {"error": str(error)}, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = self.keep_alive(headers)
+                self.counters["requests"] += 1
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except HttpError as error:
+                    self.counters["errors"] += 1
+                    status, payload = error.status, {"error": str(error)}
+                except Exception as error:
+                    # Storage failures, e.g. Google Sheets being down.
+                    self.counters["errors"] += 1
+                    print(Fore.RED + f"{method} {path} failed: {error!r}"
+                          + Style.RESET_ALL, file=sys.stderr)
+                    status, payload = 503, {"error": "The storage is not"
+                                                     " available."}
+
+                writer.write(self.response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        """
+        Listens on host & port until SIGINT or SIGTERM.
+        """
+        # The shared worksheet, index & ledger are created before the
+        # workers could race to create them.
+        try:
+            get_account_index()
+            get_ledger()
+        except Exception as error:
+            print(Fore.YELLOW + f"Storage not opened yet: {error}"
+                  + Style.RESET_ALL, file=sys.stderr)
+        server = await asyncio.start_server(self.handle_connection, host,
+                                            port, limit=MAX_HEADER_BYTES)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+
+        print(Fore.GREEN + f"HTTP API listening on http://{host}:{port}."
+              + Style.RESET_ALL)
+        async with server:
+            await stop.wait()
+        self._executor.shutdown(wait=True)
+
+
+def main(argv=None):
+    """
+    Command line entry point for the HTTP API.
+    """
+    host, port = api_address()
+    parser = argparse.ArgumentParser(
+        description="Serve Eternity Holdings account operations over HTTP.")
+    parser.add_argument("--host", default=host,
+                        help="address to listen on")
+    parser.add_argument("--port", type=int, default=port,
+                        help="port to listen on")
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("ETERNITY_API_WORKERS",
+                                                   DEFAULT_WORKERS)),
+                        help="requests whose storage calls run at once")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(HttpApi(args.workers).serve(args.host, args.port))
+    except OSError as error:
+        print(Fore.RED + f"Cannot listen on {args.host}:{args.port}:"
+              f" {error.strerror or error}" + Style.RESET_ALL)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,441 @@
+"""
+Transaction Ledger file.
+Keeps the history of every change made to an Account balance:
+
+-Append-only table of deposits, withdrawals, conversions and the
+ cap & floor adjustments applied to them.
+-Periodic per-Account balance snapshots.
+-Function that rebuilds a balance from its last snapshot plus the
+ entries written after it, in the order of the row versions.
+-Command line entry point printing an Account's history & balance.
+
+The ledger is a local SQLite file set with 'ETERNITY_LEDGER_PATH'.
+Entries can only be added, never changed or removed. A snapshot is
+taken every 'SNAPSHOT_INTERVAL' entries of an Account, so rebuilding a
+balance never replays more than that many entries. Each entry holds
+the Version of the Account row written by its change, so entries
+recorded out of order are still replayed in the order of the writes.
+Run from the
+project folder with:
+
+    python ledger.py history 123456789 [--limit 20]
+    python ledger.py balance 123456789
+"""
+
+import os
+import sys
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from collections import namedtuple
+from colorama import Fore, Style
+from balance import Balance
+
+DEFAULT_LEDGER_PATH = "ledger.db"
+
+# Entries written per Account between two balance snapshots.
+SNAPSHOT_INTERVAL = 50
+
+# Seconds a write waits for the ledger lock before giving up.
+LOCK_TIMEOUT = 30
+
+# Seconds after which a missing version is taken as lost, as the change
+# writing it has given up on the lock by then.
+LOST_AFTER = 2 * LOCK_TIMEOUT
+
+# Entry kinds that set the balance to the entry amount.
+SET_KINDS = {"OPENING", "SYNC", "CONVERSION"}
+
+# Entry kinds that move the balance, with the direction they move it.
+DELTA_KINDS = {"DEPOSIT": 1, "WITHDRAWAL": -1, "CAP": -1, "FLOOR": 1}
+
+LedgerEntry = namedtuple("LedgerEntry", ["seq", "acc_num", "kind", "amount",
+                                         "rates_version", "version",
+                                         "created_at"])
+
+# Holds the ledger once it has been created by 'get_ledger'.
+_LEDGER = None
+
+
+def apply_entry(current_bal, kind, amount):
+    """
+    Returns the balance after one ledger entry.
+    """
+    if kind in SET_KINDS:
+        return amount
+    if DELTA_KINDS[kind] > 0:
+        return current_bal + amount
+    return current_bal - amount
+
+
+def apply_changes(current_bal, changes):
+    """
+    Returns the balance after a list of (kind, amount) ledger entries.
+    """
+    for kind, amount in changes:
+        current_bal = apply_entry(current_bal, kind, amount)
+    return current_bal
+
+
+class Ledger:
+    """
+    Append-only ledger of balance changes stored in SQLite.
+    Every method that writes holds the write lock for the whole change,
+    so entries of one Account are never interleaved between processes.
+    Each thread gets its own connection to the ledger file.
+    """
+
+    def __init__(self, path=DEFAULT_LEDGER_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                acc_num TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                amount INTEGER NOT NULL,
+                currency TEXT NOT NULL,
+                rates_version TEXT,
+                version INTEGER,
+                created_at TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS entries_by_account
+                ON entries (acc_num, seq);
+            CREATE TABLE IF NOT EXISTS snapshots (
+                acc_num TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                balance INTEGER NOT NULL,
+                currency TEXT NOT NULL,
+                version INTEGER,
+                PRIMARY KEY (acc_num, seq));
+            CREATE TRIGGER IF NOT EXISTS entries_no_update
+                BEFORE UPDATE ON entries
+                BEGIN SELECT RAISE(ABORT, 'Ledger entries are append-only.');
+                END;
+            CREATE TRIGGER IF NOT EXISTS entries_no_delete
+                BEFORE DELETE ON entries
+                BEGIN SELECT RAISE(ABORT, 'Ledger entries are append-only.');
+                END;
+        """)
+        # Ledgers written before entries held row versions get the
+        # column added, their entries are replayed first in seq order.
+        for table in ("entries", "snapshots"):
+            columns = [row[1] for row in self._conn.execute(
+                f"PRAGMA table_info({table})")]
+            if "version" not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE {table} ADD COLUMN version INTEGER")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_by_version"
+            " ON entries (acc_num, version, seq)")
+
+    @property
+    def _conn(self):
+        """
+        The calling thread's connection, opened on first use.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode, transactions are opened explicitly below.
+            conn = self._local.conn = sqlite3.connect(
+                self.path, timeout=LOCK_TIMEOUT, isolation_level=None)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Holds the ledger write lock for the block & commits the entries
+        written in it together. A block inside another one joins the
+        outer transaction.
+
+        Only local writes run in this block, the Account row is written
+        before it is opened.
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self._conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = depth + 1
+        try:
+            yield
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                self._conn.execute("ROLLBACK")
+            raise
+        self._local.depth = depth
+        if depth == 0:
+            self._conn.execute("COMMIT")
+
+    def _rebuild(self, acc_num):
+        """
+        Rebuilds a balance from the Account's last snapshot and the
+        entries after it, in (version, seq) order. Returns (balance or
+        None, snapshot version, versions recorded since the snapshot,
+        entries since the snapshot, True if those versions follow the
+        snapshot without a gap). A gap older than 'LOST_AFTER' is not
+        counted, its version will never be recorded.
+        """
+        snapshot = self._conn.execute(
+            "SELECT COALESCE(version, 0), seq, balance, currency"
+            " FROM snapshots WHERE acc_num = ?"
+            " ORDER BY COALESCE(version, 0) DESC, seq DESC LIMIT 1",
+            (acc_num,)).fetchone()
+        if snapshot:
+            snap_version, snap_seq = snapshot[0], snapshot[1]
+            current_bal = Balance(snapshot[2], snapshot[3])
+        else:
+            snap_version, snap_seq, current_bal = 0, 0, None
+
+        tail = self._conn.execute(
+            "SELECT version, kind, amount, currency, created_at FROM entries"
+            " WHERE acc_num = ? AND (COALESCE(version, 0) > ?"
+            " OR (COALESCE(version, 0) = ? AND seq > ?))"
+            " ORDER BY COALESCE(version, 0), seq",
+            (acc_num, snap_version, snap_version, snap_seq)).fetchall()
+        lost_before = (datetime.now(timezone.utc)
+                       - timedelta(seconds=LOST_AFTER)).isoformat(
+                           timespec="seconds")
+        # Without a versioned snapshot the first version seen starts
+        # the run, as the row may have been written before the ledger.
+        previous = snap_version or None
+        versions = []
+        contiguous = True
+        for version, kind, amount, currency, created_at in tail:
+            current_bal = apply_entry(current_bal, kind,
+                                      Balance(amount, currency))
+            if version is None or version in versions[-1:]:
+                continue
+            if previous is not None and version != previous + 1:
+                contiguous = contiguous and created_at < lost_before
+            versions.append(version)
+            previous = version
+        return current_bal, snap_version, versions, len(tail), contiguous
+
+    def balance(self, acc_num):
+        """
+        Returns the Account balance rebuilt from the ledger, or None if
+        the ledger holds no entries for the Account.
+        """
+        return self._rebuild(str(acc_num))[0]
+
+    def _append(self, acc_num, previous_bal, changes, rates_version,
+                version, created_at):
+        """
+        Writes the entries of one balance change. Runs inside an open
+        transaction. Returns the balance after the change.
+        """
+        ledger_bal, snap_version, versions, since_snapshot, contiguous = (
+            self._rebuild(acc_num))
+        last_version = versions[-1] if versions else snap_version or None
+        if version is None:
+            version = (last_version or 0) + 1
+        elif version in versions or version <= snap_version:
+            # Already recorded, or covered by the last snapshot.
+            return apply_changes(previous_bal, changes)
+
+        if ledger_bal is None or (versions and version < versions[0]
+                                  and not snap_version):
+            # Also opens a change recorded after a later one of the
+            # Account's first changes, as it is replayed before it.
+            changes = [("OPENING", previous_bal)] + list(changes)
+        elif (ledger_bal != previous_bal and contiguous
+              and (last_version is None or version == last_version + 1)):
+            # Only compared when every earlier write is recorded, a
+            # change whose earlier writes are still being recorded is
+            # put in place once they are.
+            changes = [("SYNC", previous_bal)] + list(changes)
+
+        for kind, amount in changes:
+            if kind not in SET_KINDS and kind not in DELTA_KINDS:
+                raise ValueError(f"Unknown ledger entry kind '{kind}'.")
+            cursor = self._conn.execute(
+                "INSERT INTO entries (acc_num, kind, amount, currency,"
+                " rates_version, version, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (acc_num, kind, amount.minor, amount.currency,
+                 rates_version if kind == "CONVERSION" else None,
+                 version, created_at))
+            since_snapshot += 1
+
+        if since_snapshot >= SNAPSHOT_INTERVAL:
+            snapshot_bal, _, versions, _, contiguous = self._rebuild(acc_num)
+            # A snapshot past a missing version would hide its entries
+            # once they are recorded.
+            if contiguous:
+                self._conn.execute(
+                    "INSERT INTO snapshots (acc_num, seq, balance, currency,"
+                    " version) VALUES (?, ?, ?, ?, ?)",
+                    (acc_num, cursor.lastrowid, snapshot_bal.minor,
+                     snapshot_bal.currency,
+                     versions[-1] if versions else None))
+        return apply_changes(previous_bal, changes)
+
+    def record(self, acc_num, previous_bal, changes, rates_version=None,
+               version=None):
+        """
+        Appends the entries of one balance change in a single
+        transaction. 'previous_bal' is the balance the change was applied
+        to, 'changes' a list of (kind, amount as Balance) pairs &
+        'version' the Version the change wrote to the Account row.
+
+        - If 'version' is None, the change follows the last one recorded.
+        - If entries of 'version' are already recorded, nothing is added.
+        - If the Account has no entries yet, an OPENING entry records
+          'previous_bal' first.
+        - If the ledger balance after the previous version differs from
+          'previous_bal', because the sheet was changed outside the app,
+          a SYNC entry records it.
+        - If 'SNAPSHOT_INTERVAL' entries were written since the last
+          snapshot, a new snapshot is taken.
+        """
+        return self.record_many([(acc_num, previous_bal, changes,
+                                  rates_version, version)])[0]
+
+    def record_many(self, records):
+        """
+        Appends the balance changes of many Accounts in a single
+        transaction, following the same rules as 'record'. 'records' is
+        a list of (acc_num, previous_bal, changes, rates_version,
+        version). Returns the balance after each change.
+        """
+        created_at = datetime.now(timezone.utc).isoformat(
+            timespec="seconds")
+
+        with self.transaction():
+            return [self._append(str(acc_num), previous_bal, changes,
+                                 rates_version, version, created_at)
+                    for acc_num, previous_bal, changes, rates_version,
+                    version in records]
+
+    def history(self, acc_num, limit=None):
+        """
+        Returns the Account's entries, newest first.
+        """
+        rows = self._conn.execute(
+            "SELECT seq, acc_num, kind, amount, currency, rates_version,"
+            " version, created_at FROM entries WHERE acc_num = ?"
+            " ORDER BY seq DESC LIMIT ?",
+            (str(acc_num), -1 if limit is None else limit)).fetchall()
+        return [LedgerEntry(seq, acc, kind, Balance(amount, currency),
+                            rates_version, version, created_at)
+                for seq, acc, kind, amount, currency, rates_version,
+                version, created_at in rows]
+
+
+def get_ledger():
+    """
+    Returns the shared transaction ledger.
+    """
+    global _LEDGER
+
+    if _LEDGER is None:
+        _LEDGER = Ledger(os.environ.get("ETERNITY_LEDGER_PATH",
+                                        DEFAULT_LEDGER_PATH))
+    return _LEDGER
+
+
+def deposit_entries(user_amount, excess_amount):
+    """
+    Returns the ledger entries of a deposit: the DEPOSIT and, if the
+    balance limit was reached, the CAP removing the excess.
+    """
+    changes = [("DEPOSIT", user_amount)]
+    if excess_amount.minor > 0:
+        changes.append(("CAP", excess_amount))
+    return changes
+
+
+def withdrawal_entries(user_amount, shortfall):
+    """
+    Returns the ledger entries of a withdrawal: the WITHDRAWAL and, if
+    the balance would have gone below zero, the FLOOR returning the sum
+    that could not be withdrawn.
+    """
+    changes = [("WITHDRAWAL", user_amount)]
+    if shortfall.minor > 0:
+        changes.append(("FLOOR", shortfall))
+    return changes
+
+
+def record_deposit(acc_num, previous_bal, user_amount, excess_amount,
+                   version=None):
+    """
+    Records a deposit and, if the balance limit was reached, the CAP
+    adjustment removing the excess.
+    """
+    return get_ledger().record(acc_num, previous_bal,
+                               deposit_entries(user_amount, excess_amount),
+                               version=version)
+
+
+def record_withdrawal(acc_num, previous_bal, user_amount, shortfall,
+                      version=None):
+    """
+    Records a withdrawal and, if the balance would have gone below zero,
+    the FLOOR adjustment returning the sum that could not be withdrawn.
+    """
+    return get_ledger().record(acc_num, previous_bal,
+                               withdrawal_entries(user_amount, shortfall),
+                               version=version)
+
+
+def record_conversion(acc_num, previous_bal, new_bal, rates_version,
+                      version=None):
+    """
+    Records a currency conversion with the version of the rates used.
+    """
+    return get_ledger().record(acc_num, previous_bal,
+                               [("CONVERSION", new_bal)], rates_version,
+                               version)
+
+
+def main(argv=None):
+    """
+    Command line entry point for reading the ledger.
+    """
+    # Imported here as the terminal app loads this module at start up.
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Read the Eternity Holdings transaction ledger.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    history_parser = commands.add_parser("history",
+                                         help="list an Account's entries")
+    history_parser.add_argument("acc_num", help="9 digit Account Number")
+    history_parser.add_argument("--limit", type=int, default=20,
+                                help="newest entries to show")
+
+    balance_parser = commands.add_parser("balance",
+                                         help="rebuild an Account balance")
+    balance_parser.add_argument("acc_num", help="9 digit Account Number")
+    args = parser.parse_args(argv)
+
+    ledger = get_ledger()
+    if args.command == "history":
+        entries = ledger.history(args.acc_num, args.limit)
+        found = bool(entries)
+    else:
+        current_bal = ledger.balance(args.acc_num)
+        found = current_bal is not None
+
+    if not found:
+        print(Fore.RED + f"No ledger entries for Account {args.acc_num}."
+              + Style.RESET_ALL)
+        return 1
+
+    if args.command == "history":
+        for entry in entries:
+            rates = (f" (rates {entry.rates_version})"
+                     if entry.rates_version else "")
+            print(f"{entry.seq:>8} {entry.created_at} {entry.kind:<10}"
+                  f" {entry.amount}{rates}")
+    else:
+        print(Fore.GREEN + f"Account {args.acc_num} balance: {current_bal}."
+              + Style.RESET_ALL)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
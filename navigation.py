@@ -0,0 +1,53 @@
+"""
+Navigation file.
+Moves a terminal session between the program's menus:
+
+-Establishes the name of every menu screen.
+-Transition class returned by screens that log an Account in or out.
+-Dispatcher loop that runs one screen at a time until the session ends.
+
+Each screen function shows its menu, reads the user's choice & returns
+the name of the screen to show next, instead of calling that screen
+itself. The dispatcher then calls the next screen from its loop, so a
+session runs in the same stack depth & memory however long it stays
+connected.
+"""
+
+from collections import namedtuple
+
+START_MENU = "START_MENU"
+CREATE_ACCOUNT = "CREATE_ACCOUNT"
+LOGIN = "LOGIN"
+RECOVERY = "RECOVERY"
+FORGOT_RECOVERY = "FORGOT_RECOVERY"
+BANK_HUB = "BANK_HUB"
+DEPOSIT = "DEPOSIT"
+WITHDRAW = "WITHDRAW"
+CONVERSION = "CONVERSION"
+MORE_OPTIONS = "MORE_OPTIONS"
+LOG_OUT = "LOG_OUT"
+
+# Returned by a screen to end the session.
+END_SESSION = None
+
+# Returned instead of a screen name to replace the session details,
+# e.g. {"fname": ..., "acc_num": ...} on login and {} on log out.
+Transition = namedtuple("Transition", ["screen", "session"])
+
+
+def run_screens(screens, screen=START_MENU, session=None):
+    """
+    Runs screens until one returns END_SESSION. 'screens' maps each
+    screen name to its function, which is called with the session
+    details as keyword arguments, so screens shown to a logged in user
+    receive 'fname' & 'acc_num'.
+    Raises KeyError if a screen returns an unknown screen name.
+    """
+    session = dict(session or {})
+
+    while screen is not END_SESSION:
+        next_screen = screens[screen](**session)
+        if isinstance(next_screen, Transition):
+            next_screen, session = next_screen.screen, dict(
+                next_screen.session)
+        screen = next_screen
@@ -4,92 +4,46 @@ Acts as a central point for importing all function files & including:
 
 -Program Start Menu function.
 -Accesses and can edit Google Sheets as a database.
--Establishes dictionary of currency names & rates.
--Contains all banking functions.
+-Contains all banking menus, which call the 'banking' service.
 -Account Log Out Function.
+-Maps every menu screen to its function for the 'navigation' dispatcher.
 """
-from acc_recovery import acc_recovery
+from acc_recovery import acc_recovery, forgot_acc_recovery, all_acc_detail
 from acc_login import login_account
 from acc_creation import create_account, create_backup_setup
-from utils import (clear, validate_mode, get_sheet_data,
-                   acc_pin_generator, validate_input)
+from utils import clear, validate_mode, validate_input
 from colorama import init, Fore, Style
-import pprint
-from money import Money
-
-import gspread
-from google.oauth2.service_account import Credentials
-
-SCOPE = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive.file",
-    "https://www.googleapis.com/auth/drive"
-    ]
-
-CREDS = Credentials.from_service_account_file('creds.json')
-SCOPED_CREDS = CREDS.with_scopes(SCOPE)
-GSPREAD_CLIENT = gspread.authorize(SCOPED_CREDS)
-SHEET = GSPREAD_CLIENT.open('Eternity Holdings')
-
-ACCOUNTLIST = SHEET.worksheet('accountlist')
+from balance import Balance
+from banking import (get_balance, deposit, withdraw, convert, change_pin,
+                     AccountNotFound, AccountBusy, InvalidAmount,
+                     UnsupportedCurrency, CorruptBalance, LedgerUnavailable)
+from sheets_scheduler import SheetsUnavailable
+from navigation import (START_MENU, CREATE_ACCOUNT, LOGIN, RECOVERY,
+                        FORGOT_RECOVERY, BANK_HUB, DEPOSIT, WITHDRAW,
+                        CONVERSION, MORE_OPTIONS, LOG_OUT, Transition,
+                        run_screens)
 
 # Initialize Colorama to work with ANSI escape sequences.
 init()
 
-# Manual Money Conversion Rates.
-CONVERSION_RATES = {
-    "EUR": 1.0,  # Euro
-    "USD": 1.19,  # United States Dollar
-    "JPY": 130.76,  # Japanese Yen
-    "GBP": 0.87,  # British Pound Sterling
-    "AUD": 1.55,  # Austrailian Dollar
-    "CAD": 1.48,  # Canadian Dollar
-    "CHF": 1.10,  # Swiss Franc
-    "CNY": 7.75,  # Chinese Yuan
-    "INR": 89.09,  # Indian Rupee
-    "RUB": 92.86,  # Russian Ruple
-    "BRL": 6.64,  # Brazilian Real
-    "NOK": 10.45  # Norwegian Krone
-}
-
-CURRENCY_NAMES = {
-    "EUR": "European Euro",
-    "USD": "United States Dollar",
-    "JPY": "Japanese Yen",
-    "GBP": "British Pound Sterling",
-    "AUD": "Australian Dollar",
-    "CAD": "Canadian Dollar",
-    "CHF": "Swiss Franc",
-    "CNY": "Chinese Yuan",
-    "INR": "Indian Rupee",
-    "RUB": "Russian Ruble",
-    "BRL": "Brazilian Real",
-    "NOK": "Norwegian Krone"
-}
-
 
 def main():
     """
     Run all program functions.
     """
     clear()
-    start_menu(create_account, login_account, bank_hub, acc_recovery,
-               all_acc_detail)
+    run_screens(SCREENS, START_MENU)
 
 
-def start_menu(create_acc_func,
-               login_acc_func,
-               bank_hub_func,
-               acc_recovery_func,
-               acc_detail_func):
+def start_menu():
     """
     Start Menu Terminal. Prompts users to enter where
     they wish to go. Calls the Validate Mode function to
     check user input.
 
-    - If input 'CREATE' is detected. Calls the 'create_account' function.
-    - If input 'LOGIN' is detected. Calls the 'login_account' function.
-    - If input 'RECOVER' is detected. Calls the 'acc_recovery' function.
+    - If input 'CREATE' is detected. Returns the Account Creator screen.
+    - If input 'LOGIN' is detected. Returns the Account Login screen.
+    - If input 'RECOVER' is detected. Returns the Account Recovery screen.
     """
     print(Fore.YELLOW + "Eternity Holdings the #1 App"
           " to automate your banking needs!\n")
@@ -112,97 +66,35 @@ def start_menu(create_acc_func,
                 clear()
                 print(Fore.GREEN + f"You chose to {mode_str} an Account!")
                 print("Sending to Account Creator...\n")
-                create_acc_func(start_menu, create_acc_func, login_acc_func,
-                                bank_hub_func, acc_recovery_func,
-                                acc_detail_func)
+                return CREATE_ACCOUNT
 
             elif mode_str == "LOGIN":
                 clear()
                 print(Fore.GREEN + f"You chose to {mode_str} to an Account!")
                 print("Sending to Account Login...\n")
-                login_acc_func(start_menu, create_acc_func, login_acc_func,
-                               bank_hub_func, acc_recovery_func,
-                               acc_detail_func)
+                return LOGIN
 
             elif mode_str == "RECOVER":
                 clear()
                 print(Fore.GREEN + f"You chose to {mode_str} your Account!")
                 print("Sending to Account Recovery...\n")
-                acc_recovery_func(start_menu, create_acc_func, login_acc_func,
-                                  bank_hub_func, acc_recovery_func,
-                                  acc_detail_func)
-
-            break
-
+                return RECOVERY
 
-def get_backup_data(user_location, user_email, user_recovery_pass):
-    """
-    Obtain Google Sheet data for Backup Recovery.
-    Collects data of rows 1-9 specifically. Checks for empty
-    sheet cells and returns False if found.
-
-    Otherwise targets data from rows 7-9. Converts the passed
-    user inputs into strings and compares the data from the sheet.
 
-    When match is found grabs the asscoiated account number and calls
-    'all_acc_detail' function passings it the account number.
-    """
-    print(Fore.GREEN + "Obtaining Account Backup data...")
-
-    ACCOUNTLIST = SHEET.worksheet('accountlist')
-    # Gets the data from all sheet rows.
-    all_rows = ACCOUNTLIST.get_all_values()
-
-    # Determine the end index dynamically
-    end_index = min(9, len(all_rows))
-
-    for row in all_rows[1:end_index]:
-        # Check if any cell in the row is empty.
-        if any(cell == '' for cell in row):
-            print(Fore.RED + "Data does not match any Account found.")
-            return False
-
-        # Handle the row as a whole list
-        sheet_user_location = row[6] if len(row) > 6 else ''
-        sheet_user_email = row[7] if len(row) > 7 else ''
-        sheet_user_recovery_pass = row[8] if len(row) > 8 else ''
-
-        backup_acc_num = row[2] if len(row) > 2 else ''
-
-        # Converts the passed data values to strings.
-        # Checks if all the user input matches the data in the sheet.
-        if (
-            str(user_location) == sheet_user_location and
-            str(user_email) == sheet_user_email and
-            str(user_recovery_pass) == sheet_user_recovery_pass
-        ):
-            print("Account Found.")
-            all_acc_detail(backup_acc_num)
-            return True
-
-    # If no match found after checking all rows
-    print(Fore.RED + "Data does not match any Account found.")
-    return False
-
-
-def bank_hub(fname,
-             acc_num,
-             create_acc_func,
-             login_acc_func,
-             bank_hub_func,
-             acc_recovery_func,
-             acc_detail_func):
+def bank_hub(fname, acc_num):
     """
     The Main HUB Terminal. Prompts users to enter where
     they wish to go. Calls the Validate Mode function to
     check user input.
 
-    - If 'DEPOSIT' is detected. Calls the 'acc_deposit' function.
-    - If 'WITHDRAW' is detected. Calls the 'acc_withdrawal' function.
-    - If 'BALANCE' is detected. Calls 'login_user_bal' function.
-    - If 'CONVERSION' is detected. Calls 'currency_convert_menu' function.
-    - If 'MORE OPTIONS' is detected. Calls 'acc_options' function.
-    - If 'LOG OUT' is detected. Calls 'acc_logout_confirm' function.
+    - If 'DEPOSIT' is detected. Returns the 'acc_deposit' screen.
+    - If 'WITHDRAW' is detected. Returns the 'acc_withdrawal' screen.
+    - If 'BALANCE' is detected. Calls 'login_user_bal' function and
+      returns the HUB again.
+    - If 'CONVERSION' is detected. Returns the 'currency_convert_menu'
+      screen.
+    - If 'MORE OPTIONS' is detected. Returns the 'acc_options' screen.
+    - If 'LOG OUT' is detected. Returns the 'acc_logout_confirm' screen.
     """
     print(Fore.YELLOW + f"Welcome {fname} you are now"
                         " at the Eternity Holdings HUB.")
@@ -228,57 +120,42 @@ def bank_hub(fname,
             if mode_str == "DEPOSIT":
                 clear()
                 print("Going to the Deposit terminal...\n")
-                acc_deposit(fname, acc_num, create_acc_func, login_acc_func,
-                            bank_hub_func, acc_recovery_func, acc_detail_func)
+                return DEPOSIT
 
             elif mode_str == "WITHDRAW":
                 clear()
                 print("Going to the Withdraw terminal...\n")
-                acc_withdrawal(fname, acc_num, create_acc_func, login_acc_func,
-                               bank_hub_func, acc_recovery_func,
-                               acc_detail_func)
+                return WITHDRAW
 
             elif mode_str == "BALANCE":
                 clear()
                 print(Fore.CYAN + f"Hello {fname} see below for your balance:")
                 login_user_bal(acc_num)
-                bank_hub(fname, acc_num, create_acc_func, login_acc_func,
-                         bank_hub_func, acc_recovery_func, acc_detail_func)
+                return BANK_HUB
 
             elif mode_str == "CONVERSION":
                 clear()
                 print("Going to the Conversion terminal...\n")
-                currency_convert_menu(fname, acc_num, create_acc_func,
-                                      login_acc_func, bank_hub_func,
-                                      acc_recovery_func, acc_detail_func)
+                return CONVERSION
 
             elif mode_str == "MORE OPTIONS":
                 clear()
                 print("Loading More Options...")
-                acc_options(fname, acc_num, create_acc_func, login_acc_func,
-                            bank_hub_func, acc_recovery_func, acc_detail_func)
+                return MORE_OPTIONS
 
             elif mode_str == "LOG OUT":
                 clear()
-                acc_logout_confirm(fname, acc_num, create_acc_func,
-                                   login_acc_func, bank_hub_func,
-                                   acc_recovery_func, acc_detail_func)
-
-
-def acc_deposit(fname,
-                acc_num,
-                create_acc_func,
-                login_acc_func,
-                bank_hub_func,
-                acc_recovery_func,
-                acc_detail_func):
+                return LOG_OUT
+
+
+def acc_deposit(fname, acc_num):
     """
     Account Deposit Terminal. Prompts user to input
     'EXIT' or a numerical value to deposit to their account.
 
-    - If 'EXIT' the while loop ends returning to HUB.
+    - If 'EXIT' the while loop ends returning the HUB screen.
     - Grabs Account currency using 'check_acc_currency()'.
-    - The loop attempts to convert value using 'Money()'.
+    - The loop attempts to convert value using 'Balance.from_amount()'.
     - If it cannot a ValueError triggers & loop begins again.
     - If it can it calls update user balance function.
     """
@@ -300,15 +177,15 @@ def acc_deposit(fname,
         if mode_str == "EXIT":
             clear()
             print(Fore.GREEN + "Returning to HUB...\n")
-            bank_hub(fname, acc_num, create_acc_func, login_acc_func,
-                     bank_hub_func, acc_recovery_func, acc_detail_func)
-            return
+            return BANK_HUB
 
         try:
             currency = check_acc_currency(acc_num)
+            if currency is None:
+                continue
             clear()
-            user_amount = Money(mode_str, currency)
-            update_acc_bal(user_amount, acc_num, currency, add=True)
+            user_amount = Balance.from_amount(mode_str, currency)
+            update_acc_bal(user_amount, acc_num, add=True)
             continue
 
         except ValueError:
@@ -317,20 +194,14 @@ def acc_deposit(fname,
                              "Remember to use the correct format!\n")
 
 
-def acc_withdrawal(fname,
-                   acc_num,
-                   create_acc_func,
-                   login_acc_func,
-                   bank_hub_func,
-                   acc_recovery_func,
-                   acc_detail_func):
+def acc_withdrawal(fname, acc_num):
     """
     Account Withdraw Terminal. Prompts user to input
     'EXIT' or a numerical value to withdraw from their account.
 
-    - If 'EXIT' the while loop ends returning to HUB.
+    - If 'EXIT' the while loop ends returning the HUB screen.
     - Grabs Account currency using 'check_acc_currency()'.
-    - The loop attempts to convert value using Money().
+    - The loop attempts to convert value using Balance.from_amount().
     - If it cannot a ValueError triggers & loop begins again.
     - If it can it calls update user balance function.
     """
@@ -352,15 +223,15 @@ def acc_withdrawal(fname,
         if mode_str == "EXIT":
             clear()
             print(Fore.GREEN + "Returning to HUB...\n")
-            bank_hub(fname, acc_num, create_acc_func, login_acc_func,
-                     bank_hub_func, acc_recovery_func, acc_detail_func)
-            return
+            return BANK_HUB
 
         try:
             currency = check_acc_currency(acc_num)
+            if currency is None:
+                continue
             clear()
-            user_amount = Money(mode_str, currency)
-            update_acc_bal(user_amount, acc_num, currency, add=False)
+            user_amount = Balance.from_amount(mode_str, currency)
+            update_acc_bal(user_amount, acc_num, add=False)
             continue
 
         except ValueError:
@@ -369,106 +240,105 @@ def acc_withdrawal(fname,
                              "Remember to use the correct format!\n")
 
 
-def update_acc_bal(user_amount, acc_num, currency, add=True):
+def update_acc_bal(user_amount, acc_num, add=True):
     """
-    Updates the User Account Balance in Google Sheet.
-    Gets logged in Accounts balance and converts
-    the string value to a float, then takes the user amount.
-
-    -If add=True the current balance & user input add.
-    -If add=False the current balance & user input subtract.
-
-    The value of that new number is returned back into the
-    Google sheet string format and updated on the sheet.
+    Updates the User Account Balance with 'banking.deposit' or
+    'banking.withdraw' and prints the result.
+
+    -If add=True the user amount is deposited.
+    -If add=False the user amount is withdrawn.
+
+    If the deposit reached the balance limit, or the withdrawal was
+    larger than the balance, the part that could not be applied is
+    printed too.
+    If Google Sheets stays rate limited, the balance is left unchanged
+    & the user is asked to try again shortly.
+    If the ledger cannot record the change, the user is told the balance
+    was still changed.
     """
     try:
-        # Check if the user input is positive. (Filters negative numbers)
-        if user_amount.amount < 0:
-            clear()
-            print(Fore.RED + "Invalid input. Amount must be the correct"
-                             " format.\n")
-            return
+        if add:
+            change = deposit(acc_num, user_amount)
+        else:
+            change = withdraw(acc_num, user_amount)
 
-        # Find the row index corresponding to the account number.
-        all_rows = ACCOUNTLIST.get_all_values()
-        acc_num_list = [row[2].strip() for row in all_rows]
-        acc_num = acc_num.strip()
-        logged_in_user_index = acc_num_list.index(acc_num) + 1
+    except InvalidAmount:
+        clear()
+        print(Fore.RED + "Invalid input. Amount must be the correct"
+                         " format.\n")
+        return
 
-        # Extract the numerical value from the string.
-        current_acc_bal_str = all_rows[logged_in_user_index - 1][5]
-        currency, amount_str = current_acc_bal_str.split()
-        current_acc_bal = float(amount_str)
+    except AccountBusy:
+        clear()
+        print(Fore.RED + "Your Account is busy with another session."
+                         " Please try again.\n")
+        return
 
-        # Convert amount_value to float for math equation.
-        amount_value = float(user_amount.amount)
+    except AccountNotFound:
+        print(Fore.RED + "Error: Account number not found or invalid input.\n")
+        return
 
-        # Determine whether to add or subtract based on the add parameter.
-        if add:
-            new_acc_bal = current_acc_bal + amount_value
-            if new_acc_bal > 100000:
-                excess_amount = new_acc_bal - 100000
-                new_acc_bal = 100000
-                clear()
-                print(Fore.RED + "Your deposit exceeded the maximum"
-                                 " account balance limit.")
-                print(f"An excess of {currency} {excess_amount:.2f}"
-                      " could not be deposited.\n")
-            else:
-                clear()
-                print(Fore.GREEN + "Updating Account balance...")
-                print(f"{user_amount} has been deposited into your account.\n")
-        else:
-            new_acc_bal = current_acc_bal - amount_value
-            if new_acc_bal < 0:
-                excess_amount = amount_value - current_acc_bal
-                new_acc_bal = 0
-                clear()
-                print(Fore.RED + "Your withdrawal exceeded the funds"
-                                 " located in this account.")
-                print(f"The sum of {currency} {excess_amount:.2f}"
-                      " could not be withdrawn.\n")
-            else:
-                clear()
-                print(Fore.GREEN + "Updating Account balance...")
-                print(f"{user_amount} has been withdrawn out of your account."
-                      "\n")
+    except CorruptBalance:
+        clear()
+        print(Fore.RED + "Your Account balance cannot be read, so it has not"
+                         " been changed. Please contact us.\n")
+        return
 
-        # Format the new balance as a string with currency prefix.
-        new_acc_bal_str = f'{currency} {new_acc_bal:.2f}'
+    except SheetsUnavailable:
+        clear()
+        print(Fore.RED + "Eternity Holdings is busy right now. Your balance"
+                         " has not been changed, please try again"
+                         " shortly.\n")
+        return
 
-        ACCOUNTLIST.update_cell(logged_in_user_index, 6, new_acc_bal_str)
+    except LedgerUnavailable:
+        clear()
+        print(Fore.RED + "Your balance has been changed, but its history"
+                         " could not be saved right now.\n")
+        return
 
-    except ValueError:
-        print(Fore.RED + "Error: Account number not found or invalid input.\n")
+    clear()
+    if add and change.adjustment.minor > 0:
+        print(Fore.RED + "Your deposit exceeded the maximum"
+                         " account balance limit.")
+        print(f"An excess of {change.adjustment} could not be deposited.\n")
+    elif add:
+        print(Fore.GREEN + "Updating Account balance...")
+        print(f"{user_amount} has been deposited into your account.\n")
+    elif change.adjustment.minor > 0:
+        print(Fore.RED + "Your withdrawal exceeded the funds"
+                         " located in this account.")
+        print(f"The sum of {change.adjustment} could not be withdrawn.\n")
+    else:
+        print(Fore.GREEN + "Updating Account balance...")
+        print(f"{user_amount} has been withdrawn out of your account.\n")
 
 
 def login_user_bal(acc_num):
     """
     Checks current logged in Account's associated
-    balance from Google Sheet and prints result to Terminal.
+    balance with 'banking.get_balance' and prints result to Terminal.
     """
-    acc_num_list = get_sheet_data(3)
-    acc_bal_list = get_sheet_data(6)
-
-    logged_in_user = acc_num_list.index(acc_num)
-    current_acc_bal = acc_bal_list[logged_in_user]
+    try:
+        current_acc_bal = get_balance(acc_num)
+    except SheetsUnavailable:
+        print(Fore.RED + "Your Account Balance cannot be shown right now,"
+                         " please try again shortly.\n")
+        return
+    except CorruptBalance:
+        print(Fore.RED + "Your Account Balance cannot be read. Please"
+                         " contact us.\n")
+        return
 
     print(Fore.YELLOW + f"Your Account Balance is: {current_acc_bal}.\n")
 
 
-def currency_convert_menu(fname,
-                          acc_num,
-                          create_acc_func,
-                          login_acc_func,
-                          bank_hub_func,
-                          acc_recovery_func,
-                          acc_detail_func):
+def currency_convert_menu(fname, acc_num):
     """
     Currency Convert Menu. Wrapped in a While True loop. Prompts users with a
     user input accepting 3 options.
 
-    - If 'EXIT' is detected, returns to the HUB menu.
+    - If 'EXIT' is detected, returns the HUB screen.
     - if 'LIST' is detected, uses 'pprint()' to display the 'CONVERSION_NAMES'
       dictionary.
     - If neither of those are detected a 'try' block continues.
@@ -496,14 +366,17 @@ def currency_convert_menu(fname,
             if mode_str == "EXIT":
                 clear()
                 print(Fore.GREEN + "Returning to HUB...\n")
-                bank_hub(fname, acc_num, create_acc_func, login_acc_func,
-                         bank_hub_func, acc_recovery_func, acc_detail_func)
+                return BANK_HUB
 
             elif mode_str == "LIST":
                 print(Fore.YELLOW + "\nThis is the list of currency currently"
                                     " supported:")
                 print(Style.RESET_ALL)
-                pprint.pprint(CURRENCY_NAMES)
+                # Only loaded when the list is asked for.
+                import pprint
+                from currency import get_rate_table
+
+                pprint.pprint(dict(get_rate_table().names))
                 print(Fore.CYAN + "\nWhich one do you require?\n")
                 print(Fore.RED + "If you changed your mind please Enter"
                                  " 'EXIT'.")
@@ -517,6 +390,11 @@ def currency_convert_menu(fname,
                 print(Fore.RED + "Invalid input. Please try again.")
                 continue
 
+            except UnsupportedCurrency:
+                print(Fore.RED + f"The input: {requested_convert} is"
+                                 " incorrect.")
+                continue
+
             except Exception as e:
                 print(Fore.RED + f"The input: {str(e)} is incorrect.")
                 continue
@@ -524,100 +402,84 @@ def currency_convert_menu(fname,
 
 def check_acc_currency(acc_num):
     """
-    Checks Account Currency. Grabs sheet data for
-    all Account Numbers and balances. Then takes 'acc_num'
-    and finds associated balance.
-
-    Compares account balance with 'CURRENCY_NAMES' dictionary.
-    Finds associated currency, prints statement.
-    Returns the value 'currency'.
+    Checks Account Currency. Reads the logged in Account's balance with
+    'banking.get_balance' and finds the name of its currency in the
+    rate table, prints statement.
+    Returns the value 'currency', or None if it could not be found.
     """
-    acc_num_list = get_sheet_data(3)
-    acc_bal_list = get_sheet_data(6)
-
-    logged_in_user = acc_num_list.index(acc_num)
-    current_acc_bal = acc_bal_list[logged_in_user]
-
-    # Extract currency code from current account balance string.
-    current_currency = current_acc_bal.split()[0]
+    # Rates are only loaded once the Conversion terminal is opened.
+    from currency import get_rate_table
 
-    # Iterate over the currency_names dictionary to find the currency.
-    for currency, full_name in CURRENCY_NAMES.items():
-        if currency == current_currency:
-            print(Style.RESET_ALL + f"{currency} the {full_name}.")
-            return currency
+    try:
+        current_bal = get_balance(acc_num)
+    except SheetsUnavailable:
+        print(Fore.RED + "Eternity Holdings is busy right now, please try"
+              " again shortly.")
+        return None
+    except CorruptBalance:
+        print(Fore.RED + "Your Account balance cannot be read. Please"
+              " contact us.")
+        return None
+    current_currency = current_bal.currency
+    full_name = get_rate_table().names.get(current_currency)
+    if full_name is not None:
+        print(Style.RESET_ALL + f"{current_currency} the {full_name}.")
+        return current_currency
 
     print(Fore.RED + "An Error has occurred finding Account Currency type.")
 
 
 def currency_converter(requested_convert, acc_num):
     """
-    Currency Converter. Grabs the acc_num and associated
-    balance to that account. Splits the currency with the bal.
-    Compares the currency with the 'requested_convert' value.
-
-    - If Equal, no conversion needed.
-    - If Current balance is EUR, multiples the bal with the requested_convert.
-    - If requested_convert is EUR, it divides the conversion rate with acc bal.
-    - If neither currencies are EUR, converts the current acc currency back to
-      EUR then multiplies that value with the 'requested_convert'.
+    Currency Converter. Converts the Account balance to the
+    'requested_convert' currency with 'banking.convert' & tells the user
+    the version of the exchange rates the conversion used.
 
-    Formats the new currency & updates the Google Sheet.
+    - If the currency is the Account's own, no conversion is needed.
+    - If the currency is not supported, UnsupportedCurrency is raised
+      for the Conversion menu to report.
     """
-    acc_num_list = get_sheet_data(3)
-    acc_bal_list = get_sheet_data(6)
-
     try:
-        logged_in_user = acc_num_list.index(acc_num)
-    except ValueError:
+        conversion = convert(acc_num, requested_convert)
+    except AccountNotFound:
         clear()
         print(Fore.RED + f"Account number {acc_num} not found in the list.")
         return
-
-    before_convert_bal_str = acc_bal_list[logged_in_user]
-
-    currency, amount_str = before_convert_bal_str.split()
-    before_acc_bal = float(amount_str)
-
-    if currency == requested_convert:
-        # If the requested currency is the same as the current currency,
-        # no need to perform conversion
-        new_acc_bal = before_acc_bal
-    elif currency == "EUR":
-        # Converts the balance from Euro to the requested currency.
-        new_acc_bal = before_acc_bal * CONVERSION_RATES[requested_convert]
-    elif requested_convert == "EUR":
-        # Converts the balance from the current currency to Euro.
-        new_acc_bal = before_acc_bal / CONVERSION_RATES[currency]
-    else:
-        # Converts the balance from one non-Euro currency to another.
-        # First converts to Euro, then to the requested currency.
-        euro_equivalent = before_acc_bal / CONVERSION_RATES[currency]
-        new_acc_bal = euro_equivalent * CONVERSION_RATES[requested_convert]
-
-    current_acc_bal = Money(new_acc_bal, requested_convert)
-
-    formatted_bal = f"{requested_convert} {current_acc_bal.amount:.2f}"
-
-    try:
-        ACCOUNTLIST.update_cell(logged_in_user + 2, 6, formatted_bal)
+    except AccountBusy:
+        clear()
+        print(Fore.RED + "Your Account is busy with another session."
+                         " Please try again.\n")
+        return
+    except UnsupportedCurrency:
+        raise
+    except CorruptBalance:
+        clear()
+        print(Fore.RED + "Your Account balance cannot be read, so it has not"
+                         " been converted. Please contact us.\n")
+        return
+    except SheetsUnavailable:
+        clear()
+        print(Fore.RED + "Eternity Holdings is busy right now. Your balance"
+                         " has not been converted, please try again"
+                         " shortly.\n")
+        return
+    except LedgerUnavailable:
         clear()
-        print("Your Account Balance has been updated to"
-              f" {requested_convert}.\n")
+        print(Fore.RED + "Your balance has been converted, but its history"
+                         " could not be saved right now.\n")
         return
     except Exception as e:
         clear()
         print(Fore.RED + f"An error occurred while updating the cell: {e}")
         return
 
+    clear()
+    print("Your Account Balance has been updated to"
+          f" {conversion.balance.currency}.")
+    print(f"Exchange rates version: {conversion.rates_version}.\n")
+
 
-def acc_options(fname,
-                acc_num,
-                create_acc_func,
-                login_acc_func,
-                bank_hub_func,
-                acc_recovery_func,
-                acc_detail_func):
+def acc_options(fname, acc_num):
     """
     Account More Options terminal.
     Prints statements to the terminal and prompts the user to input
@@ -627,7 +489,7 @@ def acc_options(fname,
       'create_backup_setup' functions are called.
     - If user input of 'CHANGE PIN' is detected, 'acc_change_pin' function is
       called.
-    - If 'RETURN' is detected, 'logged_in_hub' function is called.
+    - If 'RETURN' is detected, the HUB screen is returned.
     """
     backup_acc_num = acc_num
     clear()
@@ -667,8 +529,7 @@ def acc_options(fname,
             elif mode_str == "RETURN":
                 clear()
                 print("Returning back to the HUB...\n")
-                bank_hub(fname, acc_num, create_acc_func, login_acc_func,
-                         bank_hub_func, acc_recovery_func, acc_detail_func)
+                return BANK_HUB
 
 
 def acc_change_pin(acc_num):
@@ -677,9 +538,8 @@ def acc_change_pin(acc_num):
     Prompts the user with the option to return to function that
     called this one. If 'YES' the function code continues.
 
-    Finds the associated account details with the acc_num value.
-    Calls the 'acc_pin_generator' function and grabs the returned value.
-    Updates the New Pin on the sheet for the corresponding acc_num.
+    Calls 'banking.change_pin', which stores a new random Pin for the
+    acc_num & returns it.
 
     Prints the new Account Pin to terminal and prompts the user the option
     to Exit.
@@ -705,15 +565,19 @@ def acc_change_pin(acc_num):
                                    "\n")
                 return
 
-    # Find the row index corresponding to the account number.
-    all_rows = ACCOUNTLIST.get_all_values()
-    acc_num_list = [row[2].strip() for row in all_rows]
-    acc_num = acc_num.strip()
-    logged_in_user_index = acc_num_list.index(acc_num) + 1
-
-    new_pin_num = acc_pin_generator()
     print(Fore.GREEN + "Changing your Account Pin...\n")
-    ACCOUNTLIST.update_cell(logged_in_user_index, 4, new_pin_num)
+    try:
+        new_pin_num = change_pin(acc_num)
+    except AccountBusy:
+        clear()
+        print(Fore.RED + "Your Account is busy with another session."
+                         " Your Pin has not been changed.\n")
+        return
+    except SheetsUnavailable:
+        clear()
+        print(Fore.RED + "Eternity Holdings is busy right now."
+                         " Your Pin has not been changed.\n")
+        return
 
     print(Fore.YELLOW + "Your New Account Pin is:", new_pin_num)
     print(Fore.RED + "Reminder: Please keep record of your new pin as you will"
@@ -733,43 +597,7 @@ def acc_change_pin(acc_num):
                 return
 
 
-def all_acc_detail(backup_acc_num):
-    """
-    When 'all_acc_detail' is called, it collects all Google Sheet
-    data and compares the sheet account number with passed value
-    of 'backup_acc_num'.
-
-    Once Account is found, gets the associated data in that row.
-    Prints that data to the terminal and returns to the function call.
-    """
-    ACCOUNTLIST = SHEET.worksheet('accountlist')
-    # Gets the data from all sheet rows.
-    all_rows = ACCOUNTLIST.get_all_values()
-    # Iterate through all rows
-    for row in all_rows:
-        # Check all rows account number matches the provided backup_acc_num
-        if len(row) > 2 and row[2] == backup_acc_num:
-            # Print the data from columns 1 to 9 in the matched row
-            print(Fore.CYAN + "Here are your Account details:\n")
-            print(Style.RESET_ALL + "First Name:", row[0])
-            print("Last Name:", row[1])
-            print("Account Number:", row[2])
-            print("Pin Number:", row[3])
-            print("Date of Birth:", row[4])
-            print(Fore.CYAN + "\nYour Account recovery Backup details:\n")
-            print(Style.RESET_ALL + "Location:", row[6])
-            print("Email Address:", row[7])
-            print("Recovery Password:", row[8])
-            return
-
-
-def acc_logout_confirm(fname,
-                       acc_num,
-                       create_acc_func,
-                       login_acc_func,
-                       bank_hub_func,
-                       acc_recovery_func,
-                       acc_detail_func):
+def acc_logout_confirm(fname, acc_num):
     """
     Log Out Confirmation. Prompts users to input 'YES' or 'NO'.
     uses the Validate Mode function to check user input.
@@ -790,14 +618,28 @@ def acc_logout_confirm(fname,
                 print(Fore.GREEN + "Remember to spend Responsibly"
                                    " & Have an amazing day.")
                 print(Fore.RED + "You are safely being logged out.\n")
-                start_menu(create_acc_func, login_acc_func, bank_hub_func,
-                           acc_recovery_func, acc_detail_func)
+                return Transition(START_MENU, {})
 
             elif mode_str == "NO":
                 clear()
                 print(Fore.RED + "Returning back...\n")
-                bank_hub(fname, acc_num, create_acc_func, login_acc_func,
-                         bank_hub_func, acc_recovery_func, acc_detail_func)
+                return BANK_HUB
+
+
+# Screen function of every menu, called by 'run_screens'.
+SCREENS = {
+    START_MENU: start_menu,
+    CREATE_ACCOUNT: create_account,
+    LOGIN: login_account,
+    RECOVERY: acc_recovery,
+    FORGOT_RECOVERY: forgot_acc_recovery,
+    BANK_HUB: bank_hub,
+    DEPOSIT: acc_deposit,
+    WITHDRAW: acc_withdrawal,
+    CONVERSION: currency_convert_menu,
+    MORE_OPTIONS: acc_options,
+    LOG_OUT: acc_logout_confirm
+}
 
 
 if __name__ == "__main__":
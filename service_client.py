@@ -0,0 +1,233 @@
+"""
+Account Service Client file.
+Contains the worksheet used by sessions when the account service runs:
+
+-ServiceWorksheet class that sends each worksheet call to the service.
+-Keeps one connection to the service's Unix socket per process.
+-Raises the service's errors again in the calling session.
+-Tells the service the priority of each call, so bulk jobs wait behind
+ the terminal sessions.
+
+Select it with 'ETERNITY_STORAGE=service'. The socket path is set with
+'ETERNITY_SERVICE_SOCKET' and must match the one the service listens on,
+see 'account_service.py'.
+"""
+
+import os
+import json
+import threading
+from sheets_scheduler import SheetsUnavailable, current_priority
+
+DEFAULT_SERVICE_SOCKET = "eternity_service.sock"
+
+# Calls that only read, so they are safe to send again.
+READ_METHODS = {"row_count", "get_all_values", "row_values", "col_values",
+                "batch_get", "row_of", "stats"}
+
+# Errors the service sends back that are raised again as the same type.
+ERROR_TYPES = {"ValueError": ValueError, "KeyError": KeyError,
+               "SheetsUnavailable": SheetsUnavailable}
+
+
+class ServiceError(Exception):
+    """
+    Raised for service errors with no matching built-in type.
+    """
+
+
+def service_socket_path():
+    """
+    Returns the path of the account service socket.
+    """
+    return os.environ.get("ETERNITY_SERVICE_SOCKET", DEFAULT_SERVICE_SOCKET)
+
+
+class ServiceWorksheet:
+    """
+    Stand-in for the 'accountlist' worksheet that forwards every call to
+    the account service. The service owns the real worksheet, its cache
+    & the Sheets connection, so sessions share warm data and only the
+    service talks to Google.
+
+    Requests & responses are single JSON lines. If the connection breaks
+    during a read, the read is sent again once on a new connection. A
+    write is never sent twice, as the service may already have made it.
+    """
+
+    def __init__(self, path=None, title="accountlist"):
+        self.path = path or service_socket_path()
+        self.title = title
+        self._lock = threading.Lock()
+        self._sock = None
+        self._file = None
+        self._pid = None
+        self._next_id = 0
+
+    def _connect(self):
+        """
+        Opens the connection to the service.
+        """
+        # Imported here so sessions using other backends never load it.
+        import socket
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock, self._file = sock, sock.makefile("rb")
+        self._pid = os.getpid()
+
+    def _disconnect(self):
+        """
+        Closes the socket & its file, if open. Callers hold the lock.
+        """
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+        self._sock = None
+        self._file = None
+
+    def close(self):
+        """
+        Closes the connection to the service.
+        """
+        with self._lock:
+            self._disconnect()
+
+    def _send(self, request):
+        """
+        Sends one request line & returns the decoded response line.
+        """
+        # A forked child must not share its parent's connection, or
+        # their responses would be mixed up. Closing the child's copy
+        # leaves the parent's connection open.
+        if self._sock is None or self._pid != os.getpid():
+            self._disconnect()
+            self._connect()
+        self._sock.sendall(request)
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The account service closed the"
+                                  " connection.")
+        return json.loads(line)
+
+    def _call(self, method, *args):
+        """
+        Calls a method on the service & returns its result.
+        """
+        with self._lock:
+            self._next_id += 1
+            request = (json.dumps({"id": self._next_id, "method": method,
+                                   "args": args,
+                                   "priority": current_priority()})
+                       + "\n").encode("utf-8")
+            try:
+                response = self._send(request)
+            except (ConnectionError, OSError):
+                # The service may have restarted, reads try a new
+                # connection while writes report the failure.
+                self._disconnect()
+                if method not in READ_METHODS:
+                    raise
+                try:
+                    response = self._send(request)
+                except (ConnectionError, OSError):
+                    self._disconnect()
+                    raise
+
+        if "error" in response:
+            error = response["error"]
+            raise ERROR_TYPES.get(error["type"], ServiceError)(
+                error["message"])
+        return response["result"]
+
+    @property
+    def row_count(self):
+        """
+        Number of rows of the worksheet held by the service.
+        """
+        return self._call("row_count")
+
+    def get_all_values(self):
+        """
+        Forwards 'get_all_values' to the service.
+        """
+        return self._call("get_all_values")
+
+    def row_values(self, row):
+        """
+        Forwards 'row_values' to the service.
+        """
+        return self._call("row_values", row)
+
+    def col_values(self, col):
+        """
+        Forwards 'col_values' to the service.
+        """
+        return self._call("col_values", col)
+
+    def batch_get(self, ranges, major_dimension="ROWS"):
+        """
+        Forwards 'batch_get' to the service.
+        """
+        return self._call("batch_get", list(ranges), major_dimension)
+
+    def append_row(self, values):
+        """
+        Forwards 'append_row' to the service.
+        """
+        return self._call("append_row", values)
+
+    def append_rows(self, values):
+        """
+        Forwards 'append_rows' to the service.
+        """
+        return self._call("append_rows", values)
+
+    def update_cell(self, row, col, value):
+        """
+        Forwards 'update_cell' to the service.
+        """
+        return self._call("update_cell", row, col, value)
+
+    def batch_update(self, data):
+        """
+        Forwards 'batch_update' to the service.
+        """
+        return self._call("batch_update", data)
+
+    def compare_and_set(self, row, updates, version_col, expected_version):
+        """
+        Compare-and-set row update, run by the service one at a time with
+        every other write, so it is atomic on every backend.
+        """
+        return self._call("compare_and_set", row,
+                          {str(col): value for col, value in updates.items()},
+                          version_col, expected_version)
+
+    def compare_and_set_rows(self, changes, version_col):
+        """
+        Compare-and-set update of several rows, run by the service as
+        one write.
+        """
+        return self._call("compare_and_set_rows",
+                          [[row, {str(col): value
+                                  for col, value in updates.items()},
+                            expected_version]
+                           for row, updates, expected_version in changes],
+                          version_col)
+
+    def row_of(self, acc_num):
+        """
+        Returns the sheet row number of an Account Number from the
+        service's Account index. Raises ValueError if it is not found.
+        """
+        return self._call("row_of", acc_num)
+
+    def stats(self):
+        """
+        Returns the service's request & cache counters.
+        """
+        return self._call("stats")
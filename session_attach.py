@@ -0,0 +1,74 @@
+"""
+Session Attach file.
+Opens a terminal session from the warm pool of 'session_server.py':
+
+-Passes this process's terminal to a waiting session.
+-Waits for the session to end & exits with its status.
+-Falls back to starting 'run.py' itself when no server is running.
+
+Used in place of 'python3 run.py' by the web terminal. Only standard
+library modules are imported, so attaching costs little more than the
+interpreter start. The server socket is set with
+'ETERNITY_SESSION_SOCKET'.
+"""
+
+import os
+import sys
+import json
+import socket
+
+DEFAULT_SESSION_SOCKET = "eternity_sessions.sock"
+
+# Environment variables passed on to the session.
+SESSION_ENV = ("TERM", "COLUMNS", "LINES")
+
+
+def session_socket_path():
+    """
+    Returns the path of the session server socket.
+    """
+    return os.environ.get("ETERNITY_SESSION_SOCKET", DEFAULT_SESSION_SOCKET)
+
+
+def attach(path):
+    """
+    Hands stdin, stdout & stderr to a pooled session & returns the
+    session's exit status once it ends.
+    Raises OSError if no session server is listening on 'path'.
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+        env = {name: os.environ[name] for name in SESSION_ENV
+               if name in os.environ}
+        socket.send_fds(conn, [json.dumps(env).encode("utf-8")],
+                        [0, 1, 2])
+        # The session now owns the terminal, this process only waits.
+        reply = conn.makefile("rb").readline()
+    finally:
+        conn.close()
+    try:
+        return int(reply)
+    except ValueError:
+        # The session was killed before it could report.
+        return 1
+
+
+def main():
+    """
+    Attaches to the session server, or runs the program directly if
+    the server is not running.
+    """
+    try:
+        return attach(session_socket_path())
+    except KeyboardInterrupt:
+        # Ctrl+C on the terminal ends the session, as with 'run.py'.
+        return 130
+    except OSError:
+        run_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "run.py")
+        os.execv(sys.executable, [sys.executable, run_file])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
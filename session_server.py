@@ -0,0 +1,262 @@
+"""
+Session Server file.
+Keeps a pool of warm terminal sessions ready for new users:
+
+-Imports the program & opens the storage connection once.
+-Pre-forks a pool of session processes waiting on a Unix socket.
+-Hands a connecting terminal to a waiting session, which shows the
+ Start Menu straight away.
+-Replaces every session that ends, so the pool stays full.
+
+Run from the project folder with:
+
+    python session_server.py [--pool-size 4] [--socket eternity_sessions.sock]
+
+and open terminals with 'python3 session_attach.py' instead of
+'python3 run.py'. The pool size can also be set with
+'ETERNITY_POOL_SIZE' and the socket path with 'ETERNITY_SESSION_SOCKET'.
+Each session is a fork of the warm server, so a new user skips the
+interpreter start, the imports & the Sheets login. Stopping the server
+also ends the sessions it started.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import argparse
+import importlib
+import threading
+import traceback
+import colorama
+from colorama import Fore, Style
+from account_service import remove_stale_socket
+from session_attach import session_socket_path
+
+DEFAULT_POOL_SIZE = 4
+
+# Largest attach message accepted from a terminal.
+MAX_ATTACH_BYTES = 64 * 1024
+
+# Sessions ending sooner than this after being forked are treated as
+# failing, and are replaced only after 'RESPAWN_DELAY' seconds.
+MIN_SESSION_SECONDS = 1.0
+RESPAWN_DELAY = 0.5
+
+# Modules imported before forking. Importing 'run' loads the program,
+# the others are modules it only loads when a menu first needs them.
+WARM_MODULES = ("run", "currency", "pprint")
+
+# Environment variables a terminal passes on to its session.
+SESSION_ENV = ("TERM", "COLUMNS", "LINES")
+
+
+def pool_size():
+    """
+    Returns the number of waiting sessions to keep.
+    """
+    return int(os.environ.get("ETERNITY_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+
+def warm_up():
+    """
+    Imports the program & opens the connections every session needs,
+    so forked sessions start with them ready.
+
+    - If the storage cannot be reached yet, each session connects on
+      its own first use instead.
+    """
+    for name in WARM_MODULES:
+        importlib.import_module(name)
+    from account_index import get_account_index, get_recovery_index
+    from async_storage import fetch_all
+
+    try:
+        # Both indexes read their columns at the same time.
+        fetch_all(get_account_index().build, get_recovery_index().build)
+    except Exception as error:
+        print(Fore.YELLOW + f"Storage not warmed up: {error}"
+              + Style.RESET_ALL, file=sys.stderr)
+
+
+def attach_terminal(fds, env):
+    """
+    Makes the terminal passed by 'session_attach' this process's
+    standard streams & controlling terminal.
+    """
+    # Leaves the server's process group, so signals sent to the server
+    # from its own terminal do not reach the session.
+    os.setsid()
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+
+    for name in SESSION_ENV:
+        if name in env:
+            os.environ[name] = env[name]
+        else:
+            os.environ.pop(name, None)
+
+    # Colorama wrapped the server's own streams, so wrap the new ones.
+    colorama.deinit()
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", buffering=1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+    colorama.init()
+
+
+def end_with_terminal(conn):
+    """
+    Ends the session as soon as the attached 'session_attach' process
+    is gone. The terminal stays the controlling terminal of that
+    process, so when the user closes it or presses Ctrl+C, it is the
+    one signalled and the session follows it here.
+    """
+    def watch():
+        # The attach process sends nothing, so any return is its exit.
+        try:
+            conn.recv(1)
+        except OSError:
+            pass
+        os._exit(1)
+
+    threading.Thread(target=watch, name="terminal-watcher",
+                     daemon=True).start()
+
+
+def run_session(listener):
+    """
+    Waits for a terminal, runs the program on it & returns its exit
+    status. Runs in a forked session process.
+    """
+    for signum in (signal.SIGTERM, signal.SIGHUP):
+        signal.signal(signum, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    conn, _ = listener.accept()
+    listener.close()
+    message, fds, _, _ = socket.recv_fds(conn, MAX_ATTACH_BYTES, 3)
+    if len(fds) != 3:
+        return 1
+    attach_terminal(fds, json.loads(message or b"{}"))
+    end_with_terminal(conn)
+
+    import run
+
+    status = 0
+    try:
+        run.main()
+    except SystemExit as exit_error:
+        status = exit_error.code if isinstance(exit_error.code, int) else 1
+    except (EOFError, KeyboardInterrupt):
+        status = 1
+    except Exception:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    try:
+        conn.sendall(f"{status}\n".encode("utf-8"))
+    except OSError:
+        pass
+    return status
+
+
+def fork_session(listener):
+    """
+    Forks one waiting session process & returns its pid.
+    """
+    pid = os.fork()
+    if pid:
+        return pid
+
+    status = 1
+    try:
+        status = run_session(listener)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        # Never return into the server's loop from a session.
+        os._exit(status)
+
+
+def serve(path, size):
+    """
+    Keeps 'size' sessions waiting on the Unix socket until SIGINT or
+    SIGTERM, replacing each session that ends.
+    """
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    # Only this user's terminals may connect.
+    os.chmod(path, 0o600)
+    listener.listen(max(size, 16))
+
+    # SIGTERM unwinds the loop like Ctrl+C so the pool is cleaned up.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    sessions = {}
+    try:
+        for _ in range(size):
+            sessions[fork_session(listener)] = time.monotonic()
+        print(Fore.GREEN + f"Session server listening on {path} with"
+              f" {size} sessions ready." + Style.RESET_ALL)
+
+        while True:
+            pid, _ = os.wait()
+            started = sessions.pop(pid, None)
+            if started is None:
+                continue
+            if time.monotonic() - started < MIN_SESSION_SECONDS:
+                time.sleep(RESPAWN_DELAY)
+            sessions[fork_session(listener)] = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in sessions:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in sessions:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        listener.close()
+        os.unlink(path)
+
+
+def main(argv=None):
+    """
+    Command line entry point for the session server.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run a pool of warm Eternity Holdings sessions.")
+    parser.add_argument("--socket", default=session_socket_path(),
+                        help="Unix socket path to listen on")
+    parser.add_argument("--pool-size", type=int, default=pool_size(),
+                        help="number of sessions kept waiting")
+    args = parser.parse_args(argv)
+
+    if args.pool_size < 1:
+        print(Fore.RED + "The pool size must be at least 1."
+              + Style.RESET_ALL)
+        return 1
+
+    try:
+        remove_stale_socket(args.socket)
+    except RuntimeError as error:
+        print(Fore.RED + str(error) + Style.RESET_ALL)
+        return 1
+
+    warm_up()
+    serve(args.socket, args.pool_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
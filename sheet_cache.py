@@ -0,0 +1,239 @@
+"""
+Worksheet Read Cache file.
+Contains the read-through cache placed in front of the 'accountlist'
+worksheet:
+
+-Serves repeated reads from memory for a configurable time (TTL).
+-Evicts the least recently used entries once the cache is full.
+-Drops affected entries whenever our own code writes to the sheet.
+-Sends one request for reads of the same data made at the same time.
+-Counts cache hits & misses.
+
+The TTL is set with 'ETERNITY_CACHE_TTL' in seconds (default 5) and
+the number of cached reads with 'ETERNITY_CACHE_SIZE' (default 256).
+A TTL of 0 turns the cache off.
+"""
+
+import os
+import threading
+from concurrent.futures import Future
+from cachetools import TTLCache
+
+DEFAULT_CACHE_TTL = 5
+DEFAULT_CACHE_SIZE = 256
+
+
+class CachedWorksheet:
+    """
+    Read-through, write-through cache around a worksheet.
+
+    Reads are cached by method name & arguments. Writes are passed on to
+    the worksheet and then remove every cached read that could include the
+    written cells. If the worksheet reports a data version (the SQLite
+    backend does) the whole cache is dropped when another process changes
+    the data, so only the Google Sheets backend relies on the TTL.
+
+    The lock is not held while the worksheet is read, so reads of
+    different data wait on the network together. A read of data that is
+    already being read waits for that request instead of sending its own.
+    """
+
+    def __init__(self, worksheet, ttl=DEFAULT_CACHE_TTL,
+                 maxsize=DEFAULT_CACHE_SIZE):
+        self.worksheet = worksheet
+        self.hits = 0
+        self.misses = 0
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+        # Reads in progress by key, with the generation they started in.
+        self._pending = {}
+        # Goes up on every invalidation, so reads that started before a
+        # write are neither joined nor cached after it.
+        self._generation = 0
+        # The data version is per connection & the SQLite backend opens
+        # one per thread, so each thread keeps the last one it saw.
+        self._seen = threading.local()
+        self._seen.version = self._data_version()
+
+    def __getattr__(self, name):
+        # Any worksheet attribute not handled here is passed through.
+        return getattr(self.worksheet, name)
+
+    def _data_version(self):
+        """
+        Returns the worksheet data version, or None if it has none.
+        """
+        data_version = getattr(self.worksheet, "data_version", None)
+        return data_version() if data_version else None
+
+    def _read(self, key, func, *args):
+        """
+        Returns the cached result for 'key' or calls 'func' to fill it.
+        If the same read is already in progress, waits for its result.
+        """
+        with self._lock:
+            version = self._data_version()
+            if version != getattr(self._seen, "version", None):
+                self._cache.clear()
+                self._generation += 1
+                self._seen.version = version
+
+            if key in self._cache:
+                self.hits += 1
+                return self._copy(self._cache[key])
+
+            generation, pending = self._pending.get(key, (None, None))
+            joined = generation == self._generation
+            if joined:
+                self.hits += 1
+            else:
+                self.misses += 1
+                generation, pending = self._generation, Future()
+                self._pending[key] = (generation, pending)
+        if joined:
+            return self._copy(pending.result())
+
+        try:
+            result = func(*args)
+        except BaseException as error:
+            self._finish(key, pending)
+            pending.set_exception(error)
+            raise
+        with self._lock:
+            self._finish(key, pending)
+            if generation == self._generation:
+                self._cache[key] = result
+        pending.set_result(result)
+        return self._copy(result)
+
+    def _finish(self, key, pending):
+        """
+        Removes a read that has finished from the reads in progress,
+        unless a newer read of the same key has taken its place.
+        """
+        with self._lock:
+            if self._pending.get(key, (None, None))[1] is pending:
+                del self._pending[key]
+
+    @classmethod
+    def _copy(cls, result):
+        """
+        Returns a copy of a cached result so callers cannot change it.
+        """
+        return [cls._copy(item) if isinstance(item, list) else item
+                for item in result]
+
+    def _invalidate(self, rows=None, cols=None):
+        """
+        Drops cached reads covering the given rows or columns.
+        Whole sheet reads are always dropped.
+        """
+        with self._lock:
+            for key in list(self._cache.keys()):
+                method, args = key[0], key[1:]
+                if method == "row_values" and (rows is None or
+                                               args[0] in rows):
+                    del self._cache[key]
+                elif method == "col_values" and (cols is None or
+                                                 args[0] in cols):
+                    del self._cache[key]
+                elif method not in ("row_values", "col_values"):
+                    del self._cache[key]
+            self._generation += 1
+            self._seen.version = self._data_version()
+
+    def get_all_values(self):
+        """
+        Cached 'get_all_values' read.
+        """
+        return self._read(("get_all_values",),
+                          self.worksheet.get_all_values)
+
+    def row_values(self, row):
+        """
+        Cached 'row_values' read.
+        """
+        return self._read(("row_values", row), self.worksheet.row_values,
+                          row)
+
+    def col_values(self, col):
+        """
+        Cached 'col_values' read.
+        """
+        return self._read(("col_values", col), self.worksheet.col_values,
+                          col)
+
+    def batch_get(self, ranges, major_dimension="ROWS"):
+        """
+        Cached 'batch_get' read.
+        """
+        return self._read(("batch_get", tuple(ranges), major_dimension),
+                          self.worksheet.batch_get, ranges,
+                          major_dimension)
+
+    def append_row(self, values):
+        """
+        Appends the row & drops every cached read.
+        """
+        response = self.worksheet.append_row(values)
+        self._invalidate()
+        return response
+
+    def append_rows(self, values):
+        """
+        Appends the rows & drops every cached read.
+        """
+        response = self.worksheet.append_rows(values)
+        self._invalidate()
+        return response
+
+    def update_cell(self, row, col, value):
+        """
+        Updates the cell & drops cached reads of its row & column.
+        """
+        response = self.worksheet.update_cell(row, col, value)
+        self._invalidate(rows=(row,), cols=(col,))
+        return response
+
+    def batch_update(self, data):
+        """
+        Writes the ranges in one request & drops every cached read.
+        """
+        response = self.worksheet.batch_update(data)
+        self._invalidate()
+        return response
+
+    def forget(self, rows=None, cols=None):
+        """
+        Drops cached reads of rows or columns written without going
+        through this cache.
+        """
+        self._invalidate(rows=rows, cols=cols)
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+
+    def stats(self):
+        """
+        Returns the cache hit & miss counters.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._cache)}
+
+
+def cache_worksheet(worksheet):
+    """
+    Wraps the worksheet in a CachedWorksheet configured from the
+    environment. Returns the worksheet unchanged if the TTL is 0.
+    """
+    ttl = float(os.environ.get("ETERNITY_CACHE_TTL", DEFAULT_CACHE_TTL))
+    maxsize = int(os.environ.get("ETERNITY_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+
+    if ttl <= 0:
+        return worksheet
+    return CachedWorksheet(worksheet, ttl=ttl, maxsize=maxsize)
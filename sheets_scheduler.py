@@ -0,0 +1,351 @@
+"""
+Sheets Request Scheduler file.
+Sends every Google Sheets request through one scheduler per process:
+
+-Token bucket limiting requests to the Sheets per-minute quota.
+-Priority for interactive menu requests over background jobs.
+-Retries of rate limited (429) & server error (5xx) responses with
+ exponential backoff & jitter.
+-Counters of requests, retries & time spent waiting for a token.
+-Worksheet wrapper that schedules each of its API calls.
+
+The quota is set with 'ETERNITY_SHEETS_QUOTA' in requests per minute.
+The bucket is kept per process, so processes running at the same time
+share the quota between them. Sessions using the account service send
+every request through the service's one scheduler, which serves the
+waiting requests of terminal sessions before those of bulk jobs. Bulk
+jobs mark themselves as BACKGROUND, and one talking to Google itself
+only uses 'BACKGROUND_SHARE' of the quota, leaving the rest to the
+terminal sessions.
+Set 'ETERNITY_SCHEDULER_REPORT=1' to print the counters on exit.
+"""
+
+import os
+import sys
+import time
+import heapq
+import atexit
+import random
+import itertools
+import threading
+from contextlib import contextmanager
+from collections import deque
+
+# Requests per minute allowed by the Sheets API for one user.
+DEFAULT_QUOTA_PER_MINUTE = 60
+
+# Requests that may be sent at once after an idle spell.
+DEFAULT_BURST = 10
+
+# Share of the quota used by a process running a background job.
+BACKGROUND_SHARE = 0.5
+
+# Request priorities, lower numbers are served first.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Retries of a rate limited or failing request before giving up.
+MAX_RETRIES = 5
+
+# Backoff between retries doubles from the base up to the cap, seconds.
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 32.0
+
+# Server error statuses worth retrying, 429 is always retried.
+RETRY_STATUSES = {500, 502, 503, 504}
+
+# Worksheet calls that send a request to the Sheets API.
+API_CALLS = {"get_all_values", "row_values", "col_values", "batch_get",
+             "append_row", "append_rows", "update_cell", "batch_update",
+             "update", "get", "acell", "cell"}
+
+# Calls that may have been applied when a server error is returned, so
+# they are only retried after a 429, which Google never applies.
+NOT_IDEMPOTENT = {"append_row", "append_rows"}
+
+# Recent waits kept for the percentiles in 'stats'.
+WAIT_SAMPLES = 1000
+
+# Holds the scheduler once it has been created by 'get_scheduler'.
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+# Priority of requests made by threads that did not choose one.
+_DEFAULT_PRIORITY = INTERACTIVE
+_THREAD_PRIORITY = threading.local()
+
+
+class SheetsUnavailable(Exception):
+    """
+    Raised when a Sheets request was still rate limited or failing
+    after every retry.
+    """
+
+
+def set_default_priority(priority):
+    """
+    Sets the priority of this process's requests. Bulk jobs call this
+    with BACKGROUND before their first request.
+    """
+    global _DEFAULT_PRIORITY
+
+    _DEFAULT_PRIORITY = priority
+
+
+@contextmanager
+def request_priority(priority):
+    """
+    Gives the requests the calling thread makes inside the 'with' block
+    another priority, e.g. the account service serving a request sent
+    by a background job.
+    """
+    previous = getattr(_THREAD_PRIORITY, "priority", None)
+    _THREAD_PRIORITY.priority = priority
+    try:
+        yield
+    finally:
+        if previous is None:
+            del _THREAD_PRIORITY.priority
+        else:
+            _THREAD_PRIORITY.priority = previous
+
+
+def current_priority():
+    """
+    Returns the priority of requests made by the calling thread.
+    """
+    return getattr(_THREAD_PRIORITY, "priority", _DEFAULT_PRIORITY)
+
+
+def response_status(error):
+    """
+    Returns the HTTP status of a gspread APIError, or None for any
+    other error.
+    """
+    response = getattr(error, "response", None)
+    if type(error).__name__ != "APIError" or response is None:
+        return None
+    return response.status_code
+
+
+def retry_after(error):
+    """
+    Returns the seconds a 429 response asked to wait, or None.
+    """
+    value = error.response.headers.get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+
+class RequestScheduler:
+    """
+    Token bucket with a priority queue in front of it. A request takes
+    a token before it is sent. When none is left, requests wait in
+    priority order, then in the order they arrived.
+    """
+
+    def __init__(self, quota_per_minute=DEFAULT_QUOTA_PER_MINUTE,
+                 burst=DEFAULT_BURST):
+        if quota_per_minute <= 0:
+            raise ValueError("The Sheets quota must be above 0.")
+        self.rate = quota_per_minute / 60
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._refilled = time.monotonic()
+        self._waiting = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self.counters = {priority: {"requests": 0, "retries": 0,
+                                    "throttled": 0, "server_errors": 0,
+                                    "failures": 0, "wait_total": 0.0,
+                                    "wait_max": 0.0}
+                         for priority in (INTERACTIVE, BACKGROUND)}
+        self._waits = {priority: deque(maxlen=WAIT_SAMPLES)
+                       for priority in (INTERACTIVE, BACKGROUND)}
+
+    def _refill(self):
+        """
+        Adds the tokens earned since the last refill.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens +
+                           (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def acquire(self, priority):
+        """
+        Waits until a token is free & this request is the first waiting
+        one of the highest priority. Returns the seconds waited.
+        """
+        start = time.monotonic()
+        ticket = (priority, next(self._order))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                self._refill()
+                if self._waiting[0] == ticket and self._tokens >= 1:
+                    heapq.heappop(self._waiting)
+                    self._tokens -= 1
+                    # The next request in line may be able to go too.
+                    self._cond.notify_all()
+                    break
+                if self._waiting[0] == ticket:
+                    self._cond.wait((1 - self._tokens) / self.rate)
+                else:
+                    self._cond.wait()
+
+            waited = time.monotonic() - start
+            counters = self.counters[priority]
+            counters["requests"] += 1
+            counters["wait_total"] += waited
+            counters["wait_max"] = max(counters["wait_max"], waited)
+            self._waits[priority].append(waited)
+        return waited
+
+    def _count(self, priority, name):
+        """
+        Adds one to a counter.
+        """
+        with self._cond:
+            self.counters[priority][name] += 1
+
+    def call(self, func, *args, idempotent=True, **kwargs):
+        """
+        Sends one request with 'func' once a token is free & returns its
+        result. Rate limited requests, and server errors of idempotent
+        requests, are sent again after a backoff.
+
+        - If the response asks to wait with 'Retry-After', that wait is
+          used instead of the backoff.
+        - If every retry fails, raises SheetsUnavailable.
+        - Any other error is raised as it is.
+        """
+        priority = current_priority()
+        for attempt in range(MAX_RETRIES + 1):
+            self.acquire(priority)
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                status = response_status(error)
+                if status == 429:
+                    self._count(priority, "throttled")
+                elif status in RETRY_STATUSES and idempotent:
+                    self._count(priority, "server_errors")
+                else:
+                    raise
+                if attempt == MAX_RETRIES:
+                    self._count(priority, "failures")
+                    raise SheetsUnavailable(
+                        f"Google Sheets answered {status} after"
+                        f" {MAX_RETRIES} retries.") from error
+
+                delay = retry_after(error) if status == 429 else None
+                if delay is None:
+                    # Full jitter keeps processes from retrying in step.
+                    delay = random.uniform(0, min(BACKOFF_MAX,
+                                                  BACKOFF_BASE * 2 ** attempt))
+                self._count(priority, "retries")
+                time.sleep(delay)
+
+    def stats(self):
+        """
+        Returns the counters of each priority with the mean, 95th
+        percentile & largest wait for a token, in seconds.
+        """
+        names = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+        with self._cond:
+            stats = {}
+            for priority, counters in self.counters.items():
+                waits = sorted(self._waits[priority])
+                stats[names[priority]] = dict(
+                    counters,
+                    wait_mean=(counters["wait_total"] / counters["requests"]
+                               if counters["requests"] else 0.0),
+                    wait_p95=(waits[int(len(waits) * 0.95)]
+                              if waits else 0.0))
+            return stats
+
+
+class ScheduledWorksheet:
+    """
+    Wraps a gspread worksheet so each API call goes through the
+    scheduler. Every other attribute is the worksheet's own.
+    """
+
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+    def __getattr__(self, name):
+        value = getattr(self._worksheet, name)
+        if name not in API_CALLS:
+            return value
+
+        def scheduled(*args, **kwargs):
+            return get_scheduler().call(
+                value, *args, idempotent=name not in NOT_IDEMPOTENT,
+                **kwargs)
+        return scheduled
+
+
+def get_scheduler():
+    """
+    Returns this process's request scheduler, sized from
+    'ETERNITY_SHEETS_QUOTA' the first time it is asked for.
+    """
+    global _SCHEDULER
+
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            quota = float(os.environ.get("ETERNITY_SHEETS_QUOTA",
+                                         DEFAULT_QUOTA_PER_MINUTE))
+            if _DEFAULT_PRIORITY == BACKGROUND:
+                quota *= BACKGROUND_SHARE
+            _SCHEDULER = RequestScheduler(quota)
+    return _SCHEDULER
+
+
+def scheduler_stats():
+    """
+    Returns the scheduler counters, or None if no Sheets request has
+    been made by this process.
+    """
+    return _SCHEDULER.stats() if _SCHEDULER is not None else None
+
+
+def schedule(func, *args, **kwargs):
+    """
+    Sends one Sheets request through the scheduler.
+    """
+    return get_scheduler().call(func, *args, **kwargs)
+
+
+def _reset_after_fork():
+    """
+    Gives a forked child its own scheduler, as the parent's lock may
+    have been held by another thread during the fork.
+    """
+    global _SCHEDULER, _SCHEDULER_LOCK
+
+    _SCHEDULER = None
+    _SCHEDULER_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _report_scheduler():
+    """
+    Prints the scheduler counters if any request was made.
+    """
+    for name, stats in (scheduler_stats() or {}).items():
+        if stats["requests"]:
+            print(f"Sheets {name} requests: {stats['requests']}, retries:"
+                  f" {stats['retries']} ({stats['throttled']} rate limited,"
+                  f" {stats['server_errors']} server errors), given up:"
+                  f" {stats['failures']}, wait mean"
+                  f" {stats['wait_mean'] * 1000:.1f} ms, p95"
+                  f" {stats['wait_p95'] * 1000:.1f} ms, max"
+                  f" {stats['wait_max'] * 1000:.1f} ms.", file=sys.stderr)
+
+
+if os.environ.get("ETERNITY_SCHEDULER_REPORT") == "1":
+    atexit.register(_report_scheduler)
@@ -0,0 +1,551 @@
+"""
+Account Storage file.
+Contains the storage backends that hold the 'accountlist' table
+and the function that selects between them:
+
+-Google Sheets backend, the live 'Eternity Holdings' spreadsheet.
+-Local SQLite backend that mimics the worksheet API.
+-Account service backend, shared by every session on the machine.
+-Function that returns the configured 'accountlist' worksheet,
+ wrapped in the read cache from 'sheet_cache'.
+-Function that reads several columns in one batch request.
+-Function that updates a row only if its version is unchanged.
+-Function that updates many rows that way in one request.
+
+The backend is chosen with the 'ETERNITY_STORAGE' environment variable,
+either 'sheets' (default), 'sqlite' or 'service'. The SQLite database
+file can be set with 'ETERNITY_SQLITE_PATH'.
+"""
+
+import os
+import re
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from connection import get_worksheet
+from sheets_scheduler import schedule
+from sheet_cache import cache_worksheet
+from service_client import ServiceWorksheet
+
+# Column headers of the 'accountlist' worksheet, in sheet order.
+ACCOUNT_HEADERS = ["First Name", "Last Name", "Account Number", "Pin Number",
+                   "Date of Birth", "Balance", "Location", "Email",
+                   "Recovery Password", "Version"]
+
+# Column numbers of the 'accountlist' worksheet by name, 1-based.
+ACCOUNT_COLUMNS = {
+    "first_name": 1,
+    "last_name": 2,
+    "acc_num": 3,
+    "pin_num": 4,
+    "date_of_birth": 5,
+    "balance": 6,
+    "location": 7,
+    "email": 8,
+    "recovery_pass": 9,
+    "version": 10
+}
+
+# Column holding each row's version, raised by one on every
+# compare-and-set update. A blank cell counts as version 0.
+VERSION_COL = ACCOUNT_COLUMNS["version"]
+
+DEFAULT_SQLITE_PATH = "eternity_holdings.db"
+
+# Seconds a write waits for another connection's write lock.
+SQLITE_TIMEOUT = 30
+
+# Hold the worksheet once it has been opened by 'get_accountlist',
+# with & without the read cache in front of it.
+_ACCOUNTLIST = None
+_RAW_ACCOUNTLIST = None
+
+
+def column_letter(col):
+    """
+    Converts a 1-based column number to its letters, e.g. 7 to 'G'.
+    """
+    letters = ""
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def rowcol_to_a1(row, col):
+    """
+    Converts a 1-based row & column to A1 notation, e.g. (5, 7) to 'G5'.
+    """
+    return f"{column_letter(col)}{row}"
+
+
+def a1_to_rowcol(label):
+    """
+    Converts an A1 label to a 1-based (row, column) pair. Either part
+    may be left out, as in 'C' or '2', and is returned as None.
+    """
+    match = re.match(r"^([A-Z]*)(\d*)$", label.upper())
+    if not match or label == "":
+        raise ValueError(f"Invalid cell label '{label}'.")
+    col = 0
+    for letter in match.group(1):
+        col = col * 26 + ord(letter) - 64
+    row = int(match.group(2)) if match.group(2) else None
+    return row, col or None
+
+
+class SqliteWorksheet:
+    """
+    Local stand-in for the Google Sheets 'accountlist' worksheet.
+    Stores every sheet row as a JSON list keyed by its row number so the
+    same 1-based row & column positions used with gspread keep working.
+
+    Only the worksheet methods the program uses are provided and they
+    return values as strings, the same way Google Sheets does.
+
+    Each thread gets its own connection, as a SQLite connection belongs
+    to the thread that opened it. Writes take the database write lock
+    before reading the rows they change.
+    """
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, title="accountlist"):
+        self.path = path
+        self.title = title
+        self._local = threading.local()
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sheet_rows ("
+                " row_num INTEGER PRIMARY KEY,"
+                " cells TEXT NOT NULL)")
+            # A fresh database starts with the title row like the sheet.
+            if self._last_row() == 0:
+                self._insert_row(1, ACCOUNT_HEADERS)
+
+    def reopen(self):
+        """
+        Drops the connections so each thread opens a new one. Used by
+        forked children, as a SQLite connection must not cross a fork.
+        """
+        self._local = threading.local()
+
+    @property
+    def _conn(self):
+        """
+        The calling thread's connection, opened on first use.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path,
+                                                      timeout=SQLITE_TIMEOUT)
+        return conn
+
+    @contextmanager
+    def _write_transaction(self):
+        """
+        Runs the block in a transaction holding the database write lock,
+        so rows read inside it cannot change before they are written.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+
+    @property
+    def row_count(self):
+        """
+        Number of rows holding data, including the title row.
+        """
+        return self._last_row()
+
+    def data_version(self):
+        """
+        Returns a number that changes whenever another connection
+        commits to the database.
+        """
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _last_row(self):
+        """
+        Returns the number of the last row holding data.
+        """
+        cursor = self._conn.execute("SELECT MAX(row_num) FROM sheet_rows")
+        return cursor.fetchone()[0] or 0
+
+    def _insert_row(self, row_num, values):
+        """
+        Writes a row of values converted to strings.
+        """
+        cells = ["" if value is None else str(value) for value in values]
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sheet_rows (row_num, cells)"
+            " VALUES (?, ?)", (row_num, json.dumps(cells)))
+
+    def _read_row(self, row_num):
+        """
+        Returns the stored cells of a row, or an empty list.
+        """
+        cursor = self._conn.execute(
+            "SELECT cells FROM sheet_rows WHERE row_num = ?", (row_num,))
+        found = cursor.fetchone()
+        return json.loads(found[0]) if found else []
+
+    def get_all_values(self):
+        """
+        Returns every row as a list of strings. Rows are padded to the
+        same width and missing rows are returned empty.
+        """
+        stored = {row_num: json.loads(cells) for row_num, cells in
+                  self._conn.execute("SELECT row_num, cells FROM sheet_rows")}
+        width = max((len(cells) for cells in stored.values()), default=0)
+        all_rows = []
+        for row_num in range(1, self._last_row() + 1):
+            cells = stored.get(row_num, [])
+            all_rows.append(cells + [""] * (width - len(cells)))
+        return all_rows
+
+    def row_values(self, row):
+        """
+        Returns the values of one row without trailing empty cells.
+        """
+        cells = self._read_row(row)
+        while cells and cells[-1] == "":
+            cells.pop()
+        return cells
+
+    def col_values(self, col):
+        """
+        Returns the values of one column, including the title row,
+        without trailing empty cells.
+        """
+        stored = dict(self._conn.execute(
+            "SELECT row_num, json_extract(cells, ?) FROM sheet_rows",
+            (f"$[{col - 1}]",)))
+        column = [stored.get(row_num) or "" for row_num in
+                  range(1, self._last_row() + 1)]
+        while column and column[-1] == "":
+            column.pop()
+        return column
+
+    def batch_get(self, ranges, major_dimension="ROWS"):
+        """
+        Reads several A1 ranges at once, such as 'C2:C' for a column from
+        row 2 down. Returns one list of rows per range, or one list of
+        columns if 'major_dimension' is 'COLUMNS'. Trailing empty rows
+        and cells are left out like the Sheets API does.
+        """
+        results = []
+
+        for a1_range in ranges:
+            start, _, end = a1_range.split("!")[-1].partition(":")
+            first_row, first_col = a1_to_rowcol(start)
+            last_row, last_col = a1_to_rowcol(end or start)
+            first_row = first_row or 1
+            last_row = min(last_row or self._last_row(), self._last_row())
+
+            # Only the rows inside the range are read.
+            stored = dict(self._conn.execute(
+                "SELECT row_num, cells FROM sheet_rows"
+                " WHERE row_num BETWEEN ? AND ?", (first_row, last_row)))
+            rows = [json.loads(stored[row_num]) if row_num in stored else []
+                    for row_num in range(first_row, last_row + 1)]
+            width = last_col or max((len(row) for row in rows), default=0)
+            first_index = (first_col or 1) - 1
+            grid = [(row + [""] * (width - len(row)))[first_index:width]
+                    for row in rows]
+
+            if major_dimension.upper() == "COLUMNS":
+                grid = [list(column) for column in zip(*grid)]
+            for line in grid:
+                while line and line[-1] == "":
+                    line.pop()
+            while grid and not grid[-1]:
+                grid.pop()
+            results.append(grid)
+
+        return results
+
+    def append_row(self, values):
+        """
+        Adds a row of values after the last row holding data.
+        Returns the updated range in the same shape as the Sheets API.
+        """
+        return self.append_rows([values])
+
+    def append_rows(self, values):
+        """
+        Adds several rows after the last row holding data in one
+        transaction. Returns the updated range like the Sheets API.
+        """
+        with self._write_transaction():
+            first_row = self._last_row() + 1
+            for row_num, row_values in enumerate(values, start=first_row):
+                self._insert_row(row_num, row_values)
+        last_row = first_row + len(values) - 1
+        return {"updates": {"updatedRange":
+                            f"{self.title}!A{first_row}:A{last_row}"}}
+
+    def _write_cell(self, row, col, value):
+        """
+        Writes a single cell, widening the row if needed.
+        """
+        cells = self._read_row(row)
+        cells += [""] * (col - len(cells))
+        cells[col - 1] = "" if value is None else str(value)
+        self._insert_row(row, cells)
+
+    def update_cell(self, row, col, value):
+        """
+        Updates a single cell.
+        """
+        with self._write_transaction():
+            self._write_cell(row, col, value)
+
+    def batch_update(self, data):
+        """
+        Writes several ranges in one transaction. Takes the same list of
+        {'range': 'G5:I5', 'values': [[...]]} entries as gspread.
+        """
+        with self._write_transaction():
+            for entry in data:
+                start = entry["range"].split("!")[-1].split(":")[0]
+                first_row, first_col = a1_to_rowcol(start)
+                first_row, first_col = first_row or 1, first_col or 1
+                for row_offset, values in enumerate(entry["values"]):
+                    for col_offset, value in enumerate(values):
+                        self._write_cell(first_row + row_offset,
+                                         first_col + col_offset, value)
+
+    def compare_and_set(self, row, updates, version_col, expected_version):
+        """
+        Writes the {column: value} updates to a row & raises its version
+        by one, only if the row is still at 'expected_version'. The row
+        is read & written under the database write lock, so no other
+        process can change it in between.
+        Returns True if the row was updated.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            cells = self._read_row(row)
+            if row_version(cells) != expected_version:
+                self._conn.rollback()
+                return False
+            cells += [""] * (max(list(updates) + [version_col]) - len(cells))
+            for col, value in updates.items():
+                cells[col - 1] = "" if value is None else str(value)
+            cells[version_col - 1] = str(expected_version + 1)
+            self._insert_row(row, cells)
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        return True
+
+    def compare_and_set_rows(self, changes, version_col):
+        """
+        Runs 'compare_and_set' for several rows in one transaction.
+        'changes' is a list of (row, {column: value}, expected version).
+        Rows whose version changed are left as they are.
+        Returns one bool per change, True if that row was updated.
+        """
+        swapped = []
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row, updates, expected_version in changes:
+                cells = self._read_row(row)
+                if row_version(cells) != expected_version:
+                    swapped.append(False)
+                    continue
+                cells += [""] * (max(list(updates) + [version_col]) -
+                                 len(cells))
+                for col, value in updates.items():
+                    cells[col - 1] = "" if value is None else str(value)
+                cells[version_col - 1] = str(expected_version + 1)
+                self._insert_row(row, cells)
+                swapped.append(True)
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        return swapped
+
+
+def row_version(cells):
+    """
+    Returns the version stored in a row's cells, 0 if it has none.
+    """
+    value = cells[VERSION_COL - 1] if len(cells) >= VERSION_COL else ""
+    return int(value) if value.strip().isdigit() else 0
+
+
+def _reopen_after_fork():
+    """
+    Gives a forked child its own connection to the SQLite backend.
+    """
+    if isinstance(_RAW_ACCOUNTLIST, SqliteWorksheet):
+        _RAW_ACCOUNTLIST.reopen()
+
+
+os.register_at_fork(after_in_child=_reopen_after_fork)
+
+
+def get_accountlist(cached=True):
+    """
+    Returns the 'accountlist' worksheet for the configured backend.
+    The worksheet is opened on the first call & reused afterwards.
+    Reads are served through the cache in 'sheet_cache' unless 'cached'
+    is False, which large one-off reads such as exports use.
+
+    - If 'ETERNITY_STORAGE' is 'sqlite' a local SqliteWorksheet is used.
+    - If it is 'service' the account service's worksheet is used, with
+      no cache of its own as the service keeps the shared one.
+    - Otherwise the shared Google Sheets worksheet is used.
+    """
+    global _ACCOUNTLIST, _RAW_ACCOUNTLIST
+
+    if _ACCOUNTLIST is None:
+        backend = os.environ.get("ETERNITY_STORAGE", "sheets").lower()
+        if backend == "sqlite":
+            _RAW_ACCOUNTLIST = SqliteWorksheet(
+                os.environ.get("ETERNITY_SQLITE_PATH", DEFAULT_SQLITE_PATH))
+        elif backend == "sheets":
+            _RAW_ACCOUNTLIST = get_worksheet('accountlist')
+        elif backend == "service":
+            _RAW_ACCOUNTLIST = ServiceWorksheet()
+        else:
+            raise ValueError(f"Unknown storage backend '{backend}'.")
+
+        if isinstance(_RAW_ACCOUNTLIST, ServiceWorksheet):
+            _ACCOUNTLIST = _RAW_ACCOUNTLIST
+        else:
+            _ACCOUNTLIST = cache_worksheet(_RAW_ACCOUNTLIST)
+
+    return _ACCOUNTLIST if cached else _RAW_ACCOUNTLIST
+
+
+def current_row_count(worksheet):
+    """
+    Returns the worksheet's current number of rows. For Google Sheets
+    the grid size is fetched again, as the value stored on the worksheet
+    handle does not grow when rows are appended.
+    """
+    if isinstance(worksheet, (SqliteWorksheet, ServiceWorksheet)):
+        return worksheet.row_count
+
+    meta = schedule(worksheet.client.fetch_sheet_metadata,
+                    worksheet.spreadsheet_id)
+    for sheet in meta["sheets"]:
+        if sheet["properties"]["sheetId"] == worksheet.id:
+            return sheet["properties"]["gridProperties"]["rowCount"]
+    return worksheet.row_count
+
+
+def get_sheet_columns(columns):
+    """
+    Reads several Account sheet columns in one batch request.
+    Columns can be given by number or by name from 'ACCOUNT_COLUMNS',
+    e.g. [3, 6] or ["acc_num", "balance"].
+
+    Returns one list per column, skipping the title row. The lists are
+    padded to the same length so a position refers to the same Account
+    in every column.
+    """
+    col_numbers = [ACCOUNT_COLUMNS.get(column, column) for column in columns]
+    # Collects all column values after the first row, e.g. 'C2:C'.
+    ranges = [f"{column_letter(col)}2:{column_letter(col)}"
+              for col in col_numbers]
+    results = get_accountlist().batch_get(ranges, major_dimension="COLUMNS")
+
+    column_values = [list(result[0]) if result else [] for result in results]
+    length = max((len(values) for values in column_values), default=0)
+    return [values + [""] * (length - len(values))
+            for values in column_values]
+
+
+def compare_and_set_row(row, updates, expected_version):
+    """
+    Writes the {column: value} updates to an Account row & raises its
+    version by one, only if the row is still at 'expected_version'.
+    Returns True if the row was updated, False if another session
+    changed it first.
+
+    - If the backend is SQLite, the check & write are one transaction.
+    - If the backend is the account service, the service runs the
+      check & write together with every other session's writes.
+    - If the backend is Google Sheets, the version is read uncached just
+      before the write, which narrows but cannot close the window
+      between the two requests.
+    """
+    worksheet = get_accountlist()
+    raw_worksheet = get_accountlist(cached=False)
+
+    if isinstance(raw_worksheet, (SqliteWorksheet, ServiceWorksheet)):
+        swapped = raw_worksheet.compare_and_set(row, updates, VERSION_COL,
+                                                expected_version)
+    else:
+        current_version = row_version(raw_worksheet.row_values(row))
+        swapped = current_version == expected_version
+        if swapped:
+            cells = dict(updates)
+            cells[VERSION_COL] = expected_version + 1
+            raw_worksheet.batch_update(
+                [{"range": rowcol_to_a1(row, col), "values": [[value]]}
+                 for col, value in sorted(cells.items())])
+
+    # Cached reads of the row are stale either way.
+    forget = getattr(worksheet, "forget", None)
+    if forget:
+        forget(rows=(row,), cols=tuple(updates) + (VERSION_COL,))
+    return swapped
+
+
+def compare_and_set_rows(changes):
+    """
+    Runs 'compare_and_set_row' for many Account rows at once. 'changes'
+    is a list of (row, {column: value}, expected version).
+    Returns one bool per change, True if that row was updated & False
+    if another session changed it first.
+
+    - If the backend is SQLite or the account service, every row is
+      checked & written in one transaction.
+    - If the backend is Google Sheets, the versions of all rows are read
+      uncached in one request and the unchanged rows are written in one
+      'batch_update', with the same window as 'compare_and_set_row'.
+    """
+    if not changes:
+        return []
+    worksheet = get_accountlist()
+    raw_worksheet = get_accountlist(cached=False)
+
+    if isinstance(raw_worksheet, (SqliteWorksheet, ServiceWorksheet)):
+        swapped = raw_worksheet.compare_and_set_rows(changes, VERSION_COL)
+    else:
+        version_cells = raw_worksheet.batch_get(
+            [rowcol_to_a1(row, VERSION_COL) for row, _, _ in changes])
+        swapped = []
+        data = []
+        for change, found in zip(changes, version_cells):
+            row, updates, expected_version = change
+            # Each range is the single version cell, empty if blank.
+            value = found[0][0] if found and found[0] else ""
+            current_version = int(value) if value.strip().isdigit() else 0
+            swapped.append(current_version == expected_version)
+            if current_version == expected_version:
+                cells = dict(updates)
+                cells[VERSION_COL] = expected_version + 1
+                data.extend({"range": rowcol_to_a1(row, col),
+                             "values": [[value]]}
+                            for col, value in sorted(cells.items()))
+        if data:
+            raw_worksheet.batch_update(data)
+
+    forget = getattr(worksheet, "forget", None)
+    if forget:
+        cols = {VERSION_COL}
+        for _, updates, _ in changes:
+            cols.update(updates)
+        forget(rows=tuple(row for row, _, _ in changes), cols=tuple(cols))
+    return swapped